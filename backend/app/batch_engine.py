@@ -0,0 +1,139 @@
+"""
+Vectorized snake simulation for hosting many games in one process.
+
+BatchSnakeEngine applies the same rules as app.engine.SnakeGame to N games at
+once: heads, directions, ring-buffer bodies, occupancy grids and food are NumPy
+arrays, and step() advances every game with a fixed number of array operations.
+Food is drawn from a NumPy generator per batch, so batch games are not
+replay-compatible with the seeded single-game engine.
+
+Requires the optional numpy dependency (``uv sync --extra sim``).
+"""
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .engine import GRID_SIZE, INITIAL_SNAKE_LENGTH, FOOD_SCORE
+from .models import GameMode
+
+# Direction indices used in action arrays; -1 means "keep going"
+UP, DOWN, LEFT, RIGHT = 0, 1, 2, 3
+NO_ACTION = -1
+DIRECTION_INDEX = {"up": UP, "down": DOWN, "left": LEFT, "right": RIGHT}
+
+_DX = np.array([0, 0, -1, 1], dtype=np.int32)
+_DY = np.array([-1, 1, 0, 0], dtype=np.int32)
+_OPPOSITE = np.array([DOWN, UP, RIGHT, LEFT], dtype=np.int8)
+
+
+class BatchSnakeEngine:
+    """N independent snake games advanced together"""
+
+    def __init__(self, num_games: int, mode: GameMode = GameMode.walls,
+                 grid_size: int = GRID_SIZE, seed: Optional[int] = None):
+        self.num_games = num_games
+        self.grid_size = grid_size
+        self.cells = grid_size * grid_size
+        self.rng = np.random.default_rng(seed)
+        self._rows = np.arange(num_games)
+
+        self.pass_through = np.full(num_games, GameMode(mode) == GameMode.pass_through)
+        self.occupied = np.zeros((num_games, self.cells), dtype=np.uint8)
+        # Body ring buffer: the head lives at head_ptr, the tail length - 1 slots behind it
+        self.body = np.zeros((num_games, self.cells), dtype=np.int16)
+        self.head_ptr = np.zeros(num_games, dtype=np.int32)
+        self.length = np.zeros(num_games, dtype=np.int32)
+        self.direction = np.zeros(num_games, dtype=np.int8)
+        self.food = np.full(num_games, -1, dtype=np.int32)
+        self.score = np.zeros(num_games, dtype=np.int32)
+        self.alive = np.zeros(num_games, dtype=bool)
+        self.reset(np.ones(num_games, dtype=bool))
+
+    def reset(self, mask: np.ndarray):
+        """Start fresh games in the selected slots"""
+        rows = self._rows[mask]
+        if rows.size == 0:
+            return
+        start = (self.grid_size // 2) * self.grid_size + self.grid_size // 2
+        self.occupied[rows] = 0
+        # Lay the initial snake out tail first so slot INITIAL_SNAKE_LENGTH - 1 is the head
+        for i in range(INITIAL_SNAKE_LENGTH):
+            cell = start - (INITIAL_SNAKE_LENGTH - 1 - i)
+            self.body[rows, i] = cell
+            self.occupied[rows, cell] = 1
+        self.head_ptr[rows] = INITIAL_SNAKE_LENGTH - 1
+        self.length[rows] = INITIAL_SNAKE_LENGTH
+        self.direction[rows] = RIGHT
+        self.score[rows] = 0
+        self.alive[rows] = True
+        self._place_food(rows)
+
+    def heads(self) -> np.ndarray:
+        """Head cell index of every game"""
+        return self.body[self._rows, self.head_ptr].astype(np.int32)
+
+    def step(self, actions: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Advance every live game by one tick. `actions` holds a direction index
+        per game (or NO_ACTION). Returns the mask of games that died this tick.
+        """
+        if actions is None:
+            actions = np.full(self.num_games, NO_ACTION, dtype=np.int8)
+        size = self.grid_size
+        rows = self._rows
+
+        has_action = actions >= 0
+        reverse = has_action & (actions == _OPPOSITE[self.direction])
+        moving = self.alive & ~reverse
+        directions = np.where(has_action & ~reverse, actions, self.direction).astype(np.int8)
+
+        head = self.heads()
+        x = head % size + _DX[directions]
+        y = head // size + _DY[directions]
+        x = np.where(self.pass_through, x % size, x)
+        y = np.where(self.pass_through, y % size, y)
+        out_of_bounds = (x < 0) | (x >= size) | (y < 0) | (y >= size)
+        new_head = np.clip(y, 0, size - 1) * size + np.clip(x, 0, size - 1)
+
+        # Like the single-game engine, the tail cell still counts as occupied
+        collided = self.occupied[rows, new_head].astype(bool)
+        died = moving & (out_of_bounds | collided)
+        self.alive &= ~died
+        moved = moving & ~died
+        movers = rows[moved]
+        if movers.size == 0:
+            return died
+
+        self.direction[movers] = directions[movers]
+        heads_moved = new_head[movers]
+        self.head_ptr[movers] = (self.head_ptr[movers] + 1) % self.cells
+        self.body[movers, self.head_ptr[movers]] = heads_moved
+        self.occupied[movers, heads_moved] = 1
+
+        ate = heads_moved == self.food[movers]
+        shrink = movers[~ate]
+        tail_slot = (self.head_ptr[shrink] - self.length[shrink]) % self.cells
+        self.occupied[shrink, self.body[shrink, tail_slot]] = 0
+
+        eaters = movers[ate]
+        if eaters.size:
+            self.length[eaters] += 1
+            self.score[eaters] += FOOD_SCORE
+            self._place_food(eaters)
+        return died
+
+    def snake(self, game: int) -> List[Tuple[int, int]]:
+        """Body segments of one game as (x, y), head first"""
+        slots = (self.head_ptr[game] - np.arange(self.length[game])) % self.cells
+        return [(int(c) % self.grid_size, int(c) // self.grid_size) for c in self.body[game, slots]]
+
+    def _place_food(self, rows: np.ndarray):
+        """Rejection-sample a free cell for each selected game"""
+        full = self.length[rows] >= self.cells
+        self.food[rows[full]] = -1
+        pending = rows[~full]
+        while pending.size:
+            candidates = self.rng.integers(0, self.cells, size=pending.size)
+            free = self.occupied[pending, candidates] == 0
+            self.food[pending[free]] = candidates[free]
+            pending = pending[~free]
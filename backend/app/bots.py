@@ -0,0 +1,269 @@
+from collections import deque
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+from .engine import DIRECTIONS, OPPOSITE_DIRECTIONS, SnakeGame
+from .models import GameMode
+
+
+class GreedyBot:
+    """
+    Port of BotPlayer.calculateNextMove (frontend/src/lib/game/botPlayer.ts):
+    heads for the food by Manhattan distance, avoids walls and its own body,
+    and slightly prefers to keep its current direction.
+    """
+    name = "greedy"
+
+    def next_move(self, game: SnakeGame) -> str:
+        size = game.grid_size
+        head_x, head_y = game.position(game.head)
+        food = game.position(game.food) if game.food is not None else (head_x, head_y)
+        opposite = OPPOSITE_DIRECTIONS[game.direction]
+
+        best_direction = None
+        best_score = None
+        for direction in ("up", "down", "left", "right"):
+            if direction == opposite:
+                continue
+            dx, dy = DIRECTIONS[direction]
+            x, y = head_x + dx, head_y + dy
+            if game.mode == GameMode.pass_through:
+                x %= size
+                y %= size
+
+            score = 0
+            if x < 0 or x >= size or y < 0 or y >= size:
+                score -= 1000
+            elif game.occupied[y * size + x]:
+                score -= 1000
+            score -= abs(x - food[0]) + abs(y - food[1])
+            if direction == game.direction:
+                score += 5
+
+            if best_score is None or score > best_score:
+                best_direction = direction
+                best_score = score
+        return best_direction
+
+
+@lru_cache(maxsize=None)
+def _neighbour_table(size: int, wrap: bool) -> Tuple[Tuple[Tuple[str, int], ...], ...]:
+    """For every cell, the (direction, cell) pairs one move away, walls excluded"""
+    table = []
+    for cell in range(size * size):
+        x, y = cell % size, cell // size
+        moves = []
+        for direction, (dx, dy) in DIRECTIONS.items():
+            nx, ny = x + dx, y + dy
+            if wrap:
+                nx %= size
+                ny %= size
+            elif nx < 0 or nx >= size or ny < 0 or ny >= size:
+                continue
+            moves.append((direction, ny * size + nx))
+        table.append(tuple(moves))
+    return tuple(table)
+
+
+@lru_cache(maxsize=None)
+def _hamiltonian_cycle(size: int) -> Optional[Tuple[int, ...]]:
+    """
+    Successor of every cell on a cycle through the whole grid: serpentine rows
+    over columns 1.., returning up column 0. Only exists for even grid sizes.
+    """
+    if size % 2 or size < 2:
+        return None
+    order = []
+    for y in range(size):
+        columns = range(1, size) if y % 2 == 0 else range(size - 1, 0, -1)
+        order.extend(y * size + x for x in columns)
+    order.extend(y * size for y in range(size - 1, -1, -1))
+    successor = [0] * (size * size)
+    for i, cell in enumerate(order):
+        successor[cell] = order[(i + 1) % len(order)]
+    return tuple(successor)
+
+
+class PathfinderBot:
+    """
+    Breadth-first search to the food on the occupancy grid, taken only when the
+    snake could still reach its own tail after eating; otherwise the move into
+    the largest flood-filled region, preferring one from which the tail is
+    reachable. When every move leads into a region smaller than the snake, it
+    falls back to following a Hamiltonian cycle (`hamiltonian=True`, even grid
+    sizes only).
+
+    Neighbour tables and the cycle are precomputed per grid size and mode, and
+    searches work on cell indices and bytearrays. A path that passed the safety
+    check stays safe while the snake follows it and the food stays put, so it
+    is kept as a plan and replayed move by move instead of searching every tick;
+    a decision on the 20x20 grid averages tens of microseconds
+    (see benchmarks/bench_bots.py). Keep one instance per game.
+    """
+    name = "pathfinder"
+
+    def __init__(self, hamiltonian: bool = True):
+        self.hamiltonian = hamiltonian
+        self._plan: List[Tuple[int, str]] = []  # (cell, direction), next move last
+        self._plan_food: Optional[int] = None
+        self._plan_head: Optional[int] = None
+
+    def next_move(self, game: SnakeGame) -> str:
+        size = game.grid_size
+        neighbours = _neighbour_table(size, game.mode == GameMode.pass_through)
+        body = game.body
+        head = body[0]
+        opposite = OPPOSITE_DIRECTIONS[game.direction]
+
+        if self._plan and head == self._plan_head and game.food == self._plan_food:
+            self._plan_head, direction = self._plan.pop()
+            return direction
+
+        self._plan = []
+        if game.food is not None:
+            path = self._path_to_food(game, neighbours)
+            if path and self._tail_reachable_after(game, neighbours, path):
+                previous = head
+                for cell in path:
+                    self._plan.append((cell, self._direction_to(neighbours, previous, cell)))
+                    previous = cell
+                self._plan.reverse()
+                self._plan_food = game.food
+                self._plan_head, direction = self._plan.pop()
+                return direction
+
+        # No safe route to the food: buy time in the roomiest region
+        candidates = [
+            (direction, cell) for direction, cell in neighbours[head]
+            if direction != opposite and not game.occupied[cell]
+        ]
+        best_direction = None
+        best_rank = None
+        regions = self._regions(game, neighbours, [cell for _, cell in candidates])
+        for (direction, _), (area, reaches_tail) in zip(candidates, regions):
+            rank = (area >= len(body) or reaches_tail, reaches_tail, area)
+            if best_rank is None or rank > best_rank:
+                best_direction, best_rank = direction, rank
+
+        if self.hamiltonian and (best_rank is None or not best_rank[0]):
+            cycle = _hamiltonian_cycle(size)
+            if cycle is not None and not game.occupied[cycle[head]]:
+                direction = self._direction_to(neighbours, head, cycle[head])
+                if direction is not None and direction != opposite:
+                    return direction
+        return best_direction or game.direction
+
+    @staticmethod
+    def _direction_to(neighbours, cell: int, target: int) -> Optional[str]:
+        for direction, neighbour in neighbours[cell]:
+            if neighbour == target:
+                return direction
+        return None
+
+    @staticmethod
+    def _path_to_food(game: SnakeGame, neighbours) -> Optional[List[int]]:
+        """
+        Shortest path (excluding the head) to the food. Body cells count as
+        free once the tail has moved off them by the time the head arrives.
+        """
+        body = game.body
+        length = len(body)
+        occupied = game.occupied
+        # Move number after which each body cell is vacated (the tail after the first)
+        free_after = [0] * len(occupied)
+        for i, cell in enumerate(body):
+            free_after[cell] = length - i
+        food = game.food
+        head = body[0]
+        parent = [-1] * len(occupied)
+        parent[head] = head
+        frontier = [head]
+        moves = 0
+        while frontier:
+            moves += 1
+            next_frontier = []
+            for cell in frontier:
+                for _, neighbour in neighbours[cell]:
+                    if parent[neighbour] != -1:
+                        continue
+                    if occupied[neighbour] and free_after[neighbour] >= moves:
+                        continue
+                    parent[neighbour] = cell
+                    if neighbour == food:
+                        path = [neighbour]
+                        while parent[path[-1]] != head:
+                            path.append(parent[path[-1]])
+                        path.reverse()
+                        return path
+                    next_frontier.append(neighbour)
+            frontier = next_frontier
+        return None
+
+    @staticmethod
+    def _tail_reachable_after(game: SnakeGame, neighbours, path: List[int]) -> bool:
+        """Follow the path on a copy of the board and check the head can still reach the tail"""
+        virtual = deque(game.body)
+        occupied = bytearray(game.occupied)
+        for cell in path:
+            virtual.appendleft(cell)
+            occupied[cell] = 1
+            if cell != game.food:
+                occupied[virtual.pop()] = 0
+        if len(virtual) >= len(occupied):
+            return True
+        target = virtual[-1]
+        occupied[target] = 0
+        seen = bytearray(len(occupied))
+        stack = [virtual[0]]
+        seen[virtual[0]] = 1
+        while stack:
+            cell = stack.pop()
+            for _, neighbour in neighbours[cell]:
+                if neighbour == target:
+                    return True
+                if not seen[neighbour] and not occupied[neighbour]:
+                    seen[neighbour] = 1
+                    stack.append(neighbour)
+        return False
+
+    @staticmethod
+    def _regions(game: SnakeGame, neighbours, starts: List[int]) -> List[Tuple[int, bool]]:
+        """
+        For each free start cell, the size of its free region and whether that
+        region borders the tail. Starts in the same region share one flood fill.
+        """
+        occupied = game.occupied
+        tail = game.body[-1]
+        label = [0] * len(occupied)
+        regions = [None]
+        results = []
+        for start in starts:
+            if not label[start]:
+                region = len(regions)
+                label[start] = region
+                stack = [start]
+                area = 0
+                reaches_tail = False
+                while stack:
+                    cell = stack.pop()
+                    area += 1
+                    for _, neighbour in neighbours[cell]:
+                        if neighbour == tail:
+                            reaches_tail = True
+                        elif not label[neighbour] and not occupied[neighbour]:
+                            label[neighbour] = region
+                            stack.append(neighbour)
+                regions.append((area, reaches_tail))
+            results.append(regions[label[start]])
+        return results
+
+# Strategies by name, for LIVE_BOT_STRATEGY and the tournament runner
+BOTS = {
+    GreedyBot.name: GreedyBot,
+    PathfinderBot.name: PathfinderBot,
+}
+
+
+def make_bot(name: str):
+    """Instantiate a registered strategy; raises KeyError for unknown names"""
+    return BOTS[name]()
@@ -0,0 +1,156 @@
+import asyncio
+import threading
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Set
+
+
+class Subscription:
+    """
+    One spectator's bounded frame queue.
+
+    When the consumer falls `max_queue` frames behind, the backlog is dropped and
+    replaced with a single keyframe of the current state, so a slow connection
+    skips ahead instead of growing memory or stalling the publisher. Once the
+    channel is closed, get() returns the frames still queued and then None.
+    """
+    __slots__ = ("channel", "loop", "frames", "max_queue", "dropped", "closed", "_waiter")
+
+    def __init__(self, channel: str, loop: asyncio.AbstractEventLoop, max_queue: int):
+        self.channel = channel
+        self.loop = loop
+        self.frames: Deque[bytes] = deque()
+        self.max_queue = max_queue
+        self.dropped = 0
+        self.closed = False
+        self._waiter: Optional[asyncio.Future] = None
+
+    async def get(self) -> Optional[bytes]:
+        """Wait for the next frame; None once the channel has been closed"""
+        while not self.frames:
+            if self.closed:
+                return None
+            self._waiter = self.loop.create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+        return self.frames.popleft()
+
+    def _push(self, frame: bytes, get_keyframe: Callable[[], bytes], is_keyframe: bool):
+        if len(self.frames) >= self.max_queue:
+            self.dropped += len(self.frames)
+            self.frames.clear()
+            if not is_keyframe:
+                frame = get_keyframe()
+        self.frames.append(frame)
+        self._wake()
+
+    def _close(self):
+        self.closed = True
+        self._wake()
+
+    def _wake(self):
+        waiter = self._waiter
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+
+class BroadcastHub:
+    """
+    Fans frames out to every subscriber of a channel (one channel per live game).
+
+    A frame is serialized once by the publisher and the same bytes object is
+    appended to each subscriber's queue; work per subscriber is a deque append.
+    Subscribers waiting on other event loops are served by one threadsafe
+    callback per loop rather than one per subscriber. Spectator counts are
+    kept here in memory instead of being written on every join and leave.
+    """
+
+    def __init__(self, max_queue: int = 32):
+        self.max_queue = max_queue
+        # channel -> event loop -> subscribers waiting on that loop
+        self._channels: Dict[str, Dict[asyncio.AbstractEventLoop, Set[Subscription]]] = {}
+        self._lock = threading.Lock()
+        self.published = 0
+        self.delivered = 0
+
+    def subscribe(self, channel: str, initial: Optional[bytes] = None) -> Subscription:
+        """Join a channel from the running event loop, optionally starting with a frame"""
+        subscription = Subscription(channel, asyncio.get_running_loop(), self.max_queue)
+        if initial is not None:
+            subscription.frames.append(initial)
+        with self._lock:
+            loops = self._channels.setdefault(channel, {})
+            loops.setdefault(subscription.loop, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            loops = self._channels.get(subscription.channel)
+            if loops is None:
+                return
+            group = loops.get(subscription.loop)
+            if group is not None:
+                group.discard(subscription)
+                if not group:
+                    del loops[subscription.loop]
+
+    def close(self, channel: str):
+        """Forget a channel and wake all of its subscribers, whose get() then returns None"""
+        with self._lock:
+            loops = self._channels.pop(channel, None)
+        if not loops:
+            return
+        try:
+            current_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            current_loop = None
+        for loop, group in loops.items():
+            for subscription in group:
+                if loop is current_loop:
+                    subscription._close()
+                else:
+                    loop.call_soon_threadsafe(subscription._close)
+
+    def spectators(self, channel: str) -> int:
+        """Number of current subscribers of a channel"""
+        with self._lock:
+            return sum(len(group) for group in self._channels.get(channel, {}).values())
+
+    def publish(self, channel: str, frame: bytes, keyframe: Callable[[], bytes], is_keyframe: bool = False):
+        """
+        Deliver a frame to every subscriber. `keyframe` builds a full-state frame
+        for subscribers whose queue overflowed; it is called at most once.
+        """
+        with self._lock:
+            loops = self._channels.get(channel)
+            if not loops:
+                return
+            groups = [(loop, list(group)) for loop, group in loops.items()]
+        self.published += 1
+
+        cached: List[bytes] = []
+
+        def get_keyframe() -> bytes:
+            if not cached:
+                cached.append(keyframe())
+            return cached[0]
+
+        try:
+            current_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            current_loop = None
+
+        for loop, group in groups:
+            self.delivered += len(group)
+            if loop is current_loop:
+                self._fan_out(group, frame, get_keyframe, is_keyframe)
+            else:
+                # Build the fallback keyframe now, while the game state matches the frame
+                fallback = get_keyframe()
+                loop.call_soon_threadsafe(self._fan_out, group, frame, lambda: fallback, is_keyframe)
+
+    @staticmethod
+    def _fan_out(group: List[Subscription], frame: bytes, get_keyframe, is_keyframe: bool):
+        for subscription in group:
+            subscription._push(frame, get_keyframe, is_keyframe)
@@ -0,0 +1,80 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries also expire after a fixed TTL.
+
+    Used for hot per-key lookups (e.g. users resolved from auth tokens) that
+    writers invalidate explicitly; the TTL bounds staleness for writes made by
+    other processes. A reader filling a miss from the database takes
+    generation() before its read and passes it to set(), which then drops the
+    value if any write landed in between rather than caching it for a full TTL.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Get a live entry, or None"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            value, expires_at = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def generation(self) -> int:
+        """Counter bumped by every write; see set()"""
+        return self._generation
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None):
+        """
+        Store an entry, evicting the least recently used one when full.
+
+        With `generation`, the value is a read-through fill and is dropped if
+        the cache has been written to since generation() returned it. Without,
+        it is authoritative and supersedes fills still in flight.
+        """
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            if generation is None:
+                self._generation += 1
+            elif generation != self._generation:
+                return
+            self._data[key] = (value, time.monotonic() + self.ttl_seconds)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        """Drop an entry if present"""
+        with self._lock:
+            self._generation += 1
+            self._data.pop(key, None)
+
+    def clear(self):
+        """Drop all entries"""
+        with self._lock:
+            self._generation += 1
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,177 @@
+"""
+Retention for leaderboard_entries.
+
+Entries older than the retention window are moved out of the hot table a
+batch at a time:
+1. read the oldest `batch_size` expired entries through the (timestamp, id)
+   index; each batch is deleted below, so no kept row is ever scanned
+2. append them to compressed archives, one file per month of play
+   (COMPACTION_ARCHIVE_DIR/leaderboard_entries-YYYY-MM.ndjson.gz), and the
+   replays they link to alongside (game_replays-YYYY-MM.ndjson.gz, with the
+   blob base64-encoded in `data`), and fsync
+3. in one short transaction, fold them into per-player, per-mode, per-day
+   leaderboard_daily rows and delete them and their replays
+   (Database.compact_entries)
+
+Archives are append-only: every batch adds a gzip member, and gzip readers
+(zcat, gzip.open) treat a multi-member file as one stream. Lines use the
+export format (app/export.py). Rows are archived before they are deleted, so
+a crash between the two steps can archive a batch twice but never loses one;
+deduplicate on `id` when loading archives. Batches are separated by a short
+pause so score submissions are never queued behind the job for long, and a
+lock file keeps concurrent workers from compacting at the same time.
+"""
+import base64
+import gzip
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from pydantic_core import to_json
+
+from .config import (
+    COMPACTION_ARCHIVE_DIR, COMPACTION_BATCH_SIZE, COMPACTION_PAUSE_MS, COMPACTION_RETENTION_DAYS
+)
+from .db import Database, db
+from .export import encode_page
+from .models import ExportFormat
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows; no cross-process locking
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class EntryCompactor:
+    """Archives and compacts expired leaderboard entries, on demand or from a background thread"""
+
+    def __init__(self, database: Database, archive_dir: str = COMPACTION_ARCHIVE_DIR,
+                 retention_days: int = COMPACTION_RETENTION_DAYS, batch_size: int = COMPACTION_BATCH_SIZE,
+                 pause_ms: int = COMPACTION_PAUSE_MS):
+        self.database = database
+        self.archive_dir = archive_dir
+        self.retention_days = retention_days
+        self.batch_size = max(1, batch_size)
+        self.pause = pause_ms / 1000
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.compacted_total = 0
+        self.archived_bytes_total = 0
+        self.batches_total = 0
+        self.failed_runs = 0
+        self.last_run_seconds = 0.0
+
+    def archive_path(self, month: str, table: str = "leaderboard_entries") -> str:
+        return os.path.join(self.archive_dir, f"{table}-{month}.ndjson.gz")
+
+    def run(self, now: Optional[datetime] = None, max_batches: Optional[int] = None) -> int:
+        """Compact everything older than the retention window; returns the number of entries moved"""
+        cutoff = (now or datetime.utcnow()) - timedelta(days=self.retention_days)
+        os.makedirs(self.archive_dir, exist_ok=True)
+        with open(os.path.join(self.archive_dir, ".compaction.lock"), "w") as lock:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    logger.info("Compaction already running in another process, skipping")
+                    return 0
+            started = time.monotonic()
+            moved = 0
+            batches = 0
+            while not self._stop_event.is_set() and (max_batches is None or batches < max_batches):
+                rows = self.database.get_expired_entries(cutoff, self.batch_size)
+                if not rows:
+                    break
+                self._archive(rows)
+                self.database.compact_entries(rows)
+                moved += len(rows)
+                batches += 1
+                self.compacted_total += len(rows)
+                self.batches_total += 1
+                if len(rows) < self.batch_size:
+                    break
+                # Let queued score writes through between batches
+                self._stop_event.wait(self.pause)
+            self.last_run_seconds = time.monotonic() - started
+            return moved
+
+    def _archive(self, rows: List[tuple]):
+        by_month: Dict[str, List[tuple]] = defaultdict(list)
+        replay_months: Dict[int, str] = {}
+        for row in rows:
+            month = row[5].strftime("%Y-%m")
+            by_month[month].append(row)
+            if row[6] is not None:
+                replay_months[row[6]] = month
+        for month, month_rows in by_month.items():
+            self._append(self.archive_path(month), encode_page(month_rows, ExportFormat.ndjson))
+
+        # Replays are filed under the month of the entry that links to them
+        replays: Dict[str, List[bytes]] = defaultdict(list)
+        for replay_id, player_id, mode, score, ticks, created_at, data in self.database.get_replay_rows(
+                list(replay_months)):
+            replays[replay_months[replay_id]].append(to_json({
+                "id": replay_id, "playerId": player_id, "mode": mode, "score": score, "ticks": ticks,
+                "createdAt": created_at, "data": base64.b64encode(data).decode("ascii"),
+            }) + b"\n")
+        for month, lines in replays.items():
+            self._append(self.archive_path(month, "game_replays"), b"".join(lines))
+
+    def _append(self, path: str, data: bytes):
+        """Append one gzip member to an archive and fsync it"""
+        with open(path, "ab") as f:
+            start = f.seek(0, os.SEEK_END)
+            with gzip.GzipFile(fileobj=f, mode="wb", mtime=0) as member:
+                member.write(data)
+            self.archived_bytes_total += f.tell() - start
+            f.flush()
+            os.fsync(f.fileno())
+
+    def start(self, interval_seconds: float):
+        """Run compaction every `interval_seconds` from a background thread"""
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(interval_seconds,), name="entry-compaction", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background job after the batch in progress"""
+        thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._stop_event.set()
+        thread.join()
+        self._stop_event.clear()
+
+    def _run(self, interval_seconds: float):
+        while not self._stop_event.is_set():
+            try:
+                moved = self.run()
+                if moved:
+                    logger.info("Compacted %d leaderboard entries in %.1fs", moved, self.last_run_seconds)
+            except Exception:
+                self.failed_runs += 1
+                logger.exception("Compacting leaderboard entries failed; will retry")
+            self._stop_event.wait(interval_seconds)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "compacted_total": self.compacted_total,
+            "archived_bytes_total": self.archived_bytes_total,
+            "batches_total": self.batches_total,
+            "failed_runs_total": self.failed_runs,
+            "last_run_seconds": self.last_run_seconds,
+        }
+
+
+# Global compactor instance
+entry_compactor = EntryCompactor(db)
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -12,3 +13,82 @@ DATABASE_URL = os.getenv(
 
 # SQLAlchemy settings
 SQLALCHEMY_ECHO = os.getenv("SQLALCHEMY_ECHO", "False").lower() == "true"
+
+# Connection pool settings (ignored for in-memory SQLite)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds, -1 disables
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "True").lower() == "true"
+
+# SQLite connection pragmas
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+# Password hashing settings
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")  # "thread" or "process"
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 2)))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "256"))
+
+# Authentication token settings
+SECRET_KEY = os.getenv("SECRET_KEY", "")  # empty signs with a random per-process key (see app/tokens.py)
+ACCESS_TOKEN_TTL_SECONDS = int(os.getenv("ACCESS_TOKEN_TTL_SECONDS", str(7 * 24 * 3600)))
+
+# Approximate ranks for players the rank index cannot answer for (index warming, other workers)
+RANK_HISTOGRAM_TTL_SECONDS = float(os.getenv("RANK_HISTOGRAM_TTL_SECONDS", "30"))
+
+# In-process user cache settings
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "300"))
+
+# Cached list responses (leaderboard, spectate lobby)
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "1024"))
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "5"))  # bounds staleness across workers
+RESPONSE_CACHE_MAX_AGE_SECONDS = int(os.getenv("RESPONSE_CACHE_MAX_AGE_SECONDS", "1"))  # Cache-Control for proxies
+
+# Write-behind score ingestion (submissions acknowledged before they are written)
+SCORE_WRITE_BEHIND = os.getenv("SCORE_WRITE_BEHIND", "False").lower() == "true"
+SCORE_FLUSH_INTERVAL_MS = int(os.getenv("SCORE_FLUSH_INTERVAL_MS", "200"))
+SCORE_FLUSH_MAX_ITEMS = int(os.getenv("SCORE_FLUSH_MAX_ITEMS", "500"))
+SCORE_BUFFER_MAX_ITEMS = int(os.getenv("SCORE_BUFFER_MAX_ITEMS", "50000"))
+
+# Request metrics (GET /metrics, Prometheus text format)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "True").lower() == "true"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")  # bearer token for GET /metrics; empty falls back to ADMIN_TOKEN
+METRICS_SLOW_REQUEST_MS = float(os.getenv("METRICS_SLOW_REQUEST_MS", "0"))  # log requests slower than this; 0 disables
+
+# Admin-only profiling (sampling profiler endpoint, X-Profile per-request cProfile)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")  # empty disables admin endpoints
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "snake-arena-profiles"))
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "60"))
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "100"))  # older request profiles are deleted
+
+# Leaderboard history export (GET /leaderboard/export, export_leaderboard.py)
+EXPORT_PAGE_SIZE = int(os.getenv("EXPORT_PAGE_SIZE", "5000"))  # entries per keyset page
+
+# Score history retention (app/compaction.py): expired entries are archived and rolled into daily summaries
+COMPACTION_INTERVAL_SECONDS = float(os.getenv("COMPACTION_INTERVAL_SECONDS", "0"))  # background job; 0 disables
+COMPACTION_RETENTION_DAYS = int(os.getenv("COMPACTION_RETENTION_DAYS", "90"))
+COMPACTION_BATCH_SIZE = int(os.getenv("COMPACTION_BATCH_SIZE", "5000"))  # entries per transaction
+COMPACTION_PAUSE_MS = int(os.getenv("COMPACTION_PAUSE_MS", "50"))  # between batches
+COMPACTION_ARCHIVE_DIR = os.getenv("COMPACTION_ARCHIVE_DIR", "./archive")
+
+# Replay-verified score submissions
+SCORE_REQUIRE_REPLAY = os.getenv("SCORE_REQUIRE_REPLAY", "False").lower() == "true"  # reject scores without a replay
+SCORE_REPLAY_MAX_BYTES = int(os.getenv("SCORE_REPLAY_MAX_BYTES", "65536"))
+SCORE_GAME_TOKEN_TTL_SECONDS = int(os.getenv("SCORE_GAME_TOKEN_TTL_SECONDS", "7200"))  # time to finish and submit a started game
+SCORE_VERIFY_EXECUTOR = os.getenv("SCORE_VERIFY_EXECUTOR", "process")  # "thread" or "process"
+SCORE_VERIFY_WORKERS = int(os.getenv("SCORE_VERIFY_WORKERS", str(os.cpu_count() or 2)))
+SCORE_VERIFY_MAX_PENDING = int(os.getenv("SCORE_VERIFY_MAX_PENDING", "1024"))
+SCORE_VERIFY_MAX_TICKS = int(os.getenv("SCORE_VERIFY_MAX_TICKS", "200000"))  # longest replay accepted
+
+# Live game hosting and spectator streaming
+LIVE_TICK_MS = int(os.getenv("LIVE_TICK_MS", "150"))  # GAME_SPEED in the frontend
+LIVE_KEYFRAME_INTERVAL = int(os.getenv("LIVE_KEYFRAME_INTERVAL", "50"))  # ticks, at least 1
+LIVE_RESTART_DELAY_TICKS = int(os.getenv("LIVE_RESTART_DELAY_TICKS", "20"))
+LIVE_BOT_GAMES = int(os.getenv("LIVE_BOT_GAMES", "0"))
+LIVE_BOT_STRATEGY = os.getenv("LIVE_BOT_STRATEGY", "greedy")  # a name from app/bots.py BOTS
+LIVE_SAVE_REPLAYS = os.getenv("LIVE_SAVE_REPLAYS", "False").lower() == "true"  # store finished hosted games
+LIVE_SUBSCRIBER_QUEUE = int(os.getenv("LIVE_SUBSCRIBER_QUEUE", "32"))  # frames before a slow spectator is skipped to a keyframe
@@ -1,14 +1,50 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from .config import DATABASE_URL, SQLALCHEMY_ECHO
+from .config import (
+    DATABASE_URL, SQLALCHEMY_ECHO,
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_POOL_PRE_PING,
+    SQLITE_JOURNAL_MODE, SQLITE_SYNCHRONOUS, SQLITE_BUSY_TIMEOUT_MS, METRICS_ENABLED
+)
+from .metrics import instrument_engine
+
+def _engine_options(url: str) -> dict:
+    """Engine keyword arguments for the configured database"""
+    options = {"echo": SQLALCHEMY_ECHO}
+    if url.startswith("sqlite"):
+        options["connect_args"] = {"check_same_thread": False}
+        if ":memory:" in url or url.rstrip("/") == "sqlite:":
+            # In-memory databases live in a single connection; pooling does not apply
+            return options
+    options.update(
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+    )
+    return options
+
+def configure_sqlite_pragmas(engine):
+    """Apply journal, durability and lock-wait pragmas to every new SQLite connection"""
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+            cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+            cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        finally:
+            cursor.close()
 
 # Create SQLAlchemy engine
-engine = create_engine(
-    DATABASE_URL,
-    echo=SQLALCHEMY_ECHO,
-    connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
-)
+engine = create_engine(DATABASE_URL, **_engine_options(DATABASE_URL))
+configure_sqlite_pragmas(engine)
+if METRICS_ENABLED:
+    instrument_engine(engine)
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -31,5 +67,31 @@ def get_db():
 def init_db():
     """
     Initialize the database by creating all tables.
+    Tables that already exist are brought up to date with migrate_db().
     """
     Base.metadata.create_all(bind=engine)
+    migrate_db(engine)
+
+def migrate_db(bind):
+    """
+    Add the columns and indexes that models gained after their table was created.
+
+    create_all() only creates missing tables, so a database from an older
+    release keeps its old columns and indexes. New columns must be nullable;
+    they are added with ALTER TABLE and existing rows read them as NULL.
+    """
+    with bind.begin() as connection:
+        inspector = inspect(connection)
+        for table in Base.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                if not column.nullable:
+                    raise RuntimeError(f"{table.name}.{column.name} is NOT NULL and needs a manual migration")
+                ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(dialect=connection.dialect)}"
+                for foreign_key in column.foreign_keys:
+                    ddl += f" REFERENCES {foreign_key.column.table.name} ({foreign_key.column.name})"
+                connection.execute(text(ddl))
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
@@ -1,67 +1,252 @@
-from typing import List, Optional
-from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+from datetime import datetime, timedelta
+from sqlalchemy import bindparam, case, delete, func, insert, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
-import bcrypt
+from starlette.concurrency import run_in_threadpool
+import itertools
+import logging
+import threading
+import time
 import uuid
 
-from .models import Player, LeaderboardEntry, LiveGame, GameMode
-from .db_models import UserDB, LeaderboardEntryDB, LiveGameDB, GameModeEnum
+from .models import Player, GameMode, LeaderboardPeriod
+from .db_models import (
+    UserDB, LeaderboardEntryDB, LeaderboardBestDB, LeaderboardDailyDB, GameReplayDB, GameModeEnum
+)
 from .database import SessionLocal
+from .ranking import RankIndex, ScoreHistogram
+from .passwords import password_hasher
+from .profiling import run_profiled
+from .cache import TTLCache
+from .response_cache import LEADERBOARD, response_cache
+from .write_behind import ScoreBuffer, ScoreSubmission
+from .replay import ReplayReader, replay_digest
+from .config import (
+    USER_CACHE_SIZE, USER_CACHE_TTL_SECONDS, RANK_HISTOGRAM_TTL_SECONDS,
+    SCORE_FLUSH_INTERVAL_MS, SCORE_FLUSH_MAX_ITEMS, SCORE_BUFFER_MAX_ITEMS, EXPORT_PAGE_SIZE,
+    SCORE_VERIFY_MAX_TICKS
+)
+
+logger = logging.getLogger(__name__)
+
+# Every all-time best shares this period start
+ALL_TIME_START = datetime(1970, 1, 1)
+
+def period_start(period: LeaderboardPeriod, when: datetime) -> datetime:
+    """Start of the leaderboard period (UTC day, ISO week or all time) containing `when`"""
+    if period == LeaderboardPeriod.all:
+        return ALL_TIME_START
+    day = when.replace(hour=0, minute=0, second=0, microsecond=0)
+    if period == LeaderboardPeriod.week:
+        return day - timedelta(days=day.weekday())
+    return day
+
+def _upsert_insert(session: Session):
+    """INSERT construct with ON CONFLICT support for the session's database (SQLite or PostgreSQL)"""
+    if session.get_bind().dialect.name == "postgresql":
+        return postgresql.insert
+    return sqlite.insert
+
+def _chunks(values: list, size: int = 900) -> Iterator[list]:
+    """Split an IN list to stay under SQLite's limit on bound parameters per statement"""
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
 
 class Database:
     """Database operations using SQLAlchemy"""
     
     def __init__(self):
         """Initialize database connection"""
-        pass
+        self.rank_index = RankIndex()
+        self._rank_index_loaded = False
+        self._best_modes: Dict[str, GameMode] = {}
+        # _refresh_lock serializes rebuilds; _index_lock guards the index bookkeeping below
+        self._refresh_lock = threading.Lock()
+        self._index_lock = threading.Lock()
+        self._index_pending: Optional[List[Tuple[Player, Optional[GameMode]]]] = None
+        self._warmup: Optional[threading.Thread] = None
+        self.score_histogram = ScoreHistogram()
+        self._histogram_loaded_at: Optional[float] = None
+        self._histogram_lock = threading.Lock()
+        self.user_cache = TTLCache(USER_CACHE_SIZE, USER_CACHE_TTL_SECONDS)
+        self.score_buffer: Optional[ScoreBuffer] = None
+        self._score_lock = threading.Lock()
     
     def _get_session(self) -> Session:
         """Get a new database session"""
         return SessionLocal()
     
+    def _acquire_session(self, session: Optional[Session]) -> Tuple[Session, bool]:
+        """Use the caller's request-scoped session, or open a private one"""
+        if session is not None:
+            return session, False
+        return self._get_session(), True
+    
+    def _release_session(self, session: Session, owned: bool):
+        """Close a session opened by _acquire_session"""
+        if owned:
+            session.close()
+    
+    # In-process caches
+    def refresh_caches(self):
+        """Rebuild the in-process caches from the database"""
+        with self._refresh_lock:
+            self._refresh_caches()
+    
+    def _refresh_caches(self):
+        self.user_cache.clear()
+        with self._index_lock:
+            # Writes that land while the users table is being read are replayed afterwards
+            self._index_pending = []
+        session = self._get_session()
+        try:
+            # Presorting by score leaves the index build almost nothing to sort
+            rows = session.query(
+                UserDB.id, UserDB.username, UserDB.high_score,
+                UserDB.games_played, UserDB.last_played
+            ).order_by(UserDB.high_score.desc()).yield_per(10000)
+            players = [
+                Player(
+                    id=row.id,
+                    username=row.username,
+                    score=0,
+                    highScore=row.high_score or 0,
+                    gamesPlayed=row.games_played or 0,
+                    lastPlayed=row.last_played
+                )
+                for row in rows
+            ]
+            
+            # Mode in which each player set their all-time high score
+            best_modes = {}
+            best_scores = {}
+            rows = session.query(
+                LeaderboardBestDB.player_id, LeaderboardBestDB.mode, LeaderboardBestDB.score
+            ).filter(LeaderboardBestDB.period == LeaderboardPeriod.all.value).yield_per(10000)
+            for row in rows:
+                if row.score > best_scores.get(row.player_id, -1):
+                    best_scores[row.player_id] = row.score
+                    best_modes[row.player_id] = self._mode_from_db(row.mode)
+        except Exception:
+            with self._index_lock:
+                self._index_pending = None
+            raise
+        finally:
+            session.close()
+        
+        self.rank_index.load(players)
+        with self._index_lock:
+            for player, best_mode in self._index_pending:
+                self.rank_index.upsert(player)
+                if best_mode is not None:
+                    best_modes[player.id] = best_mode
+            self._index_pending = None
+            self._best_modes = best_modes
+            self._rank_index_loaded = True
+        response_cache.bump(LEADERBOARD)
+    
+    def warm_rank_index(self):
+        """
+        Build the rank index on a background thread. Until it is ready, leaderboard
+        and rank reads are answered from the database instead.
+        """
+        with self._index_lock:
+            if self._rank_index_loaded or self._warmup is not None:
+                return
+            self._warmup = threading.Thread(target=self._warm_rank_index, name="rank-index-warmup", daemon=True)
+            self._warmup.start()
+    
+    def _warm_rank_index(self):
+        started = time.monotonic()
+        try:
+            self.refresh_caches()
+            logger.info("Rank index warmed with %d players in %.1fs", len(self.rank_index), time.monotonic() - started)
+        except Exception:
+            logger.exception("Warming the rank index failed; leaderboard reads stay on the database")
+        finally:
+            with self._index_lock:
+                self._warmup = None
+    
+    def _ensure_rank_index(self, wait: bool = False) -> bool:
+        """Whether the rank index can serve reads; starts warming it on first use, or builds it inline with `wait`"""
+        if self._rank_index_loaded:
+            return True
+        if not wait:
+            self.warm_rank_index()
+            return False
+        with self._refresh_lock:
+            if not self._rank_index_loaded:
+                self._refresh_caches()
+        return True
+    
+    def _index_player(self, player: Player, best_mode: Optional[GameMode] = None):
+        """Apply a committed write to the rank index, including one made during a rebuild"""
+        with self._index_lock:
+            if best_mode is not None:
+                self._best_modes[player.id] = best_mode
+            if self._index_pending is not None:
+                self._index_pending.append((player, best_mode))
+            if self._rank_index_loaded:
+                # Concurrent submissions can arrive out of commit order; games_played only grows
+                current = self.rank_index.get(player.id)
+                if current is None or current.gamesPlayed <= player.gamesPlayed:
+                    self.rank_index.upsert(player)
+    
     # Password hashing methods
     def hash_password(self, password: str) -> str:
         """Hash a password using bcrypt"""
-        salt = bcrypt.gensalt()
-        hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-        return hashed.decode('utf-8')
+        return password_hasher.hash(password)
     
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
         """Verify a password against its hash"""
-        return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+        return password_hasher.verify(plain_password, hashed_password)
     
     # User/Player operations
-    def get_user_by_username(self, username: str) -> Optional[Player]:
+    def get_user_by_username(self, username: str, session: Optional[Session] = None) -> Optional[Player]:
         """Get user by username"""
-        session = self._get_session()
+        session, owned = self._acquire_session(session)
         try:
             user_db = session.query(UserDB).filter(UserDB.username == username).first()
             if not user_db:
                 return None
             return self._user_db_to_player(user_db)
         finally:
-            session.close()
+            self._release_session(session, owned)
     
-    def get_user_by_id(self, user_id: str) -> Optional[Player]:
-        """Get user by ID"""
-        session = self._get_session()
+    def get_user_by_id(self, user_id: str, session: Optional[Session] = None) -> Optional[Player]:
+        """Get user by ID, served from the user cache when possible"""
+        player = self.user_cache.get(user_id)
+        if player is not None:
+            return player
+        # A score written while this reads must not be overwritten by the older row
+        generation = self.user_cache.generation()
+        session, owned = self._acquire_session(session)
         try:
             user_db = session.query(UserDB).filter(UserDB.id == user_id).first()
             if not user_db:
                 return None
-            return self._user_db_to_player(user_db)
+            player = self._user_db_to_player(user_db)
+            self.user_cache.set(user_id, player, generation)
+            return player
         finally:
-            session.close()
+            self._release_session(session, owned)
     
-    def create_user(self, username: str, password: str = None) -> Player:
-        """Create a new user"""
-        session = self._get_session()
+    def get_cached_user(self, user_id: str) -> Optional[Player]:
+        """Get a user from the user cache without touching the database"""
+        return self.user_cache.get(user_id)
+    
+    def create_user(self, username: str, password: str = None, password_hash: str = None,
+                    session: Optional[Session] = None) -> Player:
+        """Create a new user, from a plain password or an already computed hash"""
+        session, owned = self._acquire_session(session)
         try:
             # Generate UUID for user ID
             user_id = str(uuid.uuid4())
             
             # Hash password (use default if not provided for backward compatibility)
-            password_hash = self.hash_password(password if password else "password123")
+            if password_hash is None:
+                password_hash = self.hash_password(password if password else "password123")
             
             user_db = UserDB(
                 id=user_id,
@@ -75,127 +260,677 @@ class Database:
             session.commit()
             session.refresh(user_db)
             
-            return self._user_db_to_player(user_db)
+            player = self._user_db_to_player(user_db)
+            self.user_cache.invalidate(user_id)
+            self._index_player(player)
+            return player
         finally:
-            session.close()
+            self._release_session(session, owned)
     
-    def authenticate_user(self, username: str, password: str) -> Optional[Player]:
+    def authenticate_user(self, username: str, password: str,
+                          session: Optional[Session] = None) -> Optional[Player]:
         """Authenticate a user by username and password"""
-        session = self._get_session()
+        credentials = self.get_credentials(username, session)
+        if not credentials:
+            return None
+        player, password_hash = credentials
+        if not self.verify_password(password, password_hash):
+            return None
+        return player
+    
+    def get_credentials(self, username: str, session: Optional[Session] = None) -> Optional[Tuple[Player, str]]:
+        """Get a user together with their password hash"""
+        session, owned = self._acquire_session(session)
         try:
             user_db = session.query(UserDB).filter(UserDB.username == username).first()
             if not user_db:
                 return None
-            if not self.verify_password(password, user_db.password_hash):
-                return None
-            return self._user_db_to_player(user_db)
+            return self._user_db_to_player(user_db), user_db.password_hash
         finally:
-            session.close()
+            self._release_session(session, owned)
     
     # Leaderboard operations
-    def get_top_scores(self, limit: int = 10) -> List[LeaderboardEntry]:
-        """Get top scores from leaderboard"""
-        session = self._get_session()
+    def get_top_scores(self, limit: int = 10, mode: Optional[GameMode] = None,
+                       period: LeaderboardPeriod = LeaderboardPeriod.all,
+                       session: Optional[Session] = None) -> List[dict]:
+        """
+        Get top scores, optionally for a single mode and/or the current day or week.
+        
+        The overall all-time board is served from the in-memory rank index; filtered
+        boards read the materialized leaderboard_bests table with a column-only join.
+        Entries are plain dicts shaped like LeaderboardEntry, ready to be serialized
+        without building a model per row.
+        """
+        if mode is None and period == LeaderboardPeriod.all:
+            if self._ensure_rank_index():
+                return [self._ranked_entry(rank, player) for rank, player in self.rank_index.top(limit)]
+            return self._ranked_users(limit, session=session)
+        
+        modes = [mode] if mode is not None else [GameMode.walls, GameMode.pass_through]
+        start = period_start(period, datetime.utcnow())
+        session, owned = self._acquire_session(session)
         try:
-            # Get users sorted by high score
-            users = session.query(UserDB).order_by(UserDB.high_score.desc()).limit(limit).all()
+            # Each player's best across modes is within the top `limit` of its own
+            # mode, so merging per-mode pages yields the exact combined page
+            best = {}
+            for board_mode in modes:
+                rows = (
+                    session.query(
+                        UserDB.id, UserDB.username, UserDB.high_score,
+                        UserDB.games_played, UserDB.last_played,
+                        LeaderboardBestDB.score, LeaderboardBestDB.mode, LeaderboardBestDB.timestamp
+                    )
+                    .join(UserDB, UserDB.id == LeaderboardBestDB.player_id)
+                    .filter(
+                        LeaderboardBestDB.mode == self._mode_to_db(board_mode),
+                        LeaderboardBestDB.period == period.value,
+                        LeaderboardBestDB.period_start == start
+                    )
+                    .order_by(LeaderboardBestDB.score.desc(), LeaderboardBestDB.timestamp)
+                    .limit(limit)
+                    .all()
+                )
+                for row in rows:
+                    current = best.get(row.id)
+                    if current is None or row.score > current.score:
+                        best[row.id] = row
             
+            ranked = sorted(best.values(), key=lambda row: (-row.score, row.timestamp))[:limit]
             entries = []
-            for i, user_db in enumerate(users):
-                player = self._user_db_to_player(user_db)
-                entry = LeaderboardEntry(
-                    rank=i + 1,
-                    player=player,
-                    score=user_db.high_score,
-                    mode=GameMode.walls,  # Default mode
-                    timestamp=user_db.last_played or datetime.utcnow()
+            for position, row in enumerate(ranked):
+                rank = position + 1
+                if entries and entries[-1]["score"] == row.score:
+                    rank = entries[-1]["rank"]
+                entries.append({
+                    "rank": rank,
+                    "player": {
+                        "id": row.id,
+                        "username": row.username,
+                        "score": 0,
+                        "highScore": row.high_score,
+                        "gamesPlayed": row.games_played,
+                        "lastPlayed": row.last_played
+                    },
+                    "score": row.score,
+                    "mode": self._mode_from_db(row.mode),
+                    "timestamp": row.timestamp
+                })
+            return entries
+        finally:
+            self._release_session(session, owned)
+    
+    def get_player_rank(self, user_id: str, session: Optional[Session] = None) -> Optional[int]:
+        """Get a player's current leaderboard rank"""
+        if self._ensure_rank_index():
+            rank = self.rank_index.rank_of(user_id)
+            if rank is not None:
+                return rank
+        
+        # Index still warming, or player unknown to this process (e.g. written by
+        # another worker): approximate from the score histogram
+        session, owned = self._acquire_session(session)
+        try:
+            high_score = session.query(UserDB.high_score).filter(UserDB.id == user_id).scalar()
+            if high_score is None:
+                return None
+            return self._score_histogram(session).rank_for_score(high_score)
+        finally:
+            self._release_session(session, owned)
+    
+    def _score_histogram(self, session: Session) -> ScoreHistogram:
+        """
+        The score histogram, reloaded when older than RANK_HISTOGRAM_TTL_SECONDS.
+        One caller reloads while the others keep using the previous snapshot.
+        """
+        loaded_at = self._histogram_loaded_at
+        if loaded_at is not None and time.monotonic() - loaded_at < RANK_HISTOGRAM_TTL_SECONDS:
+            return self.score_histogram
+        if not self._histogram_lock.acquire(blocking=loaded_at is None):
+            return self.score_histogram
+        try:
+            if self._histogram_loaded_at == loaded_at:
+                self.score_histogram.load(
+                    (score or 0, players)
+                    for score, players in session.query(UserDB.high_score, func.count()).group_by(UserDB.high_score)
                 )
-                entries.append(entry)
-            
+                self._histogram_loaded_at = time.monotonic()
+        finally:
+            self._histogram_lock.release()
+        return self.score_histogram
+    
+    def get_score_window(self, min_score: int, max_score: int, limit: int = 10) -> List[dict]:
+        """Get ranked players whose high score lies within [min_score, max_score]"""
+        if not self._ensure_rank_index():
+            return self._ranked_users(limit, min_score, max_score)
+        return [
+            self._ranked_entry(rank, player)
+            for rank, player in self.rank_index.score_window(min_score, max_score, limit)
+        ]
+    
+    def _ranked_users(self, limit: int, min_score: Optional[int] = None, max_score: Optional[int] = None,
+                      session: Optional[Session] = None) -> List[dict]:
+        """Rank index reads answered from the users table while the index warms"""
+        session, owned = self._acquire_session(session)
+        try:
+            query = session.query(
+                UserDB.id, UserDB.username, UserDB.high_score, UserDB.games_played, UserDB.last_played
+            )
+            if min_score is not None:
+                query = query.filter(UserDB.high_score >= min_score, UserDB.high_score <= max_score)
+            rows = query.order_by(UserDB.high_score.desc(), UserDB.id).limit(limit).all()
+            if not rows:
+                return []
+            before = 0
+            if max_score is not None:
+                before = session.query(func.count(UserDB.id)).filter(UserDB.high_score > rows[0].high_score).scalar()
+            entries = []
+            for position, row in enumerate(rows, start=before + 1):
+                player = Player(
+                    id=row.id,
+                    username=row.username,
+                    score=0,
+                    highScore=row.high_score or 0,
+                    gamesPlayed=row.games_played or 0,
+                    lastPlayed=row.last_played
+                )
+                rank = position
+                if entries and entries[-1]["score"] == player.highScore:
+                    rank = entries[-1]["rank"]
+                entries.append(self._ranked_entry(rank, player))
             return entries
+        finally:
+            self._release_session(session, owned)
+    
+    # Score history export
+    def get_entries_page(self, after_id: int = 0, limit: int = EXPORT_PAGE_SIZE,
+                         mode: Optional[GameMode] = None, since: Optional[datetime] = None,
+                         until: Optional[datetime] = None) -> List[tuple]:
+        """
+        Leaderboard entries with id > after_id in id order, as (id, player_id,
+        username, score, mode, timestamp, replay_id) tuples.
+    
+        Keyset pagination on the primary key: every page is one short indexed
+        query in its own session, so an export holds no connection or
+        transaction between pages and costs the same at any depth.
+        """
+        session = self._get_session()
+        try:
+            query = self._entry_rows_query(session).filter(LeaderboardEntryDB.id > after_id)
+            if mode is not None:
+                query = query.filter(LeaderboardEntryDB.mode == self._mode_to_db(mode))
+            if since is not None:
+                query = query.filter(LeaderboardEntryDB.timestamp >= since)
+            if until is not None:
+                query = query.filter(LeaderboardEntryDB.timestamp < until)
+            return self._entry_rows(query.order_by(LeaderboardEntryDB.id).limit(limit))
         finally:
             session.close()
     
-    def update_score(self, user_id: str, score: int, mode: GameMode) -> bool:
-        """Update user's score"""
+    def get_expired_entries(self, cutoff: datetime, limit: int) -> List[tuple]:
+        """
+        The oldest `limit` entries timestamped before `cutoff`, as get_entries_page tuples.
+        
+        Read through the (timestamp, id) index, so a call touches only the rows
+        it returns however many newer entries follow. Compaction deletes every
+        batch it reads, so the next call carries on where this one ended.
+        """
         session = self._get_session()
         try:
-            user_db = session.query(UserDB).filter(UserDB.id == user_id).first()
-            if not user_db:
-                return False
-            
-            # Update high score if new score is higher
-            if score > user_db.high_score:
-                user_db.high_score = score
-            
-            # Update games played and last played
-            user_db.games_played += 1
-            user_db.last_played = datetime.utcnow()
-            
-            # Create leaderboard entry
-            mode_enum = GameModeEnum.walls if mode == GameMode.walls else GameModeEnum.pass_through
-            entry = LeaderboardEntryDB(
-                player_id=user_id,
-                score=score,
-                mode=mode_enum,
-                timestamp=datetime.utcnow()
+            query = (
+                self._entry_rows_query(session)
+                .filter(LeaderboardEntryDB.timestamp < cutoff)
+                .order_by(LeaderboardEntryDB.timestamp, LeaderboardEntryDB.id)
+                .limit(limit)
             )
-            session.add(entry)
+            return self._entry_rows(query)
+        finally:
+            session.close()
+    
+    def _entry_rows_query(self, session: Session):
+        return session.query(
+            LeaderboardEntryDB.id, LeaderboardEntryDB.player_id, UserDB.username,
+            LeaderboardEntryDB.score, LeaderboardEntryDB.mode,
+            LeaderboardEntryDB.timestamp, LeaderboardEntryDB.replay_id
+        ).join(UserDB, UserDB.id == LeaderboardEntryDB.player_id)
+    
+    def _entry_rows(self, query) -> List[tuple]:
+        modes = {mode_enum: self._mode_from_db(mode_enum) for mode_enum in GameModeEnum}
+        return [
+            (entry_id, player_id, username, score, modes[mode_enum], timestamp, replay_id)
+            for entry_id, player_id, username, score, mode_enum, timestamp, replay_id in query
+        ]
+    
+    def iter_entries(self, after_id: int = 0, page_size: int = EXPORT_PAGE_SIZE,
+                     mode: Optional[GameMode] = None, since: Optional[datetime] = None,
+                     until: Optional[datetime] = None) -> Iterator[List[tuple]]:
+        """Yield every matching entry page by page (see get_entries_page); memory is bounded by one page"""
+        while True:
+            page = self.get_entries_page(after_id, page_size, mode, since, until)
+            if not page:
+                return
+            yield page
+            after_id = page[-1][0]
+    
+    # Score history compaction
+    def compact_entries(self, rows: List[tuple]):
+        """
+        Fold entries (as returned by get_entries_page) into leaderboard_daily and
+        delete them with their replays, in one short transaction. Callers archive
+        the rows and replays first.
+        """
+        daily = {}
+        for entry_id, player_id, _, score, mode, timestamp, _ in rows:
+            key = (player_id, self._mode_to_db(mode), period_start(LeaderboardPeriod.day, timestamp))
+            games, total, best, best_at = daily.get(key, (0, 0, -1, timestamp))
+            if score > best:
+                best, best_at = score, timestamp
+            daily[key] = (games + 1, total + score, best, best_at)
+        
+        players_by_day: Dict[datetime, set] = {}
+        for player_id, _, day in daily:
+            players_by_day.setdefault(day, set()).add(player_id)
+        
+        session = self._get_session()
+        try:
+            existing = {}
+            for day, players in players_by_day.items():
+                for chunk in _chunks(sorted(players)):
+                    existing.update(
+                        ((row.player_id, row.mode, row.day), row.id)
+                        for row in session.query(
+                            LeaderboardDailyDB.id, LeaderboardDailyDB.player_id,
+                            LeaderboardDailyDB.mode, LeaderboardDailyDB.day
+                        ).filter(LeaderboardDailyDB.day == day, LeaderboardDailyDB.player_id.in_(chunk))
+                    )
+            inserts = []
+            updates = []
+            for key, (games, total, best, best_at) in daily.items():
+                summary_id = existing.get(key)
+                if summary_id is None:
+                    player_id, mode_enum, day = key
+                    inserts.append({
+                        "player_id": player_id, "mode": mode_enum, "day": day, "games": games,
+                        "total_score": total, "best_score": best, "best_timestamp": best_at
+                    })
+                else:
+                    updates.append({
+                        "b_id": summary_id, "b_games": games, "b_total": total, "b_best": best, "b_best_at": best_at
+                    })
+            if inserts:
+                session.execute(insert(LeaderboardDailyDB), inserts)
+            if updates:
+                summaries = LeaderboardDailyDB.__table__
+                improved = summaries.c.best_score < bindparam("b_best")
+                session.execute(
+                    update(summaries)
+                    .where(summaries.c.id == bindparam("b_id"))
+                    .values(
+                        games=summaries.c.games + bindparam("b_games"),
+                        total_score=summaries.c.total_score + bindparam("b_total"),
+                        best_score=case((improved, bindparam("b_best")), else_=summaries.c.best_score),
+                        best_timestamp=case((improved, bindparam("b_best_at")), else_=summaries.c.best_timestamp)
+                    ),
+                    updates
+                )
             
+            for chunk in _chunks([row[0] for row in rows]):
+                session.execute(delete(LeaderboardEntryDB).where(LeaderboardEntryDB.id.in_(chunk)))
+            # Each stored replay belongs to the one entry that links to it
+            for chunk in _chunks([row[6] for row in rows if row[6] is not None]):
+                session.execute(delete(GameReplayDB).where(GameReplayDB.id.in_(chunk)))
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+    
+    def update_score(self, user_id: str, score: int, mode: GameMode,
+                     session: Optional[Session] = None, replay_id: Optional[int] = None) -> bool:
+        """
+        Update user's score, optionally linking the entry to a stored replay.
+        With write-behind on, raises ScoreBufferFull when the buffer cannot take it.
+        """
+        if self.score_buffer is not None:
+            return self._buffer_score(user_id, score, mode, session, replay_id)
+        
+        session, owned = self._acquire_session(session)
+        try:
+            written = self._write_score(session, user_id, score, mode, datetime.utcnow(), replay_id)
+            if written is None:
+                return False
             session.commit()
+            self._score_committed(mode, *written)
             return True
         except Exception as e:
             session.rollback()
             print(f"Error updating score: {e}")
             return False
+        finally:
+            self._release_session(session, owned)
+    
+    def _write_score(self, session: Session, user_id: str, score: int, mode: GameMode, now: datetime,
+                     replay_id: Optional[int] = None) -> Optional[Tuple[Player, bool]]:
+        """
+        Write one score without committing; returns the player as updated and whether
+        the score is a new high, or None when the user does not exist.
+        """
+        users = UserDB.__table__
+        
+        # Atomic increments: concurrent submissions for one user must not overwrite each other
+        raised = session.execute(
+            update(users)
+            .where(users.c.id == user_id, func.coalesce(users.c.high_score, 0) < score)
+            .values(high_score=score)
+        ).rowcount
+        played = session.execute(
+            update(users)
+            .where(users.c.id == user_id)
+            .values(games_played=users.c.games_played + 1, last_played=now)
+        ).rowcount
+        if not played:
+            return None
+        
+        # Create leaderboard entry
+        mode_enum = self._mode_to_db(mode)
+        entry = LeaderboardEntryDB(
+            player_id=user_id,
+            score=score,
+            mode=mode_enum,
+            timestamp=now,
+            replay_id=replay_id
+        )
+        session.add(entry)
+        self._record_bests(session, [ScoreSubmission(user_id, score, mode_enum, now)])
+        # Read back under this transaction's write lock, with every earlier submission applied
+        user_db = session.query(UserDB).filter(UserDB.id == user_id).populate_existing().one()
+        player = self._user_db_to_player(user_db)
+        new_high = raised or (user_id not in self._best_modes and score >= player.highScore)
+        return player, bool(new_high)
+    
+    def _score_committed(self, mode: GameMode, player: Player, new_high: bool):
+        """Bring the caches and rank index up to date with a committed _write_score"""
+        self.user_cache.invalidate(player.id)
+        self._index_player(player, mode if new_high else None)
+        response_cache.bump(LEADERBOARD)
+    
+    # Write-behind score ingestion
+    def start_write_behind(self, interval_ms: int = SCORE_FLUSH_INTERVAL_MS,
+                           max_batch: int = SCORE_FLUSH_MAX_ITEMS,
+                           max_items: int = SCORE_BUFFER_MAX_ITEMS):
+        """Buffer score submissions in memory and write them in bulk in the background"""
+        if self.score_buffer is None:
+            self.score_buffer = ScoreBuffer(self._persist_scores, interval_ms, max_batch, max_items)
+            self.score_buffer.start()
+    
+    def stop_write_behind(self):
+        """Flush buffered submissions and go back to writing each score directly"""
+        buffer, self.score_buffer = self.score_buffer, None
+        if buffer is not None:
+            buffer.stop()
+    
+    def flush_scores(self) -> int:
+        """Write out buffered submissions now; returns how many were written"""
+        return self.score_buffer.flush() if self.score_buffer is not None else 0
+    
+    def _buffer_score(self, user_id: str, score: int, mode: GameMode,
+                      session: Optional[Session] = None, replay_id: Optional[int] = None) -> bool:
+        """Apply a submission to the in-memory state and queue it for the database"""
+        self._ensure_rank_index(wait=True)
+        # Any database lookup happens before the lock, which every submitter shares
+        indexed = user_id in self.rank_index
+        stored = None if indexed else self.get_user_by_id(user_id, session)
+        if not indexed and stored is None:
+            return False
+        now = datetime.utcnow()
+        # Raises ScoreBufferFull before any in-memory state has changed
+        self.score_buffer.submit(ScoreSubmission(user_id, score, self._mode_to_db(mode), now, replay_id))
+        self._count_in_memory(user_id, score, mode, stored, now)
+        return True
+    
+    def _count_in_memory(self, user_id: str, score: int, mode: GameMode, stored: Optional[Player], now: datetime):
+        """Count a score in the rank index and user cache, which run ahead of the database under write-behind"""
+        with self._score_lock:
+            current = self.rank_index.get(user_id) or stored
+            new_high = score > current.highScore or (
+                user_id not in self._best_modes and score >= current.highScore
+            )
+            player = current.model_copy(update={
+                "highScore": max(current.highScore, score),
+                "gamesPlayed": current.gamesPlayed + 1,
+                "lastPlayed": now,
+            })
+            self._index_player(player, mode if new_high else None)
+            # The database lags behind until the next flush, so cache the fresh record
+            self.user_cache.set(user_id, player)
+            response_cache.bump(LEADERBOARD)
+    
+    def _persist_scores(self, batch: List[ScoreSubmission]):
+        """Write a batch of submissions in one transaction"""
+        session = self._get_session()
+        try:
+            session.execute(insert(LeaderboardEntryDB), [
+                {
+                    "player_id": item.user_id, "score": item.score, "mode": item.mode,
+                    "timestamp": item.timestamp, "replay_id": item.replay_id
+                }
+                for item in batch
+            ])
+            
+            # One high-score upsert per user, however many games they submitted
+            per_user = {}
+            for item in batch:
+                best, games, last = per_user.get(item.user_id, (item.score, 0, item.timestamp))
+                per_user[item.user_id] = (max(best, item.score), games + 1, max(last, item.timestamp))
+            users = UserDB.__table__
+            session.execute(
+                update(users)
+                .where(users.c.id == bindparam("b_id"))
+                .values(
+                    high_score=case(
+                        (users.c.high_score < bindparam("b_score"), bindparam("b_score")),
+                        else_=users.c.high_score
+                    ),
+                    games_played=users.c.games_played + bindparam("b_games"),
+                    last_played=bindparam("b_last")
+                ),
+                [
+                    {"b_id": user_id, "b_score": best, "b_games": games, "b_last": last}
+                    for user_id, (best, games, last) in per_user.items()
+                ]
+            )
+            
+            self._record_bests(session, batch)
+            session.commit()
+            # Day and week boards are read from leaderboard_bests, which only changes here
+            response_cache.bump(LEADERBOARD)
+        except Exception:
+            session.rollback()
+            raise
         finally:
             session.close()
     
-    # Live games operations
-    def get_live_games(self) -> List[LiveGame]:
-        """Get all live games"""
+    def _record_bests(self, session: Session, submissions: List[ScoreSubmission]):
+        """Raise the day, week and all-time bests touched by a set of submissions"""
+        best = {}
+        for item in submissions:
+            for period in LeaderboardPeriod:
+                key = (item.user_id, item.mode, period.value, period_start(period, item.timestamp))
+                if key not in best or item.score > best[key][0]:
+                    best[key] = (item.score, item.timestamp)
+        
+        rows = [
+            {
+                "player_id": user_id, "mode": mode_enum, "period": period,
+                "period_start": start, "score": score, "timestamp": when
+            }
+            for (user_id, mode_enum, period, start), (score, when) in best.items()
+        ]
+        # Upsert, so concurrent first submissions for one board row cannot collide
+        bests = LeaderboardBestDB.__table__
+        stmt = _upsert_insert(session)(bests)
+        session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["player_id", "mode", "period", "period_start"],
+                set_={"score": stmt.excluded.score, "timestamp": stmt.excluded.timestamp},
+                where=bests.c.score < stmt.excluded.score
+            ),
+            rows
+        )
+    
+    def rebuild_leaderboard_bests(self):
+        """
+        Recompute leaderboard_bests from the score history: the daily summaries
+        of compacted entries, then leaderboard_entries
+        """
         session = self._get_session()
         try:
-            games_db = session.query(LiveGameDB).all()
-            games = []
-            for game_db in games_db:
-                player = self._user_db_to_player(game_db.player)
-                mode = GameMode.walls if game_db.mode == GameModeEnum.walls else GameMode.pass_through
-                game = LiveGame(
-                    id=game_db.id,
-                    player=player,
-                    mode=mode,
-                    currentScore=game_db.current_score,
-                    startedAt=game_db.started_at,
-                    spectators=game_db.spectators
-                )
-                games.append(game)
-            return games
+            session.query(LeaderboardBestDB).delete()
+            bests = {}
+            compacted = session.query(
+                LeaderboardDailyDB.player_id, LeaderboardDailyDB.mode,
+                LeaderboardDailyDB.best_score.label("score"), LeaderboardDailyDB.best_timestamp.label("timestamp")
+            ).order_by(LeaderboardDailyDB.day, LeaderboardDailyDB.id).yield_per(10000)
+            rows = session.query(
+                LeaderboardEntryDB.player_id, LeaderboardEntryDB.mode,
+                LeaderboardEntryDB.score, LeaderboardEntryDB.timestamp
+            ).order_by(LeaderboardEntryDB.id).yield_per(10000)
+            for row in itertools.chain(compacted, rows):
+                when = row.timestamp or ALL_TIME_START
+                for period in LeaderboardPeriod:
+                    key = (row.player_id, row.mode, period.value, period_start(period, when))
+                    if key not in bests or row.score > bests[key][0]:
+                        bests[key] = (row.score, when)
+            session.bulk_insert_mappings(LeaderboardBestDB, [
+                {
+                    "player_id": player_id,
+                    "mode": mode_enum,
+                    "period": period,
+                    "period_start": start,
+                    "score": score,
+                    "timestamp": when
+                }
+                for (player_id, mode_enum, period, start), (score, when) in bests.items()
+            ])
+            session.commit()
+        finally:
+            session.close()
+        self.refresh_caches()
+    
+    # Replays
+    def save_replay(self, data: bytes, player_id: Optional[str] = None,
+                    session: Optional[Session] = None, digest: Optional[str] = None) -> int:
+        """Store a replay blob (see app/replay.py) and return its id; a stored digest must be unique"""
+        session, owned = self._acquire_session(session)
+        try:
+            replay_id = self._add_replay(session, data, player_id, digest)
+            session.commit()
+            return replay_id
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            self._release_session(session, owned)
+    
+    def _add_replay(self, session: Session, data: bytes, player_id: Optional[str], digest: Optional[str]) -> int:
+        """Insert a replay row without committing and return its id"""
+        reader = ReplayReader(data)
+        ticks = sum(1 for _ in reader.moves())
+        replay = GameReplayDB(
+            player_id=player_id,
+            mode=self._mode_to_db(reader.mode),
+            score=reader.score,
+            ticks=ticks,
+            data=data,
+            digest=digest
+        )
+        session.add(replay)
+        session.flush()
+        return replay.id
+    
+    def record_verified_score(self, user_id: str, score: int, mode: GameMode, replay: bytes) -> Optional[int]:
+        """
+        Store a verified submission's replay and its score in one transaction and
+        return the player's rank. Raises when either write fails, so a replay is
+        never kept without its score.
+        """
+        stored = None
+        if self.score_buffer is not None:
+            # Written directly, but counted on top of the buffered scores not yet in the database
+            self._ensure_rank_index(wait=True)
+            stored = self.rank_index.get(user_id) or self.get_user_by_id(user_id)
+        now = datetime.utcnow()
+        session = self._get_session()
+        try:
+            replay_id = self._add_replay(session, replay, user_id, replay_digest(replay, SCORE_VERIFY_MAX_TICKS))
+            written = self._write_score(session, user_id, score, mode, now, replay_id)
+            if written is None:
+                raise LookupError(f"User {user_id} not found")
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
         finally:
             session.close()
+        if self.score_buffer is not None:
+            self._count_in_memory(user_id, score, mode, stored, now)
+        else:
+            self._score_committed(mode, *written)
+        return self.get_player_rank(user_id)
     
-    def get_live_game(self, game_id: str) -> Optional[LiveGame]:
-        """Get a specific live game by ID"""
+    def get_replay_rows(self, replay_ids: List[int]) -> List[tuple]:
+        """Stored replays as (id, player_id, mode, score, ticks, created_at, data) tuples"""
         session = self._get_session()
         try:
-            game_db = session.query(LiveGameDB).filter(LiveGameDB.id == game_id).first()
-            if not game_db:
-                return None
-            
-            player = self._user_db_to_player(game_db.player)
-            mode = GameMode.walls if game_db.mode == GameModeEnum.walls else GameMode.pass_through
-            return LiveGame(
-                id=game_db.id,
-                player=player,
-                mode=mode,
-                currentScore=game_db.current_score,
-                startedAt=game_db.started_at,
-                spectators=game_db.spectators
-            )
+            rows = []
+            for chunk in _chunks(replay_ids):
+                rows.extend(
+                    (replay_id, player_id, self._mode_from_db(mode), score, ticks, created_at, data)
+                    for replay_id, player_id, mode, score, ticks, created_at, data in session.query(
+                        GameReplayDB.id, GameReplayDB.player_id, GameReplayDB.mode, GameReplayDB.score,
+                        GameReplayDB.ticks, GameReplayDB.created_at, GameReplayDB.data
+                    ).filter(GameReplayDB.id.in_(chunk))
+                )
+            return rows
         finally:
             session.close()
     
+    def replay_submitted(self, data: bytes, session: Optional[Session] = None) -> bool:
+        """Whether this game was already recorded with a score, however its replay is encoded"""
+        session, owned = self._acquire_session(session)
+        try:
+            digest = replay_digest(data, SCORE_VERIFY_MAX_TICKS)
+            return session.query(GameReplayDB.id).filter(GameReplayDB.digest == digest).first() is not None
+        finally:
+            self._release_session(session, owned)
+    
+    def get_replay(self, replay_id: int, session: Optional[Session] = None) -> Optional[bytes]:
+        """Get a stored replay blob"""
+        session, owned = self._acquire_session(session)
+        try:
+            return session.query(GameReplayDB.data).filter(GameReplayDB.id == replay_id).scalar()
+        finally:
+            self._release_session(session, owned)
+    
     # Helper methods
+    def _mode_to_db(self, mode: GameMode) -> GameModeEnum:
+        """Convert API game mode to the database enum"""
+        return GameModeEnum.walls if mode == GameMode.walls else GameModeEnum.pass_through
+    
+    def _mode_from_db(self, mode_enum: GameModeEnum) -> GameMode:
+        """Convert database game mode to the API enum"""
+        return GameMode.walls if mode_enum == GameModeEnum.walls else GameMode.pass_through
+    
+    def _ranked_entry(self, rank: int, player: Player) -> dict:
+        """Build a leaderboard entry dict around a rank index record"""
+        return {
+            "rank": rank,
+            "player": player,
+            "score": player.highScore,
+            "mode": self._best_modes.get(player.id, GameMode.walls),
+            "timestamp": player.lastPlayed or datetime.utcnow()
+        }
+    
     def _user_db_to_player(self, user_db: UserDB) -> Player:
         """Convert UserDB to Player Pydantic model"""
         return Player(
@@ -207,5 +942,76 @@ class Database:
             lastPlayed=user_db.last_played
         )
 
-# Global database instance
+class AsyncDatabase:
+    """
+    Awaitable facade over Database for use inside async request handlers.
+    
+    Each call runs the synchronous SQLAlchemy method on the worker threadpool, so
+    queries never block the event loop while the same engines, session factory and
+    in-memory indexes back both facades. Calls go through run_profiled so admin
+    requests sent with X-Profile capture them (see app/profiling.py).
+    """
+    
+    def __init__(self, database: Database):
+        self._db = database
+    
+    async def get_user_by_username(self, username: str, session: Optional[Session] = None) -> Optional[Player]:
+        return await run_in_threadpool(run_profiled, self._db.get_user_by_username, username, session)
+    
+    async def get_user_by_id(self, user_id: str, session: Optional[Session] = None) -> Optional[Player]:
+        # Cache hits skip the threadpool hop entirely
+        player = self._db.get_cached_user(user_id)
+        if player is not None:
+            return player
+        return await run_in_threadpool(run_profiled, self._db.get_user_by_id, user_id, session)
+    
+    # The auth calls take no request session: a bcrypt wait is 100-300ms, and no
+    # pooled connection or open transaction may be held across it
+    async def create_user(self, username: str, password: str = None) -> Player:
+        # bcrypt runs on the bounded password pool, not the shared threadpool
+        password_hash = await password_hasher.hash_async(password if password else "password123")
+        return await run_in_threadpool(run_profiled, self._db.create_user, username, None, password_hash)
+    
+    async def authenticate_user(self, username: str, password: str) -> Optional[Player]:
+        # The lookup's private session is closed before the hash is checked
+        credentials = await run_in_threadpool(run_profiled, self._db.get_credentials, username)
+        if not credentials:
+            return None
+        player, password_hash = credentials
+        if not await password_hasher.verify_async(password, password_hash):
+            return None
+        return player
+    
+    async def get_top_scores(self, limit: int = 10, mode: Optional[GameMode] = None,
+                             period: LeaderboardPeriod = LeaderboardPeriod.all,
+                             session: Optional[Session] = None) -> List[dict]:
+        return await run_in_threadpool(run_profiled, self._db.get_top_scores, limit, mode, period, session)
+    
+    async def get_player_rank(self, user_id: str, session: Optional[Session] = None) -> Optional[int]:
+        return await run_in_threadpool(run_profiled, self._db.get_player_rank, user_id, session)
+    
+    async def get_score_window(self, min_score: int, max_score: int, limit: int = 10) -> List[dict]:
+        return await run_in_threadpool(run_profiled, self._db.get_score_window, min_score, max_score, limit)
+    
+    async def get_entries_page(self, after_id: int = 0, limit: int = EXPORT_PAGE_SIZE,
+                               mode: Optional[GameMode] = None, since: Optional[datetime] = None,
+                               until: Optional[datetime] = None) -> List[tuple]:
+        return await run_in_threadpool(run_profiled, self._db.get_entries_page, after_id, limit, mode, since, until)
+    
+    async def update_score(self, user_id: str, score: int, mode: GameMode,
+                           session: Optional[Session] = None, replay_id: Optional[int] = None) -> bool:
+        return await run_in_threadpool(run_profiled, self._db.update_score, user_id, score, mode, session, replay_id)
+    
+    async def save_replay(self, data: bytes, player_id: Optional[str] = None,
+                          session: Optional[Session] = None) -> int:
+        return await run_in_threadpool(run_profiled, self._db.save_replay, data, player_id, session)
+    
+    async def replay_submitted(self, data: bytes, session: Optional[Session] = None) -> bool:
+        return await run_in_threadpool(run_profiled, self._db.replay_submitted, data, session)
+    
+    async def get_replay(self, replay_id: int, session: Optional[Session] = None) -> Optional[bytes]:
+        return await run_in_threadpool(run_profiled, self._db.get_replay, replay_id, session)
+
+# Global database instances
 db = Database()
+async_db = AsyncDatabase(db)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Index, LargeBinary, UniqueConstraint, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -16,7 +16,7 @@ class UserDB(Base):
     id = Column(String, primary_key=True, index=True)
     username = Column(String, unique=True, index=True, nullable=False)
     password_hash = Column(String, nullable=False)
-    high_score = Column(Integer, default=0)
+    high_score = Column(Integer, default=0, index=True)
     games_played = Column(Integer, default=0)
     last_played = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -34,9 +34,88 @@ class LeaderboardEntryDB(Base):
     score = Column(Integer, nullable=False)
     mode = Column(SQLEnum(GameModeEnum), nullable=False)
     timestamp = Column(DateTime, default=datetime.utcnow)
+    replay_id = Column(Integer, ForeignKey("game_replays.id"), nullable=True)
 
     # Relationships
     player = relationship("UserDB", back_populates="leaderboard_entries")
+    replay = relationship("GameReplayDB")
+
+    __table_args__ = (
+        Index("ix_leaderboard_entries_mode_score", "mode", score.desc(), "timestamp"),
+        # Retention reads the oldest entries first (app/compaction.py)
+        Index("ix_leaderboard_entries_timestamp", "timestamp", "id"),
+    )
+
+class GameReplayDB(Base):
+    """
+    SQLAlchemy model for recorded games.
+
+    `data` is the compact replay blob described in app/replay.py (seed plus
+    run-length encoded inputs); score and ticks are copied out for listing.
+    Games played by server-side bots have no player. Replays submitted with a
+    score carry their digest, so the same recording is only accepted once.
+    """
+    __tablename__ = "game_replays"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    player_id = Column(String, ForeignKey("users.id"), nullable=True, index=True)
+    mode = Column(SQLEnum(GameModeEnum), nullable=False)
+    score = Column(Integer, nullable=False)
+    ticks = Column(Integer, nullable=False)
+    data = Column(LargeBinary, nullable=False)
+    digest = Column(String(64), nullable=True, unique=True, index=True)  # SHA-256 of submitted replays
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class LeaderboardBestDB(Base):
+    """
+    SQLAlchemy model for materialized per-mode, per-period best scores.
+
+    One row per (player, mode, period, period_start), kept current by
+    Database.update_score so filtered leaderboards never scan leaderboard_entries.
+    """
+    __tablename__ = "leaderboard_bests"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    player_id = Column(String, ForeignKey("users.id"), nullable=False)
+    mode = Column(SQLEnum(GameModeEnum), nullable=False)
+    period = Column(String, nullable=False)
+    period_start = Column(DateTime, nullable=False)
+    score = Column(Integer, nullable=False)
+    timestamp = Column(DateTime, nullable=False)
+
+    # Relationships
+    player = relationship("UserDB")
+
+    __table_args__ = (
+        UniqueConstraint("player_id", "mode", "period", "period_start", name="uq_leaderboard_bests_player"),
+        Index("ix_leaderboard_bests_board", "mode", "period", "period_start", score.desc(), "timestamp"),
+    )
+
+class LeaderboardDailyDB(Base):
+    """
+    SQLAlchemy model for compacted score history.
+
+    One row per (player, mode, UTC day) summarizing leaderboard_entries rows
+    that app/compaction.py has archived and deleted; merged into when later
+    entries of the same day are compacted.
+    """
+    __tablename__ = "leaderboard_daily"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    player_id = Column(String, ForeignKey("users.id"), nullable=False)
+    mode = Column(SQLEnum(GameModeEnum), nullable=False)
+    day = Column(DateTime, nullable=False)
+    games = Column(Integer, nullable=False)
+    total_score = Column(Integer, nullable=False)
+    best_score = Column(Integer, nullable=False)
+    best_timestamp = Column(DateTime, nullable=False)
+
+    # Relationships
+    player = relationship("UserDB")
+
+    __table_args__ = (
+        UniqueConstraint("player_id", "mode", "day", name="uq_leaderboard_daily_player"),
+    )
 
 class LiveGameDB(Base):
     """SQLAlchemy model for live games"""
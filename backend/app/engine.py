@@ -0,0 +1,170 @@
+"""
+Server-side snake simulation.
+
+A Python port of the rules in frontend/src/lib/game/gameLogic.ts (moveSnake,
+generateFood, isPositionOnSnake). The body is a deque of cell indices and an
+occupancy bytearray mirrors it, so collision and food placement checks are O(1)
+instead of scanning the snake. Food placement draws from a seeded Mulberry32
+generator rather than Math.random, so a game is fully determined by its seed and
+the per-tick inputs and can be replayed to validate a submitted score.
+"""
+from collections import deque
+from typing import Deque, Iterable, List, Optional, Tuple
+
+from .models import GameMode
+
+# Mirrors frontend/src/lib/game/constants.ts
+GRID_SIZE = 20
+INITIAL_SNAKE_LENGTH = 3
+INITIAL_DIRECTION = "right"
+FOOD_SCORE = 10
+
+DIRECTIONS = {
+    "up": (0, -1),
+    "down": (0, 1),
+    "left": (-1, 0),
+    "right": (1, 0),
+}
+
+OPPOSITE_DIRECTIONS = {
+    "up": "down",
+    "down": "up",
+    "left": "right",
+    "right": "left",
+}
+
+
+class Mulberry32:
+    """
+    Small seeded PRNG with a trivial JavaScript equivalent, so clients can
+    reproduce server food placement exactly:
+
+        t = (s += 0x6D2B79F5); t = Math.imul(t ^ t >>> 15, t | 1);
+        t ^= t + Math.imul(t ^ t >>> 7, t | 61);
+        return ((t ^ t >>> 14) >>> 0) / 4294967296;
+    """
+    __slots__ = ("state",)
+
+    def __init__(self, seed: int):
+        self.state = seed & 0xFFFFFFFF
+
+    def random(self) -> float:
+        self.state = (self.state + 0x6D2B79F5) & 0xFFFFFFFF
+        t = self.state
+        t = ((t ^ (t >> 15)) * (t | 1)) & 0xFFFFFFFF
+        t ^= (t + (((t ^ (t >> 7)) * (t | 61)) & 0xFFFFFFFF)) & 0xFFFFFFFF
+        return ((t ^ (t >> 14)) & 0xFFFFFFFF) / 4294967296
+
+
+class SnakeGame:
+    """State of a single snake game, advanced one tick at a time with step()"""
+    __slots__ = (
+        "mode", "seed", "grid_size", "rng", "body", "occupied",
+        "direction", "food", "score", "is_game_over", "ticks",
+    )
+
+    def __init__(self, mode: GameMode = GameMode.walls, seed: int = 0, grid_size: int = GRID_SIZE):
+        self.mode = GameMode(mode)
+        self.seed = seed
+        self.grid_size = grid_size
+        self.rng = Mulberry32(seed)
+        self.body: Deque[int] = deque()
+        self.occupied = bytearray(grid_size * grid_size)
+        self.direction = INITIAL_DIRECTION
+        self.score = 0
+        self.is_game_over = False
+        self.ticks = 0
+
+        start_x = grid_size // 2
+        start_y = grid_size // 2
+        for i in range(INITIAL_SNAKE_LENGTH):
+            cell = start_y * grid_size + (start_x - i)
+            self.body.append(cell)
+            self.occupied[cell] = 1
+        self.food: Optional[int] = self._generate_food()
+
+    # Queries
+    @property
+    def head(self) -> int:
+        return self.body[0]
+
+    def position(self, cell: int) -> Tuple[int, int]:
+        """Convert a cell index to (x, y)"""
+        return cell % self.grid_size, cell // self.grid_size
+
+    def is_position_on_snake(self, x: int, y: int) -> bool:
+        return self.occupied[y * self.grid_size + x] == 1
+
+    def snake(self) -> List[Tuple[int, int]]:
+        """Body segments as (x, y), head first"""
+        return [self.position(cell) for cell in self.body]
+
+    # Simulation
+    def step(self, new_direction: Optional[str] = None) -> bool:
+        """
+        Advance one tick, optionally turning first. Mirrors moveSnake: reversing
+        into the snake is ignored for that tick. Returns False once the game is over.
+        """
+        if self.is_game_over:
+            return False
+        if new_direction is not None and OPPOSITE_DIRECTIONS[self.direction] == new_direction:
+            return True
+        direction = new_direction or self.direction
+
+        size = self.grid_size
+        head = self.body[0]
+        dx, dy = DIRECTIONS[direction]
+        x = head % size + dx
+        y = head // size + dy
+
+        if self.mode == GameMode.pass_through:
+            x %= size
+            y %= size
+        elif x < 0 or x >= size or y < 0 or y >= size:
+            self.is_game_over = True
+            return False
+
+        new_head = y * size + x
+        # Like isPositionOnSnake, this includes the tail cell that is about to move
+        if self.occupied[new_head]:
+            self.is_game_over = True
+            return False
+
+        self.direction = direction
+        self.ticks += 1
+        self.body.appendleft(new_head)
+        self.occupied[new_head] = 1
+
+        if new_head == self.food:
+            self.score += FOOD_SCORE
+            self.food = self._generate_food()
+        else:
+            self.occupied[self.body.pop()] = 0
+        return True
+
+    def _generate_food(self) -> Optional[int]:
+        """Rejection-sample a free cell, as generateFood does; None once the board is full"""
+        size = self.grid_size
+        if len(self.body) >= size * size:
+            return None
+        rng = self.rng
+        while True:
+            x = int(rng.random() * size)
+            y = int(rng.random() * size)
+            cell = y * size + x
+            if not self.occupied[cell]:
+                return cell
+
+
+def replay_game(seed: int, mode: GameMode, moves: Iterable[Optional[str]]) -> SnakeGame:
+    """Replay per-tick inputs (a direction or None to keep going) from a seed"""
+    game = SnakeGame(mode, seed)
+    for move in moves:
+        if not game.step(move):
+            break
+    return game
+
+
+def validate_score(seed: int, mode: GameMode, moves: Iterable[Optional[str]], claimed_score: int) -> bool:
+    """Check that replaying the inputs reproduces the claimed score"""
+    return replay_game(seed, mode, moves).score == claimed_score
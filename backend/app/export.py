@@ -0,0 +1,47 @@
+"""
+Encoders for leaderboard history exports.
+
+Entries arrive a page at a time from Database.get_entries_page() and each page
+is encoded into one chunk, so an export of any size is streamed with one page
+in memory. NDJSON lines use the API's field names; CSV has the same columns
+with a header row. Both carry the entry id, which the next request can pass as
+`after_id` to resume an interrupted export.
+"""
+import csv
+import io
+from typing import List
+
+from pydantic_core import to_json
+
+from .models import ExportFormat
+
+EXPORT_FIELDS = ("id", "playerId", "username", "score", "mode", "timestamp", "replayId")
+
+MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv; charset=utf-8",
+}
+
+
+def csv_header() -> bytes:
+    return (",".join(EXPORT_FIELDS) + "\r\n").encode()
+
+
+def encode_page(rows: List[tuple], export_format: ExportFormat) -> bytes:
+    """Encode one page of (id, player_id, username, score, mode, timestamp, replay_id) rows"""
+    if export_format == ExportFormat.ndjson:
+        return b"".join(
+            to_json({
+                "id": entry_id, "playerId": player_id, "username": username, "score": score,
+                "mode": mode, "timestamp": timestamp, "replayId": replay_id,
+            }) + b"\n"
+            for entry_id, player_id, username, score, mode, timestamp, replay_id in rows
+        )
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows(
+        (entry_id, player_id, username, score, mode.value,
+         timestamp.isoformat() if timestamp is not None else "", "" if replay_id is None else replay_id)
+        for entry_id, player_id, username, score, mode, timestamp, replay_id in rows
+    )
+    return buffer.getvalue().encode()
@@ -0,0 +1,119 @@
+"""
+Binary frame format for streaming live games to spectators.
+
+All integers are big-endian; cells are indices y * grid_size + x.
+
+Keyframe (full state, sent on join and periodically):
+    u8  type = 1
+    u32 tick
+    u8  grid_size
+    u8  flags        (bit 2: game over)
+    u16 food         (0xFFFF when there is none)
+    u32 score
+    u16 length
+    u16 cells[length]  head first
+
+Delta (one tick, 8 or 10 bytes however long the snake is):
+    u8  type = 2
+    u32 tick
+    u16 head         new head cell
+    u8  flags        bit 0: tail removed, bit 1: food changed, bit 2: game over
+    u16 food         only present when bit 1 is set
+
+A delta without bit 0 means the snake grew, which is worth FOOD_SCORE points.
+"""
+import struct
+from collections import deque
+from typing import Deque, Optional
+
+from .engine import FOOD_SCORE, SnakeGame
+
+KEYFRAME = 1
+DELTA = 2
+
+FLAG_TAIL_REMOVED = 0x01
+FLAG_FOOD_CHANGED = 0x02
+FLAG_GAME_OVER = 0x04
+
+NO_FOOD = 0xFFFF
+
+_KEYFRAME_HEADER = struct.Struct(">BIBBHIH")
+_DELTA = struct.Struct(">BIHB")
+_CELL = struct.Struct(">H")
+
+
+def encode_keyframe(game: SnakeGame, tick: int) -> bytes:
+    """Serialize the full state of a game"""
+    flags = FLAG_GAME_OVER if game.is_game_over else 0
+    food = NO_FOOD if game.food is None else game.food
+    header = _KEYFRAME_HEADER.pack(KEYFRAME, tick, game.grid_size, flags, food, game.score, len(game.body))
+    return header + struct.pack(f">{len(game.body)}H", *game.body)
+
+
+def encode_delta(tick: int, head: int, tail_removed: bool, food: Optional[int] = None,
+                 food_changed: bool = False, game_over: bool = False) -> bytes:
+    """Serialize one tick of changes"""
+    flags = (
+        (FLAG_TAIL_REMOVED if tail_removed else 0)
+        | (FLAG_FOOD_CHANGED if food_changed else 0)
+        | (FLAG_GAME_OVER if game_over else 0)
+    )
+    frame = _DELTA.pack(DELTA, tick, head, flags)
+    if food_changed:
+        frame += _CELL.pack(NO_FOOD if food is None else food)
+    return frame
+
+
+def step_frame(game: SnakeGame, tick: int, move: Optional[str] = None) -> Optional[bytes]:
+    """Advance a game by one input and encode the delta, or None if nothing moved"""
+    length, food, moves = len(game.body), game.food, game.ticks
+    game.step(move)
+    if game.is_game_over:
+        return encode_delta(tick, game.head, tail_removed=False, game_over=True)
+    if game.ticks == moves:
+        # A reversal was ignored, so nothing moved
+        return None
+    grew = len(game.body) > length
+    return encode_delta(
+        tick, game.head, tail_removed=not grew,
+        food=game.food, food_changed=game.food != food
+    )
+
+
+class SpectatorView:
+    """Client-side reconstruction of a game from a frame stream"""
+
+    def __init__(self):
+        self.tick = -1
+        self.grid_size = 0
+        self.body: Deque[int] = deque()
+        self.food: Optional[int] = None
+        self.score = 0
+        self.is_game_over = False
+
+    def apply(self, frame: bytes):
+        """Apply a keyframe or delta"""
+        if frame[0] == KEYFRAME:
+            _, tick, grid_size, flags, food, score, length = _KEYFRAME_HEADER.unpack_from(frame)
+            self.tick = tick
+            self.grid_size = grid_size
+            self.food = None if food == NO_FOOD else food
+            self.score = score
+            self.is_game_over = bool(flags & FLAG_GAME_OVER)
+            self.body = deque(struct.unpack_from(f">{length}H", frame, _KEYFRAME_HEADER.size))
+        elif frame[0] == DELTA:
+            _, tick, head, flags = _DELTA.unpack_from(frame)
+            self.tick = tick
+            if flags & FLAG_GAME_OVER:
+                self.is_game_over = True
+                return
+            self.body.appendleft(head)
+            if flags & FLAG_TAIL_REMOVED:
+                self.body.pop()
+            else:
+                self.score += FOOD_SCORE
+            if flags & FLAG_FOOD_CHANGED:
+                food = _CELL.unpack_from(frame, _DELTA.size)[0]
+                self.food = None if food == NO_FOOD else food
+        else:
+            raise ValueError(f"Unknown frame type {frame[0]}")
@@ -0,0 +1,190 @@
+import asyncio
+import random
+import threading
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from .bots import GreedyBot
+from .broadcast import BroadcastHub, Subscription
+from .config import LIVE_TICK_MS, LIVE_KEYFRAME_INTERVAL, LIVE_RESTART_DELAY_TICKS, LIVE_SUBSCRIBER_QUEUE
+from .engine import SnakeGame
+from .frames import encode_keyframe, step_frame
+from .live_registry import LiveGameRegistry, live_registry
+from .models import GameMode, LiveGame, Player
+from .replay import ReplayRecorder
+
+
+class LiveGameSession:
+    """
+    A server-hosted game: the engine state, its input source and the replay
+    being recorded. `persist` is False for players without a users row (bots),
+    whose replays are stored without a player.
+    """
+
+    def __init__(self, game_id: str, player: Player, mode: GameMode, controller,
+                 seed: Optional[int] = None, persist: bool = True):
+        self.id = game_id
+        self.player = player
+        self.mode = mode
+        self.controller = controller
+        self.persist = persist
+        self.tick = 0
+        self.finished_replay: Optional[bytes] = None
+        self._restart_in = 0
+        self._new_game(seed)
+
+    def _new_game(self, seed: Optional[int] = None):
+        self.seed = seed if seed is not None else random.getrandbits(32)
+        self.game = SnakeGame(self.mode, self.seed)
+        self.recorder = ReplayRecorder(self.seed, self.mode, self.game.grid_size)
+        self.started_at = datetime.utcnow()
+
+    def keyframe(self) -> bytes:
+        return encode_keyframe(self.game, self.tick)
+
+    def advance(self) -> Optional[bytes]:
+        """Run one tick and return the frame describing it, if anything changed"""
+        self.tick += 1
+        game = self.game
+        if game.is_game_over:
+            self._restart_in -= 1
+            if self._restart_in > 0:
+                return None
+            self._new_game()
+            return self.keyframe()
+
+        move = self.controller.next_move(game)
+        self.recorder.record(move)
+        frame = step_frame(game, self.tick, move)
+        if game.is_game_over:
+            self._restart_in = LIVE_RESTART_DELAY_TICKS
+            self.finished_replay = self.recorder.finish(game.score)
+        return frame
+
+
+class LiveGameManager:
+    """
+    Hosts live games in-process and streams their frames to spectators.
+
+    Every tick each session advances once and the resulting delta is encoded
+    once and fanned out through the broadcast hub; a full keyframe is sent on
+    join, every LIVE_KEYFRAME_INTERVAL ticks, and to any spectator that fell
+    LIVE_SUBSCRIBER_QUEUE frames behind. When a game ends its replay is handed
+    to `on_replay(session, data)`, if set; it runs on the ticking thread, so it
+    should only schedule the write.
+    """
+
+    def __init__(self, tick_ms: int = LIVE_TICK_MS, keyframe_interval: int = LIVE_KEYFRAME_INTERVAL,
+                 subscriber_queue: int = LIVE_SUBSCRIBER_QUEUE, registry: Optional[LiveGameRegistry] = None):
+        self.tick_ms = tick_ms
+        # A keyframe every tick at most; 0 would divide by zero in tick()
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.hub = BroadcastHub(max_queue=subscriber_queue)
+        self.registry = registry if registry is not None else live_registry
+        self.sessions: Dict[str, LiveGameSession] = {}
+        self.on_replay: Optional[Callable[[LiveGameSession, bytes], None]] = None
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def get(self, game_id: str) -> Optional[LiveGameSession]:
+        return self.sessions.get(game_id)
+
+    def add_session(self, session: LiveGameSession) -> LiveGameSession:
+        """Host a session and list it in the lobby"""
+        with self._lock:
+            self.sessions[session.id] = session
+        self.registry.add(LiveGame(
+            id=session.id,
+            player=session.player,
+            mode=session.mode,
+            currentScore=session.game.score,
+            startedAt=session.started_at,
+            spectators=0,
+        ))
+        return session
+
+    def remove_session(self, game_id: str):
+        with self._lock:
+            self.sessions.pop(game_id, None)
+        self.hub.close(game_id)
+        self.registry.remove(game_id)
+
+    def create_bot_game(self, mode: GameMode = GameMode.walls, seed: Optional[int] = None,
+                        controller=None) -> LiveGameSession:
+        """Host a game played by a server-side bot"""
+        controller = controller or GreedyBot()
+        bot_id = f"bot-{uuid.uuid4().hex[:8]}"
+        player = Player(
+            id=bot_id,
+            username=f"{controller.name.title()}Bot-{bot_id[-4:]}",
+            score=0,
+            highScore=0,
+            gamesPlayed=0,
+        )
+        return self.add_session(LiveGameSession(str(uuid.uuid4()), player, mode, controller, seed, persist=False))
+
+    # Spectators
+    def subscribe(self, game_id: str) -> Optional[Subscription]:
+        """Register a spectator; its queue starts with a keyframe"""
+        with self._lock:
+            session = self.sessions.get(game_id)
+            if session is None:
+                return None
+            subscription = self.hub.subscribe(game_id, initial=session.keyframe())
+        self.registry.set_spectators(game_id, self.hub.spectators(game_id))
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self.hub.unsubscribe(subscription)
+        self.registry.set_spectators(subscription.channel, self.hub.spectators(subscription.channel))
+
+    def spectators(self, game_id: str) -> int:
+        return self.hub.spectators(game_id)
+
+    # Simulation loop
+    def tick(self):
+        """Advance every hosted game by one tick and publish its frame"""
+        with self._lock:
+            sessions = list(self.sessions.values())
+        for session in sessions:
+            started_at = session.started_at
+            frame = session.advance()
+            replay, session.finished_replay = session.finished_replay, None
+            if replay is not None and self.on_replay is not None:
+                self.on_replay(session, replay)
+            self.registry.update_score(
+                session.id, session.game.score,
+                session.started_at if session.started_at is not started_at else None
+            )
+            is_keyframe = session.tick % self.keyframe_interval == 0
+            if is_keyframe:
+                frame = session.keyframe()
+            if frame is None:
+                continue
+            self.hub.publish(session.id, frame, session.keyframe, is_keyframe)
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        while True:
+            self.tick()
+            next_tick += self.tick_ms / 1000
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self):
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+
+# Global live game manager
+live_manager = LiveGameManager()
@@ -0,0 +1,74 @@
+import heapq
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from .models import LiveGame, LiveGameSort
+from .response_cache import LIVE_GAMES, response_cache
+
+_SORT_KEYS = {
+    LiveGameSort.score: lambda game: (game.currentScore, game.spectators),
+    LiveGameSort.spectators: lambda game: (game.spectators, game.currentScore),
+    LiveGameSort.recent: lambda game: game.startedAt,
+}
+
+
+class LiveGameRegistry:
+    """
+    In-process registry of the games currently being played.
+
+    The spectate lobby is listed from here instead of querying live_games on
+    every poll. Running games update their score and spectator count in place
+    (a dict lookup and an attribute write), and listing sorts a snapshot with a
+    bounded heap so a page costs O(n log(offset + limit)). Every visible change
+    invalidates the cached lobby responses; ticks that change nothing do not.
+    Hosted games live only as long as this process, so nothing is persisted.
+    """
+
+    def __init__(self):
+        self._games: Dict[str, LiveGame] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._games)
+
+    def add(self, game: LiveGame):
+        with self._lock:
+            self._games[game.id] = game
+        response_cache.bump(LIVE_GAMES)
+
+    def remove(self, game_id: str):
+        with self._lock:
+            self._games.pop(game_id, None)
+        response_cache.bump(LIVE_GAMES)
+
+    def get(self, game_id: str) -> Optional[LiveGame]:
+        return self._games.get(game_id)
+
+    def update_score(self, game_id: str, score: int, started_at: Optional[datetime] = None):
+        """Record a running game's score; `started_at` marks a restart"""
+        game = self._games.get(game_id)
+        if game is None or (score == game.currentScore and started_at is None):
+            return
+        game.currentScore = score
+        if started_at is not None:
+            game.startedAt = started_at
+        response_cache.bump(LIVE_GAMES)
+
+    def set_spectators(self, game_id: str, spectators: int):
+        game = self._games.get(game_id)
+        if game is not None and game.spectators != spectators:
+            game.spectators = spectators
+            response_cache.bump(LIVE_GAMES)
+
+    def list(self, sort: LiveGameSort = LiveGameSort.score, offset: int = 0, limit: int = 50) -> List[LiveGame]:
+        """A page of live games, best first for score and spectators, newest first for recent"""
+        if limit <= 0:
+            return []
+        games = list(self._games.values())
+        top = heapq.nlargest(offset + limit, games, key=_SORT_KEYS[sort])
+        return top[offset:]
+
+
+# Global live game registry
+live_registry = LiveGameRegistry()
@@ -0,0 +1,270 @@
+"""
+Request, database and worker pool instrumentation, exposed in the Prometheus
+text format.
+
+MetricsMiddleware times every HTTP request by route template and, through a
+context variable that follows the request into the threadpool, attributes the
+SQL statements counted by instrument_engine() to it. Worker pool figures
+(bcrypt, replay verification) are read from their stats() at scrape time.
+No client library is needed: the registry renders the text format itself.
+"""
+import bisect
+import contextvars
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+
+from .config import METRICS_SLOW_REQUEST_MS
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds, from cached reads to bcrypt-bound requests
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+@dataclass
+class RequestStats:
+    """Database work done on behalf of one request"""
+    queries: int = 0
+    db_seconds: float = 0.0
+
+
+_request_stats: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar(
+    "request_stats", default=None
+)
+
+
+class Histogram:
+    """Cumulative-bucket histogram; observe() is a bisect and three additions"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+class MetricsRegistry:
+    """Counters, gauges and histograms keyed by metric name and label set"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._help: Dict[str, Tuple[str, str]] = {}
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._collectors: List[Callable[[], List[Tuple[str, str, str, Dict[Labels, float]]]]] = []
+
+    def describe(self, name: str, kind: str, help_text: str):
+        self._help[name] = (kind, help_text)
+
+    def inc(self, name: str, value: float = 1.0, labels: Labels = ()):
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[labels] = series.get(labels, 0.0) + value
+
+    def observe(self, name: str, value: float, labels: Labels = ()):
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(labels)
+            if histogram is None:
+                histogram = series[labels] = Histogram()
+            histogram.observe(value)
+
+    def add_collector(self, collector: Callable[[], List[Tuple[str, str, str, Dict[Labels, float]]]]):
+        """Register a callable returning (name, type, help, {labels: value}) samples at scrape time"""
+        self._collectors.append(collector)
+
+    def value(self, name: str, labels: Labels = ()) -> float:
+        """Current counter value (tests and debugging)"""
+        with self._lock:
+            return self._counters.get(name, {}).get(labels, 0.0)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def render(self) -> str:
+        """The Prometheus text exposition format (version 0.0.4)"""
+        lines: List[str] = []
+
+        def header(name: str, kind: str, help_text: str):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            histograms = {
+                name: {labels: (list(h.counts), h.sum, h.count, h.buckets) for labels, h in series.items()}
+                for name, series in self._histograms.items()
+            }
+
+        for name, series in sorted(counters.items()):
+            header(name, *self._help.get(name, ("counter", name)))
+            for labels, value in series.items():
+                lines.append(f"{name}{_format_labels(labels)} {value:g}")
+
+        for name, series in sorted(histograms.items()):
+            header(name, *self._help.get(name, ("histogram", name)))
+            for labels, (counts, total, count, buckets) in series.items():
+                cumulative = 0
+                for bound, bucket_count in zip(buckets + (float("inf"),), counts):
+                    cumulative += bucket_count
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    lines.append(f"{name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {total:g}")
+                lines.append(f"{name}_count{_format_labels(labels)} {count}")
+
+        for collector in self._collectors:
+            try:
+                samples = collector()
+            except Exception:
+                logger.exception("Metrics collector failed")
+                continue
+            for name, kind, help_text, series in samples:
+                header(name, kind, help_text)
+                for labels, value in series.items():
+                    lines.append(f"{name}{_format_labels(labels)} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+metrics.describe("http_request_duration_seconds", "histogram", "HTTP request latency by route")
+metrics.describe("http_request_db_queries_total", "counter", "SQL statements executed while serving requests, by route")
+metrics.describe("http_request_db_seconds_total", "counter", "Time spent in SQL statements while serving requests, by route")
+metrics.describe("http_slow_requests_total", "counter", "Requests slower than METRICS_SLOW_REQUEST_MS, by route")
+metrics.describe("db_queries_total", "counter", "SQL statements executed, including background work")
+metrics.describe("db_query_duration_seconds", "histogram", "SQL statement latency")
+metrics.describe("db_pool_checkout_duration_seconds", "histogram", "Time to obtain a pooled database connection")
+
+
+# Database instrumentation
+def instrument_engine(engine):
+    """Count and time every statement and connection checkout on `engine` (idempotent)"""
+    if getattr(engine, "_metrics_instrumented", False):
+        return
+    engine._metrics_instrumented = True
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        metrics.inc("db_queries_total")
+        metrics.observe("db_query_duration_seconds", elapsed)
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += elapsed
+
+    # Pools have no event before a checkout starts waiting, so time connect() itself
+    pool = engine.pool
+    connect = pool.connect
+
+    def timed_connect():
+        started = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            metrics.observe("db_pool_checkout_duration_seconds", time.perf_counter() - started)
+
+    pool.connect = timed_connect
+
+    def pool_gauges():
+        if not hasattr(pool, "checkedout"):
+            return []
+        return [
+            ("db_pool_checked_out", "gauge", "Connections currently checked out", {(): pool.checkedout()}),
+            ("db_pool_size", "gauge", "Configured pool size", {(): pool.size()}),
+            ("db_pool_overflow", "gauge", "Connections open beyond the pool size", {(): max(0, pool.overflow())}),
+        ]
+
+    metrics.add_collector(pool_gauges)
+
+
+def stats_collector(prefix: str, help_text: str, stats: Callable[[], Dict[str, float]]):
+    """Expose a worker pool's stats() dict as gauges named `<prefix>_<key>`"""
+    def collect():
+        return [
+            (f"{prefix}_{key}", "counter" if key.endswith("_total") else "gauge", f"{help_text}: {key}", {(): value})
+            for key, value in stats().items()
+        ]
+    return collect
+
+
+# Request instrumentation
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording latency, status and database work per route.
+
+    Routes are labelled by their template ("/replays/{replay_id}"), never the
+    raw path, so label cardinality stays bounded; unmatched paths share one
+    label. Requests slower than `slow_request_ms` are counted and logged with
+    their database share.
+    """
+
+    def __init__(self, app, registry: MetricsRegistry = metrics, slow_request_ms: float = METRICS_SLOW_REQUEST_MS):
+        self.app = app
+        self.registry = registry
+        self.slow_request_seconds = slow_request_ms / 1000 if slow_request_ms > 0 else None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            _request_stats.reset(token)
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            self._record(scope["method"], path, status, elapsed, stats)
+
+    def _record(self, method: str, path: str, status: int, elapsed: float, stats: RequestStats):
+        route_labels = (("method", method), ("route", path))
+        self.registry.observe("http_request_duration_seconds", elapsed, route_labels + (("status", str(status)),))
+        if stats.queries:
+            self.registry.inc("http_request_db_queries_total", stats.queries, route_labels)
+            self.registry.inc("http_request_db_seconds_total", stats.db_seconds, route_labels)
+        if self.slow_request_seconds is not None and elapsed >= self.slow_request_seconds:
+            self.registry.inc("http_slow_requests_total", 1, route_labels)
+            logger.warning(
+                "Slow request: %s %s -> %d in %.1f ms (%d queries, %.1f ms in the database)",
+                method, path, status, elapsed * 1000, stats.queries, stats.db_seconds * 1000,
+            )
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import Base64Bytes, BaseModel, ConfigDict
 from typing import List, Optional
 from enum import Enum
 from datetime import datetime
@@ -7,6 +7,26 @@ class GameMode(str, Enum):
     pass_through = "pass-through"
     walls = "walls"
 
+class LeaderboardPeriod(str, Enum):
+    day = "day"
+    week = "week"
+    all = "all"
+
+class SubmissionStatus(str, Enum):
+    accepted = "accepted"
+    pending = "pending"
+    verified = "verified"
+    rejected = "rejected"
+
+class LiveGameSort(str, Enum):
+    score = "score"
+    spectators = "spectators"
+    recent = "recent"
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
 class Player(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     
@@ -50,7 +70,23 @@ class SignupRequest(BaseModel):
 class SubmitScoreRequest(BaseModel):
     score: int
     mode: GameMode
+    replay: Optional[Base64Bytes] = None  # seed and inputs in the app/replay.py format
+    gameToken: Optional[str] = None  # from POST /leaderboard/games; required with a replay
+
+class GameStartResponse(BaseModel):
+    seed: int
+    gameToken: str
 
 class SubmitScoreResponse(BaseModel):
     success: bool
     newRank: Optional[int] = None
+    status: SubmissionStatus = SubmissionStatus.accepted
+    submissionId: Optional[str] = None
+
+class SubmissionStatusResponse(BaseModel):
+    id: str
+    status: SubmissionStatus
+    score: int
+    mode: GameMode
+    newRank: Optional[int] = None
+    reason: Optional[str] = None
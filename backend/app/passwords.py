@@ -0,0 +1,138 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+import bcrypt
+
+from .config import (
+    BCRYPT_ROUNDS, PASSWORD_HASH_EXECUTOR, PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING
+)
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many password operations are already waiting for a worker"""
+
+
+def _hash(password: str, rounds: int) -> str:
+    salt = bcrypt.gensalt(rounds=rounds)
+    return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+
+def _timed(func, *args) -> Tuple[object, float, float]:
+    """Run a job in the pool, reporting when it started and finished"""
+    started = time.monotonic()
+    result = func(*args)
+    return result, started, time.monotonic()
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt work on a bounded thread or process pool.
+
+    At most `workers` hashes run at once and at most `max_pending` may be queued
+    or running; beyond that PasswordHasherBusy is raised so an auth burst sheds
+    load instead of starving the event loop and the default threadpool.
+    """
+
+    def __init__(self, rounds: int = BCRYPT_ROUNDS, executor: str = PASSWORD_HASH_EXECUTOR,
+                 workers: int = PASSWORD_HASH_WORKERS, max_pending: int = PASSWORD_HASH_MAX_PENDING):
+        self.rounds = rounds
+        self.executor_kind = executor
+        self.workers = max(1, workers)
+        self.max_pending = max(1, max_pending)
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._submitted = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_seconds = 0.0
+        self._run_seconds = 0.0
+        self._max_wait_seconds = 0.0
+
+    # Synchronous API (scripts, tests and other non-request code paths)
+    def hash(self, password: str) -> str:
+        """Hash a password inline on the calling thread"""
+        return _hash(password, self.rounds)
+
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password inline on the calling thread"""
+        return _verify(plain_password, hashed_password)
+
+    # Asynchronous API (request handlers)
+    async def hash_async(self, password: str) -> str:
+        """Hash a password on the worker pool"""
+        return await self._submit(_hash, password, self.rounds)
+
+    async def verify_async(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password on the worker pool"""
+        return await self._submit(_verify, plain_password, hashed_password)
+
+    def stats(self) -> Dict[str, float]:
+        """Queueing and timing counters for the pool"""
+        with self._lock:
+            running = min(self._pending, self.workers)
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "running": running,
+                "queued": self._pending - running,
+                "submitted_total": self._submitted,
+                "completed_total": self._completed,
+                "rejected_total": self._rejected,
+                "wait_seconds_total": self._wait_seconds,
+                "run_seconds_total": self._run_seconds,
+                "max_wait_seconds": self._max_wait_seconds,
+            }
+
+    def shutdown(self):
+        """Stop the worker pool; it is recreated on next use"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="password-hash"
+                )
+        return self._executor
+
+    async def _submit(self, func, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                raise PasswordHasherBusy("Too many pending password operations")
+            self._pending += 1
+            self._submitted += 1
+            executor = self._get_executor()
+
+        submitted_at = time.monotonic()
+        try:
+            future = executor.submit(_timed, func, *args)
+            result, started, finished = await asyncio.wrap_future(future)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+        with self._lock:
+            wait = max(0.0, started - submitted_at)
+            self._completed += 1
+            self._wait_seconds += wait
+            self._run_seconds += finished - started
+            self._max_wait_seconds = max(self._max_wait_seconds, wait)
+        return result
+
+
+# Global password hasher instance
+password_hasher = PasswordHasher()
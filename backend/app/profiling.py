@@ -0,0 +1,189 @@
+"""
+Production profiling hooks.
+
+SamplingProfiler snapshots every thread's stack with sys._current_frames() at
+a fixed interval from a background thread and aggregates them into the
+collapsed-stack format ("frame;frame;frame count" per line) read by
+flamegraph.pl, speedscope and inferno. The sampled threads are never
+interrupted, so the overhead is one stack walk per thread per interval.
+
+Per-request profiling is opt-in: ProfileMiddleware honours an `X-Profile`
+header from callers holding the admin token, and every synchronous call the
+request hands to the threadpool through run_profiled() (all AsyncDatabase
+methods) runs under its own cProfile. The merged stats are written to
+PROFILE_DIR, which keeps the newest PROFILE_MAX_FILES, and named in the
+`X-Profile-Id` response header. Work done on the event loop itself is not
+included, since the loop interleaves other requests. Only one cProfile can be
+active per interpreter (enforced since Python 3.12), so profiled calls take
+turns and a call that finds the profiler in use runs unprofiled.
+"""
+import contextvars
+import cProfile
+import hmac
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Dict, List, Optional
+
+from .config import ADMIN_TOKEN, PROFILE_DIR, PROFILE_MAX_FILES, PROFILE_MAX_SECONDS
+
+# Leaf frames in these modules are threads parked on a lock, queue or selector
+_IDLE_MODULES = ("threading.py", "selectors.py", "queue.py")
+
+
+class ProfilerBusy(Exception):
+    """Raised when a sampling run is already in progress"""
+
+
+def admin_token_valid(token: Optional[str]) -> bool:
+    """Constant-time check of a caller's admin token; always False when ADMIN_TOKEN is unset"""
+    # compare_digest only takes ASCII str, so compare bytes: any header value is then just a mismatch
+    return (bool(ADMIN_TOKEN) and token is not None
+            and hmac.compare_digest(token.encode("utf-8"), ADMIN_TOKEN.encode("utf-8")))
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_qualname}"
+
+
+class SamplingProfiler:
+    """Whole-process stack sampler; one run at a time"""
+
+    def __init__(self, max_seconds: float = PROFILE_MAX_SECONDS):
+        self.max_seconds = max_seconds
+        self._lock = threading.Lock()
+
+    def sample(self, seconds: float, interval_ms: float = 5.0, include_idle: bool = False) -> Counter:
+        """Sample all other threads for `seconds` (capped at max_seconds); returns stack counts"""
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("A profile is already being taken")
+        try:
+            seconds = min(max(seconds, 0.0), self.max_seconds)
+            interval = max(interval_ms, 0.5) / 1000
+            names = {}
+            stacks: Counter = Counter()
+            own = threading.get_ident()
+            deadline = time.monotonic() + seconds
+            while time.monotonic() < deadline:
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own:
+                        continue
+                    if not include_idle and frame.f_code.co_filename.endswith(_IDLE_MODULES):
+                        continue
+                    frames = []
+                    while frame is not None:
+                        frames.append(_frame_label(frame))
+                        frame = frame.f_back
+                    if thread_id not in names:
+                        names = {thread.ident: thread.name for thread in threading.enumerate()}
+                    frames.append(names.get(thread_id, str(thread_id)))
+                    stacks[";".join(reversed(frames))] += 1
+                time.sleep(interval)
+            return stacks
+        finally:
+            self._lock.release()
+
+    @staticmethod
+    def collapsed(stacks: Counter) -> str:
+        """Render stack counts in the collapsed format, hottest first"""
+        return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+# Per-request cProfile
+_request_profiles: contextvars.ContextVar[Optional[List[cProfile.Profile]]] = contextvars.ContextVar(
+    "request_profiles", default=None
+)
+_profile_lock = threading.Lock()
+
+
+def run_profiled(func, *args):
+    """Call `func` under cProfile when the current request asked for a profile and none is running"""
+    profiles = _request_profiles.get()
+    if profiles is None or not _profile_lock.acquire(blocking=False):
+        return func(*args)
+    try:
+        profile = cProfile.Profile()
+        profiles.append(profile)
+        return profile.runcall(func, *args)
+    finally:
+        _profile_lock.release()
+
+
+def profile_path(profile_id: str) -> Optional[str]:
+    """Location of a saved request profile, or None for unknown or malformed ids"""
+    if not profile_id.isalnum():
+        return None
+    path = os.path.join(PROFILE_DIR, f"{profile_id}.prof")
+    return path if os.path.exists(path) else None
+
+
+def save_profiles(profiles: List[cProfile.Profile]) -> Optional[str]:
+    """Merge a request's profiles into one pstats file; returns its id"""
+    profiles = [profile for profile in profiles if profile.getstats()]
+    if not profiles:
+        return None
+    stats = pstats.Stats(profiles[0])
+    for profile in profiles[1:]:
+        stats.add(profile)
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    profile_id = uuid.uuid4().hex
+    stats.dump_stats(os.path.join(PROFILE_DIR, f"{profile_id}.prof"))
+    prune_profiles()
+    return profile_id
+
+
+def prune_profiles(keep: int = PROFILE_MAX_FILES):
+    """Delete all but the `keep` newest request profiles"""
+    paths = [entry.path for entry in os.scandir(PROFILE_DIR) if entry.name.endswith(".prof")]
+    if len(paths) <= keep:
+        return
+    paths.sort(key=os.path.getmtime)
+    for path in paths[:len(paths) - keep]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+class ProfileMiddleware:
+    """Pure ASGI middleware enabling per-request cProfile for admin callers sending X-Profile"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not ADMIN_TOKEN:
+            await self.app(scope, receive, send)
+            return
+        headers: Dict[bytes, bytes] = dict(scope["headers"])
+        token = headers.get(b"x-admin-token")
+        if b"x-profile" not in headers or not admin_token_valid(token.decode("latin-1") if token else None):
+            await self.app(scope, receive, send)
+            return
+
+        profiles: List[cProfile.Profile] = []
+        reset = _request_profiles.set(profiles)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                profile_id = save_profiles(profiles)
+                if profile_id is not None:
+                    message = dict(message)
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"x-profile-id", profile_id.encode())
+                    ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_profiles.reset(reset)
+
+
+# Global sampling profiler instance
+sampling_profiler = SamplingProfiler()
@@ -0,0 +1,270 @@
+import bisect
+import random
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .models import Player
+
+# Skip list tuning: with p=1/4 a 16 level list comfortably covers billions of entries
+_MAX_LEVEL = 16
+_LEVEL_PROBABILITY = 0.25
+
+
+class _Node:
+    """Skip list node; width[i] is the number of positions spanned by next[i]"""
+    __slots__ = ("key", "value", "next", "width")
+
+    def __init__(self, key, value, height: int):
+        self.key = key
+        self.value = value
+        self.next: List[Optional["_Node"]] = [None] * height
+        self.width: List[int] = [1] * height
+
+
+class RankIndex:
+    """
+    In-process order-statistics index over player high scores.
+
+    Players are kept in an indexable skip list ordered by (-high_score, player_id),
+    so top-N, rank-of-player and score-window lookups are O(log n) and never touch
+    the database. Ranks use competition ranking: players with equal scores share
+    a rank, which equals 1 + the number of players with a strictly higher score.
+
+    The index only sees writes made through this process; run a single worker or
+    refresh it periodically when several processes share one database.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._random = random.Random()
+        self.clear()
+
+    def clear(self):
+        """Drop all entries"""
+        with self._lock:
+            self._head = _Node(None, None, _MAX_LEVEL)
+            self._level = 1
+            self._size = 0
+            self._scores: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, player_id: str) -> bool:
+        return player_id in self._scores
+
+    # Bulk loading
+    def load(self, players: Iterable[Player]):
+        """Replace the index contents with the given players"""
+        items = sorted(((-p.highScore, p.id), p) for p in players)
+        with self._lock:
+            self.clear()
+            tails = [self._head] * _MAX_LEVEL
+            tail_pos = [0] * _MAX_LEVEL
+            for pos, (key, player) in enumerate(items, start=1):
+                height = self._random_height()
+                node = _Node(key, player, height)
+                for lvl in range(height):
+                    tails[lvl].next[lvl] = node
+                    tails[lvl].width[lvl] = pos - tail_pos[lvl]
+                    tails[lvl] = node
+                    tail_pos[lvl] = pos
+                self._level = max(self._level, height)
+                self._scores[player.id] = player.highScore
+            # Links that run off the end point at a virtual sentinel at size + 1
+            self._size = len(items)
+            for lvl in range(_MAX_LEVEL):
+                tails[lvl].width[lvl] = self._size + 1 - tail_pos[lvl]
+
+    # Mutations
+    def upsert(self, player: Player):
+        """Insert a player or update its score and stored record"""
+        with self._lock:
+            old_score = self._scores.get(player.id)
+            if old_score == player.highScore:
+                self._find((-old_score, player.id)).value = player
+                return
+            if old_score is not None:
+                self._remove((-old_score, player.id))
+            self._insert((-player.highScore, player.id), player)
+            self._scores[player.id] = player.highScore
+
+    def remove(self, player_id: str) -> bool:
+        """Remove a player; returns False if it was not indexed"""
+        with self._lock:
+            score = self._scores.pop(player_id, None)
+            if score is None:
+                return False
+            self._remove((-score, player_id))
+            return True
+
+    # Queries
+    def get(self, player_id: str) -> Optional[Player]:
+        """Get the stored record for a player"""
+        with self._lock:
+            score = self._scores.get(player_id)
+            if score is None:
+                return None
+            return self._find((-score, player_id)).value
+
+    def rank_for_score(self, score: int) -> int:
+        """Rank a player with the given score would hold"""
+        with self._lock:
+            return self._count_before((-score, "")) + 1
+
+    def rank_of(self, player_id: str) -> Optional[int]:
+        """Current rank of a player, or None if not indexed"""
+        with self._lock:
+            score = self._scores.get(player_id)
+            if score is None:
+                return None
+            return self._count_before((-score, "")) + 1
+
+    def top(self, limit: int) -> List[Tuple[int, Player]]:
+        """Best `limit` players as (rank, player) pairs"""
+        with self._lock:
+            return self._collect(self._head.next[0], 0, limit)
+
+    def score_window(self, min_score: int, max_score: int, limit: int) -> List[Tuple[int, Player]]:
+        """Players whose high score lies in [min_score, max_score], best first"""
+        with self._lock:
+            node, before = self._seek((-max_score, ""))
+            return self._collect(node.next[0], before, limit, min_score)
+
+    # Internals
+    def _random_height(self) -> int:
+        height = 1
+        while height < _MAX_LEVEL and self._random.random() < _LEVEL_PROBABILITY:
+            height += 1
+        return height
+
+    def _seek(self, key) -> Tuple[_Node, int]:
+        """Last node with a key < `key`, and how many entries precede `key`"""
+        node = self._head
+        pos = 0
+        for lvl in range(self._level - 1, -1, -1):
+            nxt = node.next[lvl]
+            while nxt is not None and nxt.key < key:
+                pos += node.width[lvl]
+                node = nxt
+                nxt = node.next[lvl]
+        return node, pos
+
+    def _count_before(self, key) -> int:
+        return self._seek(key)[1]
+
+    def _find(self, key) -> _Node:
+        node = self._seek(key)[0].next[0]
+        if node is None or node.key != key:
+            raise KeyError(key)
+        return node
+
+    def _collect(self, node: Optional[_Node], before: int, limit: int,
+                 min_score: Optional[int] = None) -> List[Tuple[int, Player]]:
+        """Walk forward from `node`, which sits right after `before` entries"""
+        result = []
+        rank = 0
+        last_score = None
+        pos = before
+        while node is not None and len(result) < limit:
+            player = node.value
+            if min_score is not None and player.highScore < min_score:
+                break
+            pos += 1
+            if player.highScore != last_score:
+                rank = pos
+                last_score = player.highScore
+            result.append((rank, player))
+            node = node.next[0]
+        return result
+
+    def _insert(self, key, value):
+        update = [self._head] * _MAX_LEVEL
+        update_pos = [0] * _MAX_LEVEL
+        node = self._head
+        pos = 0
+        for lvl in range(self._level - 1, -1, -1):
+            nxt = node.next[lvl]
+            while nxt is not None and nxt.key < key:
+                pos += node.width[lvl]
+                node = nxt
+                nxt = node.next[lvl]
+            update[lvl] = node
+            update_pos[lvl] = pos
+
+        height = self._random_height()
+        if height > self._level:
+            for lvl in range(self._level, height):
+                self._head.next[lvl] = None
+                self._head.width[lvl] = self._size + 1
+            self._level = height
+
+        new_node = _Node(key, value, height)
+        new_pos = update_pos[0] + 1
+        for lvl in range(height):
+            prev = update[lvl]
+            offset = new_pos - update_pos[lvl]
+            new_node.next[lvl] = prev.next[lvl]
+            new_node.width[lvl] = prev.width[lvl] - offset + 1
+            prev.next[lvl] = new_node
+            prev.width[lvl] = offset
+        for lvl in range(height, self._level):
+            update[lvl].width[lvl] += 1
+        self._size += 1
+
+    def _remove(self, key):
+        update = [self._head] * _MAX_LEVEL
+        node = self._head
+        for lvl in range(self._level - 1, -1, -1):
+            nxt = node.next[lvl]
+            while nxt is not None and nxt.key < key:
+                node = nxt
+                nxt = node.next[lvl]
+            update[lvl] = node
+
+        target = update[0].next[0]
+        if target is None or target.key != key:
+            raise KeyError(key)
+        for lvl in range(self._level):
+            prev = update[lvl]
+            if prev.next[lvl] is target:
+                prev.next[lvl] = target.next[lvl]
+                prev.width[lvl] += target.width[lvl] - 1
+            else:
+                prev.width[lvl] -= 1
+        self._size -= 1
+
+
+
+class ScoreHistogram:
+    """
+    Player counts per high score, for approximate ranks without a rank index.
+
+    Loaded from one GROUP BY over the high_score index, it answers rank-for-score
+    with a binary search over the distinct scores, so a lookup costs the same at
+    any number of players. Ranks are as fresh as the last load.
+    """
+
+    def __init__(self):
+        # Distinct scores ascending, and how many players score at least each one;
+        # swapped in as one tuple so readers never see half a reload
+        self._table: Tuple[List[int], List[int]] = ([], [])
+
+    def load(self, counts: Iterable[Tuple[int, int]]):
+        """Replace the contents with (score, players) pairs"""
+        scores = []
+        at_or_above = []
+        total = 0
+        for score, players in sorted(counts, reverse=True):
+            total += players
+            scores.append(score)
+            at_or_above.append(total)
+        scores.reverse()
+        at_or_above.reverse()
+        self._table = (scores, at_or_above)
+
+    def rank_for_score(self, score: int) -> int:
+        """1 + the number of players with a higher score"""
+        scores, at_or_above = self._table
+        pos = bisect.bisect_right(scores, score)
+        return 1 + (at_or_above[pos] if pos < len(scores) else 0)
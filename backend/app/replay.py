@@ -0,0 +1,187 @@
+"""
+Compact replay format for server-side games.
+
+A game is fully determined by its mode, grid size, seed and per-tick inputs
+(see app/engine.py), so a replay stores only those, run-length encoded:
+
+    2 bytes  magic b"SR"
+    u8       format version (1)
+    u8       mode           (0 walls, 1 pass-through)
+    u8       grid_size
+    u32      seed           big-endian
+    varint*  runs           (count << 3) | input, input 0 = no turn, 1-4 = up/down/left/right
+    varint   0              end of runs
+    varint   final score
+
+Varints are unsigned LEB128. A bot that keeps its heading for a stretch of
+ticks costs one or two bytes per stretch, and a typical game fits in a few
+hundred bytes. Runs are appended as the game is played, so the blob is built
+incrementally, and the decoder reads from any binary stream without
+materializing the input list or per-tick frames.
+"""
+import hashlib
+import io
+import struct
+from typing import BinaryIO, Iterator, Optional, Tuple, Union
+
+from .engine import GRID_SIZE, SnakeGame
+from .models import GameMode
+
+MAGIC = b"SR"
+VERSION = 1
+
+_HEADER = struct.Struct(">2sBBBI")
+_MODES = (GameMode.walls, GameMode.pass_through)
+_INPUTS = (None, "up", "down", "left", "right")
+_INPUT_CODES = {move: code for code, move in enumerate(_INPUTS)}
+
+
+class ReplayFormatError(ValueError):
+    """Raised for blobs that are not valid replays"""
+
+
+def _write_varint(buffer: bytearray, value: int):
+    while value >= 0x80:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def _read_varint(stream: BinaryIO) -> int:
+    value = 0
+    shift = 0
+    while True:
+        byte = stream.read(1)
+        if not byte:
+            raise ReplayFormatError("Truncated replay")
+        value |= (byte[0] & 0x7F) << shift
+        if byte[0] < 0x80:
+            return value
+        shift += 7
+
+
+class ReplayRecorder:
+    """Accumulates a game's inputs tick by tick into the replay format"""
+
+    def __init__(self, seed: int, mode: GameMode = GameMode.walls, grid_size: int = GRID_SIZE):
+        self.seed = seed
+        self.mode = GameMode(mode)
+        self.buffer = bytearray(_HEADER.pack(MAGIC, VERSION, _MODES.index(self.mode), grid_size, seed & 0xFFFFFFFF))
+        self.ticks = 0
+        self._code = 0
+        self._run = 0
+
+    def record(self, move: Optional[str]):
+        """Append the input given on one tick (None to keep going)"""
+        code = _INPUT_CODES[move]
+        if code == self._code and self._run:
+            self._run += 1
+        else:
+            self._flush_run()
+            self._code = code
+            self._run = 1
+        self.ticks += 1
+
+    def finish(self, score: int) -> bytes:
+        """Close the replay with the final score"""
+        self._flush_run()
+        _write_varint(self.buffer, 0)
+        _write_varint(self.buffer, score)
+        return bytes(self.buffer)
+
+    def _flush_run(self):
+        if self._run:
+            _write_varint(self.buffer, (self._run << 3) | self._code)
+            self._run = 0
+
+
+def encode_replay(seed: int, mode: GameMode, moves, score: int, grid_size: int = GRID_SIZE) -> bytes:
+    """Encode a whole input sequence at once"""
+    recorder = ReplayRecorder(seed, mode, grid_size)
+    for move in moves:
+        recorder.record(move)
+    return recorder.finish(score)
+
+
+class ReplayReader:
+    """
+    Streaming decoder: reads the header up front, then yields one input per tick
+    from the underlying stream. The final score becomes available once the
+    inputs have been exhausted.
+    """
+
+    def __init__(self, source: Union[bytes, bytearray, memoryview, BinaryIO]):
+        self.stream: BinaryIO = io.BytesIO(source) if isinstance(source, (bytes, bytearray, memoryview)) else source
+        header = self.stream.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            raise ReplayFormatError("Truncated replay header")
+        magic, version, mode, grid_size, seed = _HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION or mode >= len(_MODES):
+            raise ReplayFormatError("Not a replay")
+        self.mode = _MODES[mode]
+        self.grid_size = grid_size
+        self.seed = seed
+        self.score: Optional[int] = None
+
+    def moves(self) -> Iterator[Optional[str]]:
+        """Yield each tick's input (None for no turn)"""
+        while True:
+            token = _read_varint(self.stream)
+            if token == 0:
+                self.score = _read_varint(self.stream)
+                return
+            code = token & 0x07
+            if code >= len(_INPUTS):
+                raise ReplayFormatError(f"Unknown input code {code}")
+            move = _INPUTS[code]
+            for _ in range(token >> 3):
+                yield move
+
+    def games(self) -> Iterator[SnakeGame]:
+        """
+        Replay through the engine, yielding the same SnakeGame after every tick.
+        Stops at the end of the inputs or when the game ends.
+        """
+        game = SnakeGame(self.mode, self.seed, self.grid_size)
+        for move in self.moves():
+            alive = game.step(move)
+            yield game
+            if not alive:
+                return
+
+
+def verify_replay(source: Union[bytes, BinaryIO]) -> Tuple[bool, SnakeGame]:
+    """Replay a recording; returns whether it reproduces its recorded score, and the final game"""
+    reader = ReplayReader(source)
+    game = SnakeGame(reader.mode, reader.seed, reader.grid_size)
+    for game in reader.games():
+        pass
+    if reader.score is None:
+        # The game ended before the inputs did; read the trailer anyway
+        for _ in reader.moves():
+            pass
+    return game.score == reader.score, game
+
+
+def canonical_replay(source: Union[bytes, BinaryIO], max_ticks: Optional[int] = None) -> bytes:
+    """
+    Re-encode a replay with only the inputs the game actually played: runs are
+    merged, inputs after the game ended (or past `max_ticks`) are dropped and the
+    trailer holds the engine's own score. Every encoding of one game gives the
+    same bytes.
+    """
+    reader = ReplayReader(source)
+    recorder = ReplayRecorder(reader.seed, reader.mode, reader.grid_size)
+    game = SnakeGame(reader.mode, reader.seed, reader.grid_size)
+    for move in reader.moves():
+        if max_ticks is not None and recorder.ticks >= max_ticks:
+            break
+        recorder.record(move)
+        if not game.step(move):
+            break
+    return recorder.finish(game.score)
+
+
+def replay_digest(data: bytes, max_ticks: Optional[int] = None) -> str:
+    """Hex SHA-256 of a replay's canonical form, used to refuse the same game twice"""
+    return hashlib.sha256(canonical_replay(data, max_ticks)).hexdigest()
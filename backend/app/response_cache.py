@@ -0,0 +1,56 @@
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import Dict, Hashable, Optional
+
+from .cache import TTLCache
+from .config import RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL_SECONDS
+
+LEADERBOARD = "leaderboard"
+LIVE_GAMES = "live_games"
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    etag: str
+
+
+class ResponseCache:
+    """
+    Serialized response bodies keyed by (namespace, version, params).
+
+    Writers never delete entries; they bump the namespace version, so every
+    cached page of that namespace stops matching at once and the old bodies age
+    out of the LRU. The TTL bounds staleness for changes made by other worker
+    processes, whose bumps this process never sees.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self._entries = TTLCache(max_size, ttl_seconds)
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def version(self, namespace: str) -> int:
+        return self._versions.get(namespace, 0)
+
+    def bump(self, namespace: str):
+        """Invalidate every cached response in a namespace"""
+        with self._lock:
+            self._versions[namespace] = self._versions.get(namespace, 0) + 1
+
+    def get(self, namespace: str, key: Hashable) -> Optional[CachedResponse]:
+        return self._entries.get((namespace, self.version(namespace), key))
+
+    def put(self, namespace: str, key: Hashable, version: int, body: bytes) -> CachedResponse:
+        """
+        Cache a body built from data read at `version`; if the namespace was bumped
+        meanwhile the entry is stored under the old version and never served.
+        """
+        entry = CachedResponse(body, f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"')
+        self._entries.set((namespace, version, key), entry)
+        return entry
+
+
+# Global response cache
+response_cache = ResponseCache(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL_SECONDS)
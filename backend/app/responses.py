@@ -0,0 +1,62 @@
+import inspect
+from typing import Any, Callable, Hashable, Optional
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+from .config import RESPONSE_CACHE_MAX_AGE_SECONDS
+from .response_cache import response_cache
+
+
+class PreSerializedJSONResponse(JSONResponse):
+    """
+    JSON response encoded in one pass by pydantic-core.
+
+    Hot list endpoints build plain dicts from column-only rows (nesting
+    already-built models such as rank index players) and wrap them in this
+    class. Returning a Response skips FastAPI's response_model pass, which would
+    otherwise validate every dict into a model before encoding it. Datetimes,
+    enums and nested models are encoded natively; bytes are sent as they are.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return to_json(content)
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+async def cached_json_response(request: Request, namespace: str, key: Hashable,
+                               build: Callable[[], Any]) -> Response:
+    """
+    Serve a JSON body from the response cache, building and caching it on a miss.
+    `build` returns the content to encode, or an awaitable of it.
+
+    Responses carry a strong ETag of the body, so a polling client that sends it
+    back in If-None-Match gets an empty 304 until the namespace is invalidated,
+    and a short Cache-Control max-age that lets a reverse proxy micro-cache them.
+    """
+    entry = response_cache.get(namespace, key)
+    if entry is None:
+        version = response_cache.version(namespace)
+        content = build()
+        if inspect.isawaitable(content):
+            content = await content
+        entry = response_cache.put(namespace, key, version, to_json(content))
+    headers = {
+        "ETag": entry.etag,
+        "Cache-Control": f"public, max-age={RESPONSE_CACHE_MAX_AGE_SECONDS}",
+    }
+    if _etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return PreSerializedJSONResponse(entry.body, headers=headers)
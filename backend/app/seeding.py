@@ -0,0 +1,224 @@
+"""
+Synthetic data for scale testing.
+
+generate_players() invents players whose histories look like real traffic:
+skill (mean score per game) is log-normal, the number of games per player is
+Pareto-distributed so a few regulars play most of the games, and individual
+game scores are exponential around the player's skill, rounded to whole
+pieces of food. Each player's games, high score and day, week and all-time
+bests are derived together, so the seeded tables agree with each other
+exactly as if every game had gone through Database.update_score.
+
+bulk_load() writes them in one transaction per chunk of players. Every player
+shares one bcrypt hash of SEED_PASSWORD, computed once. On SQLite, where
+SQLAlchemy's per-row parameter processing costs more than the insert itself,
+rows are encoded once here and handed straight to the driver's executemany;
+other databases go through Core inserts, which batch rows into multi-row
+statements. On request, the tables' secondary indexes are dropped for the load
+and rebuilt once at the end, which is about twice as fast as maintaining them
+row by row.
+"""
+import math
+import random
+import uuid
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import func, insert, select
+
+from .db_models import GameModeEnum, LeaderboardBestDB, LeaderboardEntryDB, UserDB
+from .engine import FOOD_SCORE
+from .models import LeaderboardPeriod
+from .passwords import password_hasher
+
+SEED_PASSWORD = "password123"
+
+_EPOCH = datetime(1970, 1, 1)
+_DAY_SECONDS = 86400
+_MODES = (GameModeEnum.walls, GameModeEnum.pass_through)
+_TABLES = (UserDB.__table__, LeaderboardEntryDB.__table__, LeaderboardBestDB.__table__)
+
+# Row layouts; timestamps are whole epoch seconds until they are written
+USER_COLUMNS = ("id", "username", "password_hash", "high_score", "games_played", "last_played", "created_at")
+ENTRY_COLUMNS = ("player_id", "score", "mode", "timestamp")
+BEST_COLUMNS = ("player_id", "mode", "period", "period_start", "score", "timestamp")
+
+
+@dataclass
+class SeedConfig:
+    """Shape of the generated population"""
+    users: int
+    games_per_user: float = 10.0  # mean; the median player plays far fewer
+    days: int = 365  # history length, ending now
+    median_skill: float = 120.0  # median of the players' mean scores
+    skill_spread: float = 0.8  # sigma of log(skill)
+    games_alpha: float = 1.5  # Pareto shape of games per player (lower = heavier tail)
+    max_games: int = 20000
+    seed: int = 1
+
+
+def generate_players(config: SeedConfig, first_index: int = 0, prefix: str = "Player",
+                     password_hash: str = "", now: Optional[int] = None
+                     ) -> Iterator[Tuple[tuple, List[tuple], List[tuple]]]:
+    """
+    Yield (user, entries, bests) rows for `config.users` players numbered from
+    `first_index`, laid out as USER_COLUMNS, ENTRY_COLUMNS and BEST_COLUMNS.
+    Deterministic for a given seed, prefix, index and `now` (epoch seconds);
+    the prefix is part of the random seed so populations seeded under
+    different prefixes never share user ids.
+    """
+    rng = random.Random(f"{config.seed}:{prefix}:{first_index}")
+    if now is None:
+        now = int((datetime.utcnow() - _EPOCH).total_seconds())
+    history = config.days * _DAY_SECONDS
+    log_skill = math.log(config.median_skill)
+    # Pareto(alpha) has mean alpha * xm / (alpha - 1)
+    games_scale = config.games_per_user * (config.games_alpha - 1) / config.games_alpha
+    day, week, all_time = LeaderboardPeriod.day.value, LeaderboardPeriod.week.value, LeaderboardPeriod.all.value
+    randint, random_, expovariate = rng.randint, rng.random, rng.expovariate
+
+    for index in range(first_index, first_index + config.users):
+        user_id = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+        rate = FOOD_SCORE / rng.lognormvariate(log_skill, config.skill_spread)
+        games = min(config.max_games, max(1, int(rng.paretovariate(config.games_alpha) * games_scale)))
+        # Everyone joined within the window; regulars tend to have joined earlier
+        joined = now - int(history * random_() ** (1 / (1 + math.log10(games))))
+        favourite, other = _MODES[index % 2], _MODES[1 - index % 2]
+
+        entries = []
+        best: Dict[tuple, list] = {}
+        high_score = 0
+        for ts in sorted(randint(joined, now) for _ in range(games)):
+            score = int(expovariate(rate)) * FOOD_SCORE
+            mode = favourite if random_() < 0.8 else other
+            entries.append((user_id, score, mode, ts))
+            if score > high_score:
+                high_score = score
+            day_start = ts - ts % _DAY_SECONDS
+            # 1970-01-01 was a Thursday, so ISO weeks start 3 days before each multiple of 7 days
+            week_start = day_start - (day_start // _DAY_SECONDS + 3) % 7 * _DAY_SECONDS
+            for key in ((mode, day, day_start), (mode, week, week_start), (mode, all_time, 0)):
+                current = best.get(key)
+                if current is None:
+                    best[key] = [score, ts]
+                elif score > current[0]:
+                    current[0], current[1] = score, ts
+
+        user = (user_id, f"{prefix}{index:07d}", password_hash, high_score, games, entries[-1][3], joined)
+        bests = [(user_id, mode, period, start, score, ts) for (mode, period, start), (score, ts) in best.items()]
+        yield user, entries, bests
+
+
+class _SQLiteWriter:
+    """Encodes rows the way SQLAlchemy stores them in SQLite and inserts them with executemany"""
+
+    def __init__(self):
+        self._dates: Dict[int, str] = {}
+        self._clock = [
+            f" {second // 3600:02d}:{second // 60 % 60:02d}:{second % 60:02d}.000000"
+            for second in range(_DAY_SECONDS)
+        ]
+
+    def timestamp(self, ts: int) -> str:
+        day, second = divmod(ts, _DAY_SECONDS)
+        date = self._dates.get(day)
+        if date is None:
+            date = self._dates[day] = (_EPOCH + timedelta(days=day)).strftime("%Y-%m-%d")
+        return date + self._clock[second]
+
+    def write(self, conn, users: List[tuple], entries: List[tuple], bests: List[tuple]):
+        ts = self.timestamp
+        names = {mode: mode.name for mode in GameModeEnum}  # SQLAlchemy's Enum stores names
+        cursor = conn.connection.driver_connection.cursor()
+        try:
+            cursor.executemany(_insert_sql(UserDB, USER_COLUMNS), [
+                (user_id, username, password, high, games, ts(last), ts(created))
+                for user_id, username, password, high, games, last, created in users
+            ])
+            cursor.executemany(_insert_sql(LeaderboardEntryDB, ENTRY_COLUMNS), [
+                (player_id, score, names[mode], ts(when)) for player_id, score, mode, when in entries
+            ])
+            cursor.executemany(_insert_sql(LeaderboardBestDB, BEST_COLUMNS), [
+                (player_id, names[mode], period, ts(start), score, ts(when))
+                for player_id, mode, period, start, score, when in bests
+            ])
+        finally:
+            cursor.close()
+
+
+class _CoreWriter:
+    """Inserts through SQLAlchemy Core, for databases whose drivers batch multi-row inserts"""
+
+    @staticmethod
+    def timestamp(ts: int) -> datetime:
+        return _EPOCH + timedelta(seconds=ts)
+
+    def write(self, conn, users: List[tuple], entries: List[tuple], bests: List[tuple]):
+        ts = self.timestamp
+        conn.execute(insert(UserDB), [
+            dict(zip(USER_COLUMNS, (user_id, username, password, high, games, ts(last), ts(created))))
+            for user_id, username, password, high, games, last, created in users
+        ])
+        conn.execute(insert(LeaderboardEntryDB), [
+            {"player_id": player_id, "score": score, "mode": mode, "timestamp": ts(when)}
+            for player_id, score, mode, when in entries
+        ])
+        conn.execute(insert(LeaderboardBestDB), [
+            dict(zip(BEST_COLUMNS, (player_id, mode, period, ts(start), score, ts(when))))
+            for player_id, mode, period, start, score, when in bests
+        ])
+
+
+def _insert_sql(model, columns) -> str:
+    return f"INSERT INTO {model.__tablename__} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+
+
+def bulk_load(engine, config: SeedConfig, prefix: str = "Player", chunk_size: int = 10000,
+              rebuild_indexes: bool = False,
+              progress: Optional[Callable[[int, int, int], None]] = None) -> Tuple[int, int, int]:
+    """
+    Insert a synthetic population; returns the (users, entries, bests) written.
+
+    Numbering continues after any users already named `prefix`..., so repeated
+    runs add to the population. With `rebuild_indexes` the secondary indexes
+    of the three tables are dropped first and recreated at the end; only use
+    it on a database nothing else is serving from. `progress` is called after
+    every committed chunk with the running totals.
+    """
+    with engine.connect() as conn:
+        first_index = conn.execute(
+            select(func.count()).select_from(UserDB).where(UserDB.username.like(f"{prefix}%"))
+        ).scalar()
+    writer = _SQLiteWriter() if engine.dialect.name == "sqlite" else _CoreWriter()
+    password_hash = password_hasher.hash(SEED_PASSWORD)
+    now = int((datetime.utcnow() - _EPOCH).total_seconds())
+
+    indexes = [index for table in _TABLES for index in table.indexes] if rebuild_indexes else []
+    with engine.begin() as conn:
+        for index in indexes:
+            index.drop(conn, checkfirst=True)
+
+    users = entries = bests = 0
+    try:
+        for start in range(0, config.users, chunk_size):
+            chunk = replace(config, users=min(chunk_size, config.users - start))
+            user_rows, entry_rows, best_rows = [], [], []
+            for user, player_entries, player_bests in generate_players(
+                chunk, first_index + start, prefix, password_hash, now
+            ):
+                user_rows.append(user)
+                entry_rows.extend(player_entries)
+                best_rows.extend(player_bests)
+            with engine.begin() as conn:
+                writer.write(conn, user_rows, entry_rows, best_rows)
+            users += len(user_rows)
+            entries += len(entry_rows)
+            bests += len(best_rows)
+            if progress is not None:
+                progress(users, entries, bests)
+    finally:
+        with engine.begin() as conn:
+            for index in indexes:
+                index.create(conn, checkfirst=True)
+    return users, entries, bests
@@ -0,0 +1,75 @@
+import base64
+import hashlib
+import hmac
+import logging
+import secrets
+import time
+from typing import Optional
+
+from .config import SECRET_KEY, ACCESS_TOKEN_TTL_SECONDS, SCORE_GAME_TOKEN_TTL_SECONDS
+
+logger = logging.getLogger(__name__)
+
+if SECRET_KEY:
+    _SIGNING_KEY = SECRET_KEY.encode("utf-8")
+else:
+    # Never fall back to a well-known key: anyone could forge tokens with it
+    _SIGNING_KEY = secrets.token_bytes(32)
+    logger.warning("SECRET_KEY is not set; signing tokens with a random per-process key. "
+                   "Tokens will not survive a restart or be accepted by other workers.")
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(payload: str) -> str:
+    digest = hmac.new(_SIGNING_KEY, payload.encode("ascii"), hashlib.sha256).digest()
+    return _b64encode(digest)
+
+
+def create_access_token(user_id: str, ttl_seconds: int = ACCESS_TOKEN_TTL_SECONDS) -> str:
+    """Create a signed bearer token of the form <user id>.<expiry>.<HMAC-SHA256 signature>"""
+    payload = f"{_b64encode(user_id.encode('utf-8'))}.{int(time.time()) + ttl_seconds}"
+    return f"{payload}.{_sign(payload)}"
+
+
+def verify_access_token(token: str) -> Optional[str]:
+    """Return the user id of a valid, unexpired token, or None"""
+    try:
+        encoded_user_id, expires_at, signature = token.split(".")
+        payload = f"{encoded_user_id}.{expires_at}"
+        if not hmac.compare_digest(signature, _sign(payload)):
+            return None
+        if int(expires_at) < time.time():
+            return None
+        return _b64decode(encoded_user_id).decode("utf-8")
+    except (ValueError, TypeError, UnicodeError):
+        return None
+
+
+def create_game_token(user_id: str, seed: int, ttl_seconds: int = SCORE_GAME_TOKEN_TTL_SECONDS) -> str:
+    """Create a signed token binding a game seed to a player: <user id>.<seed>.<expiry>.<signature>"""
+    payload = f"{_b64encode(user_id.encode('utf-8'))}.{seed}.{int(time.time()) + ttl_seconds}"
+    # Signed under its own prefix so an access token can never pass as a game token
+    return f"{payload}.{_sign('game.' + payload)}"
+
+
+def verify_game_token(token: str, user_id: str) -> Optional[int]:
+    """Return the seed of a valid, unexpired game token issued to `user_id`, or None"""
+    try:
+        encoded_user_id, seed, expires_at, signature = token.split(".")
+        payload = f"{encoded_user_id}.{seed}.{expires_at}"
+        if not hmac.compare_digest(signature, _sign("game." + payload)):
+            return None
+        if int(expires_at) < time.time():
+            return None
+        if _b64decode(encoded_user_id).decode("utf-8") != user_id:
+            return None
+        return int(seed)
+    except (ValueError, TypeError, UnicodeError):
+        return None
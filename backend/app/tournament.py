@@ -0,0 +1,161 @@
+"""
+Headless bot tournaments.
+
+Plays seeded games with the strategies in app/bots.py at full speed, with no
+tick timer, spread over a multiprocessing pool. Each game is deterministic in
+(strategy, mode, seed), so any result can be reproduced, and its replay can be
+kept for seeding the leaderboard. Bots that stop eating (the greedy bot can
+circle forever) are stopped after `starve_ticks` inputs without food, and
+every game is capped at `max_ticks`.
+
+Run it through tournament.py in the backend root.
+"""
+import math
+import multiprocessing
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .bots import make_bot
+from .engine import SnakeGame
+from .models import GameMode
+from .replay import ReplayRecorder
+
+HISTOGRAM_BUCKET = 10
+
+# How a game ended
+DIED = "died"
+STARVED = "starved"
+MAX_TICKS = "max_ticks"
+
+
+@dataclass
+class GameResult:
+    strategy: str
+    mode: GameMode
+    seed: int
+    score: int
+    ticks: int
+    ending: str
+    replay: Optional[bytes] = None
+
+
+def play_game(strategy: str, mode: GameMode, seed: int, max_ticks: int = 20000,
+              starve_ticks: Optional[int] = None, record: bool = False) -> GameResult:
+    """Play one game to the end; starve_ticks defaults to twice the number of cells"""
+    game = SnakeGame(mode, seed)
+    bot = make_bot(strategy)
+    recorder = ReplayRecorder(seed, mode, game.grid_size) if record else None
+    starve_ticks = starve_ticks or 2 * game.grid_size * game.grid_size
+    ending = MAX_TICKS
+    inputs = 0
+    last_meal = 0
+    score = 0
+    while inputs < max_ticks:
+        move = bot.next_move(game)
+        if recorder is not None:
+            recorder.record(move)
+        inputs += 1
+        if not game.step(move):
+            ending = DIED
+            break
+        if game.score != score:
+            score = game.score
+            last_meal = inputs
+        elif inputs - last_meal >= starve_ticks:
+            ending = STARVED
+            break
+    replay = recorder.finish(game.score) if recorder is not None else None
+    return GameResult(strategy, GameMode(mode), seed, game.score, game.ticks, ending, replay)
+
+
+def _play(args: Tuple) -> GameResult:
+    return play_game(*args)
+
+
+def schedule(strategies: Sequence[str], modes: Sequence[GameMode], games: int,
+             base_seed: int = 0) -> Iterator[Tuple[str, GameMode, int]]:
+    """Every strategy plays the same `games` seeds in every mode"""
+    for strategy in strategies:
+        for mode in modes:
+            for i in range(games):
+                yield strategy, GameMode(mode), (base_seed + i) & 0xFFFFFFFF
+
+
+def run_tournament(strategies: Sequence[str], modes: Sequence[GameMode], games: int,
+                   workers: Optional[int] = None, base_seed: int = 0, max_ticks: int = 20000,
+                   starve_ticks: Optional[int] = None, record: bool = False) -> Iterator[GameResult]:
+    """
+    Play the schedule across `workers` processes (1 plays inline), yielding
+    results as they finish, in no particular order.
+    """
+    for strategy in strategies:
+        make_bot(strategy)  # fail fast on unknown names
+    jobs = (
+        (strategy, mode, seed, max_ticks, starve_ticks, record)
+        for strategy, mode, seed in schedule(strategies, modes, games, base_seed)
+    )
+    if workers == 1:
+        yield from map(_play, jobs)
+        return
+    with multiprocessing.Pool(workers) as pool:
+        # Games are a few milliseconds each; batch them to amortize the IPC
+        yield from pool.imap_unordered(_play, jobs, chunksize=16)
+
+
+def _percentile(ordered: List[int], fraction: float) -> int:
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))]
+
+
+def summarize(results: Iterable[GameResult]) -> Dict[str, dict]:
+    """Score distributions keyed by "strategy/mode" """
+    groups: Dict[str, List[GameResult]] = defaultdict(list)
+    for result in results:
+        groups[f"{result.strategy}/{result.mode.value}"].append(result)
+
+    summary = {}
+    for key, group in sorted(groups.items()):
+        scores = sorted(result.score for result in group)
+        mean = sum(scores) / len(scores)
+        histogram = Counter(score // HISTOGRAM_BUCKET * HISTOGRAM_BUCKET for score in scores)
+        summary[key] = {
+            "games": len(scores),
+            "score": {
+                "mean": round(mean, 2),
+                "stdev": round(math.sqrt(sum((score - mean) ** 2 for score in scores) / len(scores)), 2),
+                "min": scores[0],
+                "p50": _percentile(scores, 0.5),
+                "p90": _percentile(scores, 0.9),
+                "p99": _percentile(scores, 0.99),
+                "max": scores[-1],
+            },
+            "ticks": {
+                "mean": round(sum(result.ticks for result in group) / len(group), 1),
+                "max": max(result.ticks for result in group),
+            },
+            "endings": dict(Counter(result.ending for result in group)),
+            "histogram": {str(bucket): histogram[bucket] for bucket in sorted(histogram)},
+        }
+    return summary
+
+
+class TournamentTimer:
+    """Wall-clock throughput of a tournament run"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.games = 0
+        self.ticks = 0
+
+    def add(self, result: GameResult):
+        self.games += 1
+        self.ticks += result.ticks
+
+    def report(self) -> Dict[str, float]:
+        elapsed = time.perf_counter() - self.started
+        return {
+            "elapsed_seconds": round(elapsed, 3),
+            "games_per_second": round(self.games / elapsed, 1) if elapsed else 0.0,
+            "ticks_per_second": round(self.ticks / elapsed) if elapsed else 0,
+        }
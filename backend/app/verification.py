@@ -0,0 +1,178 @@
+import threading
+import time
+import uuid
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+
+from .cache import TTLCache
+from .config import (
+    SCORE_VERIFY_EXECUTOR, SCORE_VERIFY_WORKERS, SCORE_VERIFY_MAX_PENDING, SCORE_VERIFY_MAX_TICKS
+)
+from .engine import GRID_SIZE, SnakeGame
+from .models import GameMode, SubmissionStatus
+from .replay import ReplayFormatError, ReplayReader
+
+
+class ScoreVerifierBusy(Exception):
+    """Raised when too many submissions are already waiting for verification"""
+
+
+def verify_submission(data: bytes, mode: str, claimed_score: int, max_ticks: int) -> Tuple[bool, Optional[str]]:
+    """
+    Replay a submitted game and check it earns the claimed score.
+
+    Runs in the worker pool, so it takes and returns only plain values.
+    Returns (ok, reason for rejection).
+    """
+    try:
+        reader = ReplayReader(data)
+        if reader.mode.value != mode:
+            return False, "Replay was recorded in a different mode"
+        # The grid size is a client-controlled header byte; scores only count on the real board
+        if reader.grid_size != GRID_SIZE:
+            return False, "Replay was recorded on a different grid size"
+        game = SnakeGame(reader.mode, reader.seed, reader.grid_size)
+        for inputs, move in enumerate(reader.moves(), start=1):
+            if inputs > max_ticks:
+                return False, "Replay is too long"
+            if not game.step(move):
+                break
+        if game.score != claimed_score:
+            return False, "Replay does not reproduce the claimed score"
+    except ReplayFormatError as exc:
+        return False, str(exc)
+    return True, None
+
+
+@dataclass
+class ScoreSubmission:
+    """A submission waiting for, or done with, verification"""
+    id: str
+    user_id: str
+    score: int
+    mode: GameMode
+    status: SubmissionStatus = SubmissionStatus.pending
+    new_rank: Optional[int] = None
+    reason: Optional[str] = None
+
+
+class ScoreVerifier:
+    """
+    Verifies replay-backed score submissions on a bounded worker pool.
+
+    submit() returns at once with a pending submission; the replay is re-run
+    through the engine in a worker (processes by default, since it is pure
+    CPU) and only a verified score is handed to `accept`, which writes it and
+    returns the player's new rank. Accepting runs on a single extra thread so
+    database writes never hold up the pool. Submission states are kept in
+    memory for `status_ttl_seconds` so clients can poll them.
+    """
+
+    def __init__(self, executor: str = SCORE_VERIFY_EXECUTOR, workers: int = SCORE_VERIFY_WORKERS,
+                 max_pending: int = SCORE_VERIFY_MAX_PENDING, max_ticks: int = SCORE_VERIFY_MAX_TICKS,
+                 status_ttl_seconds: float = 3600):
+        self.executor_kind = executor
+        self.workers = max(1, workers)
+        self.max_pending = max(1, max_pending)
+        self.max_ticks = max_ticks
+        self.submissions = TTLCache(max(self.max_pending * 4, 10000), status_ttl_seconds)
+        self._executor: Optional[Executor] = None
+        self._accept_executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._pending = 0
+        self._verified = 0
+        self._rejected = 0
+        self._run_seconds = 0.0
+
+    def submit(self, user_id: str, score: int, mode: GameMode, data: bytes,
+               accept: Callable[[ScoreSubmission, bytes], Optional[int]]) -> ScoreSubmission:
+        """Queue a replay for verification; raises ScoreVerifierBusy when the queue is full"""
+        submission = ScoreSubmission(uuid.uuid4().hex, user_id, score, GameMode(mode))
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise ScoreVerifierBusy("Too many submissions waiting for verification")
+            self._pending += 1
+            executor = self._get_executor()
+        self.submissions.set(submission.id, submission)
+        started = time.monotonic()
+        future = executor.submit(verify_submission, data, submission.mode.value, score, self.max_ticks)
+        future.add_done_callback(lambda done: self._verified_callback(submission, data, accept, started, done))
+        return submission
+
+    def get(self, submission_id: str) -> Optional[ScoreSubmission]:
+        return self.submissions.get(submission_id)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "pending": self._pending,
+                "verified_total": self._verified,
+                "rejected_total": self._rejected,
+                "run_seconds_total": self._run_seconds,
+            }
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued submission has been verified and accepted or rejected"""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+
+    def shutdown(self):
+        """Finish queued work and stop the pools; they are recreated on next use"""
+        self.drain()
+        with self._lock:
+            executor, self._executor = self._executor, None
+            accept_executor, self._accept_executor = self._accept_executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+        if accept_executor is not None:
+            accept_executor.shutdown(wait=True)
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="score-verify")
+            self._accept_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="score-accept")
+        return self._executor
+
+    def _verified_callback(self, submission: ScoreSubmission, data: bytes, accept, started: float, future: Future):
+        try:
+            ok, reason = future.result()
+        except Exception:
+            ok, reason = False, "Verification failed"
+        with self._lock:
+            self._run_seconds += time.monotonic() - started
+            accept_executor = self._accept_executor
+        if not ok:
+            self._finish(submission, SubmissionStatus.rejected, reason=reason)
+            return
+        accept_executor.submit(self._accept, submission, data, accept)
+
+    def _accept(self, submission: ScoreSubmission, data: bytes, accept):
+        try:
+            rank = accept(submission, data)
+        except Exception:
+            self._finish(submission, SubmissionStatus.rejected, reason="Could not record the score")
+            return
+        self._finish(submission, SubmissionStatus.verified, new_rank=rank)
+
+    def _finish(self, submission: ScoreSubmission, status: SubmissionStatus,
+                new_rank: Optional[int] = None, reason: Optional[str] = None):
+        submission.status = status
+        submission.new_rank = new_rank
+        submission.reason = reason
+        with self._lock:
+            if status == SubmissionStatus.verified:
+                self._verified += 1
+            else:
+                self._rejected += 1
+            self._pending -= 1
+            self._idle.notify_all()
+
+
+# Global score verifier instance
+score_verifier = ScoreVerifier()
@@ -0,0 +1,166 @@
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Deque, Dict, List, Optional
+
+from .db_models import GameModeEnum
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ScoreSubmission:
+    """A single game result waiting to be written"""
+    user_id: str
+    score: int
+    mode: GameModeEnum
+    timestamp: datetime
+    replay_id: Optional[int] = None
+
+
+class ScoreBufferFull(Exception):
+    """The buffer holds `max_items` submissions and cannot drain them"""
+
+
+class ScoreBuffer:
+    """
+    Write-behind buffer for score submissions.
+
+    Submissions are queued in memory and handed to `flush_func` in batches by a
+    background thread, either every `interval_ms` or as soon as `max_batch`
+    items are waiting. A failed batch is retried one submission at a time:
+    if some rows go through, the ones that still fail are bad data (e.g. a
+    deleted user) and are dead-lettered, logged with their contents and kept in
+    `dead_letters`. If every row fails the database is assumed to be down and
+    the batch goes back to the front of the queue for the next flush.
+
+    Durability: a submission is acknowledged before it is written, so a crash
+    loses whatever is still buffered (at most one interval's worth, bounded by
+    `max_items`). At `max_items` a submitter first flushes synchronously and,
+    if that cannot make room, gets ScoreBufferFull instead of growing the
+    queue. stop() flushes everything on graceful shutdown.
+    """
+
+    def __init__(self, flush_func: Callable[[List[ScoreSubmission]], None],
+                 interval_ms: int, max_batch: int, max_items: int):
+        self._flush_func = flush_func
+        self.interval = interval_ms / 1000
+        self.max_batch = max(1, max_batch)
+        self.max_items = max(self.max_batch, max_items)
+        self._queue: Deque[ScoreSubmission] = deque()
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self.flushed_total = 0
+        self.failed_flushes = 0
+        self.rejected_total = 0
+        self.dead_letters: Deque[ScoreSubmission] = deque(maxlen=1000)
+        self.dead_lettered_total = 0
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def start(self):
+        """Start the background flusher"""
+        with self._cond:
+            if self._thread is not None:
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="score-write-behind", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the flusher and write out everything still buffered"""
+        with self._cond:
+            thread, self._thread = self._thread, None
+            self._stopping = True
+            self._cond.notify_all()
+        if thread is not None:
+            thread.join()
+        self.flush()
+
+    def submit(self, submission: ScoreSubmission):
+        """Queue a submission; flushes synchronously when full and raises ScoreBufferFull if that fails"""
+        with self._cond:
+            full = len(self._queue) >= self.max_items
+        if full:
+            # Backpressure: the flusher has fallen behind, so the writer helps out
+            self.flush()
+        with self._cond:
+            if len(self._queue) >= self.max_items:
+                self.rejected_total += 1
+                raise ScoreBufferFull()
+            self._queue.append(submission)
+            if len(self._queue) >= self.max_batch:
+                self._cond.notify_all()
+
+    def flush(self) -> int:
+        """Write out everything queued so far; returns the number of items written"""
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._cond:
+                    if not self._queue:
+                        return written
+                    batch = [self._queue.popleft() for _ in range(min(self.max_batch, len(self._queue)))]
+                try:
+                    self._flush_func(batch)
+                except Exception:
+                    logger.exception("Flushing %d buffered scores failed; retrying them one by one", len(batch))
+                    self.failed_flushes += 1
+                    done, failed = self._flush_singly(batch)
+                    written += done
+                    if not done:
+                        # Nothing goes through: treat it as an outage and keep the batch
+                        with self._cond:
+                            self._queue.extendleft(reversed(failed))
+                        return written
+                    self._dead_letter(failed)
+                    continue
+                written += len(batch)
+                self.flushed_total += len(batch)
+
+    def _flush_singly(self, batch: List[ScoreSubmission]):
+        """Write a batch one submission at a time; returns (written, failed submissions)"""
+        failed = []
+        for submission in batch:
+            try:
+                self._flush_func([submission])
+            except Exception:
+                failed.append(submission)
+        done = len(batch) - len(failed)
+        self.flushed_total += done
+        return done, failed
+
+    def _dead_letter(self, failed: List[ScoreSubmission]):
+        for submission in failed:
+            logger.error("Dropping buffered score that cannot be written: %r", submission)
+        self.dead_letters.extend(failed)
+        self.dead_lettered_total += len(failed)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "queued": len(self._queue),
+            "max_items": self.max_items,
+            "flushed_total": self.flushed_total,
+            "failed_flushes_total": self.failed_flushes,
+            "dead_lettered_total": self.dead_lettered_total,
+            "rejected_total": self.rejected_total,
+        }
+
+    def _run(self):
+        while True:
+            deadline = time.monotonic() + self.interval
+            with self._cond:
+                while not self._stopping and len(self._queue) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if self._stopping:
+                    return
+            self.flush()
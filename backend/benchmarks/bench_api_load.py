@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Load-test the API: throughput, p50/p95/p99 latency and DB queries per endpoint.
+
+Drives signup, login, score submission, leaderboard and spectate requests at a
+fixed concurrency, one scenario after another (signup creates the accounts the
+later scenarios log in and submit with). By default the app runs in-process
+through httpx's ASGI transport, with its lifespan, on a throwaway SQLite
+database held in memory (--db memory) or on disk (--db file), or on any
+--database-url; SQL statements are counted and timed per scenario. The tests'
+single-connection :memory: database cannot serve concurrent requests, so the
+memory option puts the database file on tmpfs (/dev/shm) instead.
+With --base-url the same scenarios hit a running server instead (no query
+counts). Results can be saved as JSON and compared against a previous run.
+
+Usage:
+    uv run python benchmarks/bench_api_load.py --db file --requests 500 --concurrency 20 --output run.json
+    uv run python benchmarks/bench_api_load.py --db file --compare run.json
+    uv run python benchmarks/bench_api_load.py --base-url http://localhost:8000 --bcrypt-rounds 12
+"""
+import argparse
+import asyncio
+import contextvars
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import defaultdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import httpx
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+SCENARIOS = ("signup", "login", "submit", "leaderboard", "spectate")
+
+# Scenario the current request belongs to; copied into the threadpool with the request context
+current_scenario = contextvars.ContextVar("current_scenario", default=None)
+
+
+class QueryCounter:
+    """Counts and times SQL statements per scenario through engine events"""
+
+    def __init__(self, engine):
+        self.lock = threading.Lock()
+        self.counts = defaultdict(int)
+        self.seconds = defaultdict(float)
+        event.listen(engine, "before_cursor_execute", self._before)
+        event.listen(engine, "after_cursor_execute", self._after)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        scenario = current_scenario.get()
+        if scenario is not None:
+            with self.lock:
+                self.counts[scenario] += 1
+                self.seconds[scenario] += elapsed
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+class LoadRun:
+    def __init__(self, client: httpx.AsyncClient, args, counter=None):
+        self.client = client
+        self.args = args
+        self.counter = counter
+        self.rng = random.Random(args.seed)
+        self.run_id = uuid.uuid4().hex[:6]
+        self.accounts = []  # (username, token)
+
+    def request(self, scenario: str, i: int):
+        """The i-th request of a scenario as (method, path, kwargs, expected status)"""
+        if scenario == "signup":
+            body = {"username": f"load_{self.run_id}_{i}", "password": "password123"}
+            return "POST", "/auth/signup", {"json": body}, 201
+        username, token = self.accounts[i % len(self.accounts)]
+        if scenario == "login":
+            return "POST", "/auth/login", {"json": {"username": username, "password": "password123"}}, 200
+        if scenario == "submit":
+            body = {"score": self.rng.randrange(0, 2000, 10), "mode": self.rng.choice(["walls", "pass-through"])}
+            return "POST", "/leaderboard", {"json": body, "headers": {"Authorization": f"Bearer {token}"}}, 200
+        if scenario == "leaderboard":
+            params = [{"limit": 100}, {"limit": 100, "period": "week"}, {"limit": 100, "mode": "walls"}][i % 3]
+            return "GET", "/leaderboard", {"params": params}, 200
+        return "GET", "/spectate/live", {"params": {"limit": 50}}, 200
+
+    async def run_scenario(self, scenario: str) -> dict:
+        total = self.args.requests
+        latencies = []
+        errors = 0
+        next_index = 0
+
+        async def worker():
+            nonlocal next_index, errors
+            current_scenario.set(scenario)
+            while next_index < total:
+                i = next_index
+                next_index += 1
+                method, path, kwargs, expected = self.request(scenario, i)
+                started = time.perf_counter()
+                try:
+                    response = await self.client.request(method, path, **kwargs)
+                    ok = response.status_code == expected
+                except httpx.HTTPError:
+                    response, ok = None, False
+                latencies.append(time.perf_counter() - started)
+                if not ok:
+                    errors += 1
+                elif scenario == "signup":
+                    self.accounts.append((kwargs["json"]["username"], response.json()["token"]))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(self.args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        result = {
+            "requests": total,
+            "errors": errors,
+            "throughput_rps": round(total / elapsed, 1),
+            "latency_ms": {
+                "p50": round(percentile(latencies, 0.50) * 1000, 3),
+                "p95": round(percentile(latencies, 0.95) * 1000, 3),
+                "p99": round(percentile(latencies, 0.99) * 1000, 3),
+                "max": round(latencies[-1] * 1000, 3),
+            },
+        }
+        if self.counter is not None:
+            result["db_queries_per_request"] = round(self.counter.counts[scenario] / total, 2)
+            result["db_ms_per_request"] = round(self.counter.seconds[scenario] / total * 1000, 3)
+        return result
+
+    async def run(self, scenarios) -> dict:
+        if "signup" not in scenarios:
+            # Later scenarios need accounts; create a few untimed
+            saved = self.args.requests
+            self.args.requests = min(saved, self.args.concurrency * 2)
+            await self.run_scenario("signup")
+            self.args.requests = saved
+        results = {}
+        for scenario in SCENARIOS:
+            if scenario in scenarios:
+                results[scenario] = await self.run_scenario(scenario)
+                print_result(scenario, results[scenario])
+        return results
+
+
+def print_result(scenario: str, result: dict):
+    latency = result["latency_ms"]
+    queries = ""
+    if "db_queries_per_request" in result:
+        queries = f"  {result['db_queries_per_request']:5.2f} queries  {result['db_ms_per_request']:7.3f} ms db"
+    print(f"  {scenario:<12} {result['throughput_rps']:8.1f} req/s  p50 {latency['p50']:8.2f}  "
+          f"p95 {latency['p95']:8.2f}  p99 {latency['p99']:8.2f} ms  errors {result['errors']}{queries}")
+
+
+def compare(results: dict, baseline_path: str):
+    with open(baseline_path) as f:
+        baseline = json.load(f)["results"]
+    print(f"Compared with {baseline_path}:")
+    for scenario, result in results.items():
+        before = baseline.get(scenario)
+        if before is None:
+            continue
+        throughput = (result["throughput_rps"] / before["throughput_rps"] - 1) * 100
+        p95 = (result["latency_ms"]["p95"] / before["latency_ms"]["p95"] - 1) * 100
+        print(f"  {scenario:<12} throughput {throughput:+7.1f}%  p95 {p95:+7.1f}%")
+
+
+def setup_database(args, tmp: str):
+    """Point the app at the requested database; returns the engine"""
+    import app.database as database_module
+    import app.db as db_module
+
+    url = args.database_url or f"sqlite:///{tmp}/load.db"
+    engine = create_engine(url, **database_module._engine_options(url))
+    database_module.configure_sqlite_pragmas(engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    database_module.engine = engine
+    database_module.SessionLocal = session_factory
+    db_module.SessionLocal = session_factory
+    database_module.Base.metadata.create_all(bind=engine)
+    return engine
+
+
+async def run_in_process(args, scenarios):
+    from main import app
+    from app.live import live_manager
+    from app.passwords import password_hasher
+
+    password_hasher.rounds = args.bcrypt_rounds
+    memory_dir = "/dev/shm" if args.db == "memory" and os.path.isdir("/dev/shm") else None
+    with tempfile.TemporaryDirectory(dir=memory_dir) as tmp:
+        counter = QueryCounter(setup_database(args, tmp))
+        async with app.router.lifespan_context(app):
+            for i in range(args.live_games):
+                live_manager.create_bot_game(seed=i)
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://load") as client:
+                results = await LoadRun(client, args, counter).run(scenarios)
+            for session in list(live_manager.sessions.values()):
+                live_manager.remove_session(session.id)
+        return results
+
+
+async def run_remote(args, scenarios):
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=30) as client:
+        return await LoadRun(client, args).run(scenarios)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"comma-separated ({', '.join(SCENARIOS)})")
+    parser.add_argument("--requests", type=int, default=500, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--db", choices=["memory", "file"], default="memory")
+    parser.add_argument("--database-url", help="run in-process against this database instead")
+    parser.add_argument("--base-url", help="load a running server instead of the in-process app")
+    parser.add_argument("--bcrypt-rounds", type=int, default=4,
+                        help="in-process bcrypt cost (production uses BCRYPT_ROUNDS, 12 by default)")
+    parser.add_argument("--live-games", type=int, default=50, help="bot games hosted for the spectate lobby")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="save the results as JSON")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare against")
+    args = parser.parse_args()
+
+    scenarios = [name for name in args.scenarios.split(",") if name]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    target = args.base_url or args.database_url or f"in-process, SQLite in {args.db}"
+    print(f"{args.requests} requests per scenario at concurrency {args.concurrency} ({target})")
+    if args.base_url:
+        results = asyncio.run(run_remote(args, scenarios))
+    else:
+        results = asyncio.run(run_in_process(args, scenarios))
+
+    if args.compare:
+        compare(results, args.compare)
+    if args.output:
+        report = {
+            "config": {
+                "requests": args.requests,
+                "concurrency": args.concurrency,
+                "target": target,
+                "bcrypt_rounds": None if args.base_url else args.bcrypt_rounds,
+                "live_games": None if args.base_url else args.live_games,
+            },
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Load test comparing inline (event-loop blocking) database calls with the
+threadpool-backed AsyncDatabase used by the API handlers.
+
+Two otherwise identical routes are mounted on a throwaway app backed by a
+SQLite file database; each is driven with the same number of concurrent
+clients, and a cheap in-memory endpoint is probed alongside to show how much
+the blocking variant delays unrelated requests. --db-latency-ms adds a
+simulated network round trip to every statement, as with a PostgreSQL server.
+
+Usage:
+    uv run python benchmarks/bench_async_handlers.py --users 20000 --requests 2000 --concurrency 50 --db-latency-ms 2
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.db_models import UserDB, LeaderboardBestDB, GameModeEnum
+from app.db import ALL_TIME_START
+from app.models import GameMode, LeaderboardPeriod
+import app.db as db_module
+
+
+def build_app(database, async_database) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/blocking/board")
+    async def blocking_board():
+        return database.get_top_scores(50, GameMode.walls, LeaderboardPeriod.all)
+
+    @app.get("/offloaded/board")
+    async def offloaded_board():
+        return await async_database.get_top_scores(50, GameMode.walls, LeaderboardPeriod.all)
+
+    @app.get("/blocking/users/{user_id}")
+    async def blocking_user(user_id: str):
+        return database.get_user_by_id(user_id)
+
+    @app.get("/offloaded/users/{user_id}")
+    async def offloaded_user(user_id: str):
+        return await async_database.get_user_by_id(user_id)
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    return app
+
+
+def populate(engine, users):
+    rng = random.Random(42)
+    rows, bests = [], []
+    for i in range(users):
+        score = int(rng.expovariate(1 / 300)) // 10 * 10
+        rows.append({"id": f"user-{i}", "username": f"player_{i}", "password_hash": "x",
+                     "high_score": score, "games_played": 1})
+        bests.append({"player_id": f"user-{i}", "mode": GameModeEnum.walls, "period": "all",
+                      "period_start": ALL_TIME_START, "score": score, "timestamp": ALL_TIME_START})
+    with engine.begin() as conn:
+        conn.execute(insert(UserDB), rows)
+        conn.execute(insert(LeaderboardBestDB), bests)
+
+
+async def drive(client, paths, concurrency):
+    queue = list(paths)
+    latencies = []
+
+    async def worker():
+        while queue:
+            path = queue.pop()
+            started = time.perf_counter()
+            response = await client.get(path)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - started, latencies
+
+
+async def probe(client, stop):
+    latencies = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        await client.get("/ping")
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(0.005)
+    return latencies
+
+
+async def run_variant(app, variant, args):
+    rng = random.Random(1)
+    paths = []
+    for _ in range(args.requests):
+        if rng.random() < 0.5:
+            paths.append(f"/{variant}/board")
+        else:
+            paths.append(f"/{variant}/users/user-{rng.randrange(args.users)}")
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        stop = asyncio.Event()
+        probe_task = asyncio.create_task(probe(client, stop))
+        elapsed, latencies = await drive(client, paths, args.concurrency)
+        stop.set()
+        probe_latencies = await probe_task
+
+    probes = probe_latencies or [0.0]
+    print(f"  {variant:<10} {len(latencies) / elapsed:8.1f} req/s  "
+          f"mean={statistics.mean(latencies) * 1000:7.2f} ms  "
+          f"/ping answered {len(probe_latencies):4d}x, worst {max(probes) * 1000:7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--db-latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db", connect_args={"check_same_thread": False})
+        Base.metadata.create_all(bind=engine)
+        populate(engine, args.users)
+        if args.db_latency_ms:
+            @event.listens_for(engine, "before_cursor_execute")
+            def simulate_round_trip(*_):
+                time.sleep(args.db_latency_ms / 1000)
+        db_module.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        database = db_module.Database()
+        database.refresh_caches()
+        app = build_app(database, db_module.AsyncDatabase(database))
+
+        print(f"{args.requests} requests at concurrency {args.concurrency} "
+              f"({args.users} users, +{args.db_latency_ms} ms per statement):")
+        for variant in ("blocking", "offloaded"):
+            asyncio.run(run_variant(app, variant, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark bot decision latency: time per next_move call and resulting scores.
+
+Plays seeded games with each strategy and times every decision, reporting the
+latency distribution and how many bots one process could drive at the live tick
+rate (LIVE_TICK_MS) if deciding were all it did.
+
+Usage:
+    uv run python benchmarks/bench_bots.py --games 20 --bots greedy,pathfinder
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from app.bots import BOTS, make_bot
+from app.config import LIVE_TICK_MS
+from app.engine import SnakeGame
+from app.models import GameMode
+
+
+def run(strategy: str, mode: GameMode, games: int, max_ticks: int):
+    timings = []
+    scores = []
+    for seed in range(games):
+        game = SnakeGame(mode, seed)
+        bot = make_bot(strategy)
+        last_meal = 0
+        for tick in range(max_ticks):
+            started = time.perf_counter_ns()
+            move = bot.next_move(game)
+            timings.append(time.perf_counter_ns() - started)
+            score = game.score
+            if not game.step(move):
+                break
+            if game.score != score:
+                last_meal = tick
+            elif tick - last_meal > 2 * game.grid_size * game.grid_size:
+                break
+        scores.append(game.score)
+
+    timings.sort()
+    mean = statistics.fmean(timings)
+    print(f"  {strategy + '/' + mode.value:<26} {len(timings):>8} moves  "
+          f"mean {mean / 1000:6.1f}us  p50 {timings[len(timings) // 2] / 1000:6.1f}us  "
+          f"p99 {timings[int(len(timings) * 0.99)] / 1000:7.1f}us  max {timings[-1] / 1000:7.1f}us  "
+          f"~{int(LIVE_TICK_MS * 1e6 / mean):>6} bots/process  mean score {statistics.fmean(scores):7.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--bots", default=",".join(BOTS))
+    parser.add_argument("--max-ticks", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{args.games} games per strategy and mode, tick {LIVE_TICK_MS}ms")
+    for strategy in args.bots.split(","):
+        for mode in (GameMode.walls, GameMode.pass_through):
+            run(strategy, mode, args.games, args.max_ticks)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark spectator fan-out: publish cost per frame and backlog for 10k local subscribers.
+A share of the consumers is slow (they sleep per frame, like a congested socket).
+The broadcast hub is compared with the previous design: an unbounded asyncio.Queue per
+spectator, fed through one call_soon_threadsafe per spectator per frame.
+
+Usage:
+    uv run python benchmarks/bench_broadcast.py --subscribers 10000 --ticks 200 --slow 0.1
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from app.broadcast import BroadcastHub
+from app.engine import SnakeGame
+from app.frames import encode_keyframe
+from app.models import GameMode
+
+DELTA = b"\x02\x00\x00\x00\x01\x00\xd2\x01"
+
+
+class QueueSubscriber:
+    """The per-spectator unbounded queue used before the broadcast hub"""
+
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.queue: "asyncio.Queue[bytes]" = asyncio.Queue()
+
+    def deliver(self, frame: bytes):
+        self.loop.call_soon_threadsafe(self.queue.put_nowait, frame)
+
+    async def get(self) -> bytes:
+        return await self.queue.get()
+
+    def backlog(self) -> int:
+        return self.queue.qsize()
+
+
+async def consume(subscription, slow_delay: float, counter: list):
+    while True:
+        await subscription.get()
+        counter[0] += 1
+        await asyncio.sleep(slow_delay)
+
+
+async def run(design: str, subscribers: int, ticks: int, slow: float, tick_ms: float, slow_ms: float):
+    keyframe = encode_keyframe(SnakeGame(GameMode.walls, seed=1), 0)
+    hub = BroadcastHub(max_queue=32)
+    subs = []
+    for _ in range(subscribers):
+        if design == "hub":
+            subs.append(hub.subscribe("game"))
+        else:
+            subs.append(QueueSubscriber())
+
+    received = [0]
+    slow_count = int(subscribers * slow)
+    tasks = [
+        asyncio.ensure_future(consume(sub, slow_ms / 1000 if i < slow_count else 0, received))
+        for i, sub in enumerate(subs)
+    ]
+    await asyncio.sleep(0)
+
+    publish_times = []
+    for _ in range(ticks):
+        started = time.perf_counter()
+        if design == "hub":
+            hub.publish("game", DELTA, lambda: keyframe)
+        else:
+            for sub in subs:
+                sub.deliver(DELTA)
+        publish_times.append(time.perf_counter() - started)
+        await asyncio.sleep(tick_ms / 1000)
+
+    if design == "hub":
+        backlog = max(len(sub.frames) for sub in subs)
+        dropped = sum(sub.dropped for sub in subs)
+    else:
+        backlog = max(sub.backlog() for sub in subs)
+        dropped = 0
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    publish_times.sort()
+    print(
+        f"  {design:>5}: publish p50 {statistics.median(publish_times) * 1000:7.2f}ms"
+        f"  p99 {publish_times[int(len(publish_times) * 0.99) - 1] * 1000:7.2f}ms"
+        f"  delivered {received[0]:>9}  max backlog {backlog:>5}  dropped {dropped:>8}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--subscribers", type=int, default=10000)
+    parser.add_argument("--ticks", type=int, default=200)
+    parser.add_argument("--slow", type=float, default=0.1, help="fraction of slow consumers")
+    parser.add_argument("--tick-ms", type=float, default=5.0)
+    parser.add_argument("--slow-ms", type=float, default=50.0, help="per-frame delay of slow consumers")
+    args = parser.parse_args()
+
+    print(f"{args.subscribers} subscribers, {args.ticks} ticks every {args.tick_ms}ms, "
+          f"{args.slow:.0%} consuming at {args.slow_ms}ms/frame")
+    for design in ("queue", "hub"):
+        asyncio.run(run(design, args.subscribers, args.ticks, args.slow, args.tick_ms, args.slow_ms))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-request CPU time of the list endpoints (leaderboard and spectate lobby).
+
+Seeds a throwaway SQLite database with N users plus a weekly board, fills the
+live-game registry, then issues requests in-process through the ASGI app and
+reports CPU time (time.process_time) and wall time per request, so serialization
+and model construction costs are measured rather than network overhead.
+
+Usage:
+    uv run python benchmarks/bench_list_endpoints.py --users 20000 --live-games 500 --requests 300
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import httpx
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.db import period_start
+from app.db_models import GameModeEnum, LeaderboardBestDB, UserDB
+from app.models import GameMode, LeaderboardPeriod, LiveGame, Player
+import app.db as db_module
+
+
+def populate(engine, users, chunk_size=50000):
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    week = period_start(LeaderboardPeriod.week, now)
+    with engine.begin() as conn:
+        for start in range(0, users, chunk_size):
+            ids = range(start, min(users, start + chunk_size))
+            scores = {i: int(rng.expovariate(1 / 300)) // 10 * 10 for i in ids}
+            conn.execute(insert(UserDB), [
+                {
+                    "id": f"user-{i}",
+                    "username": f"player_{i}",
+                    "password_hash": "x",
+                    "high_score": scores[i],
+                    "games_played": 1,
+                    "last_played": now,
+                }
+                for i in ids
+            ])
+            conn.execute(insert(LeaderboardBestDB), [
+                {
+                    "player_id": f"user-{i}",
+                    "mode": GameModeEnum.walls if i % 2 else GameModeEnum.pass_through,
+                    "period": LeaderboardPeriod.week.value,
+                    "period_start": week,
+                    "score": scores[i],
+                    "timestamp": now,
+                }
+                for i in ids
+            ])
+
+
+async def measure(client, path, params, requests):
+    await client.get(path, params=params)  # warm up
+    cpu = time.process_time()
+    wall = time.perf_counter()
+    for _ in range(requests):
+        response = await client.get(path, params=params)
+        assert response.status_code == 200
+    cpu = (time.process_time() - cpu) / requests
+    wall = (time.perf_counter() - wall) / requests
+    print(f"  {path + '?' + '&'.join(f'{k}={v}' for k, v in params.items()):<50} "
+          f"cpu {cpu * 1000:7.3f} ms/req  wall {wall * 1000:7.3f} ms/req  ({len(response.content)} bytes)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--live-games", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=300)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db")
+        Base.metadata.create_all(bind=engine)
+        db_module.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        populate(engine, args.users)
+        db_module.db.refresh_caches()
+
+        from main import app
+        from app.live_registry import live_registry
+
+        rng = random.Random(3)
+        live_registry.load(
+            LiveGame(
+                id=f"game-{i}",
+                player=Player(id=f"user-{i}", username=f"player_{i}", score=0, highScore=0, gamesPlayed=1),
+                mode=GameMode.walls,
+                currentScore=rng.randrange(500),
+                startedAt=datetime.utcnow(),
+                spectators=rng.randrange(50),
+            )
+            for i in range(args.live_games)
+        )
+
+        print(f"{args.users} users, {args.live_games} live games, {args.requests} requests per endpoint")
+        asyncio.run(run(app, args.requests))
+
+
+async def run(app, requests):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await measure(client, "/", {}, requests)  # routing and transport overhead
+        await measure(client, "/leaderboard", {"limit": 100}, requests)
+        await measure(client, "/leaderboard", {"limit": 100, "period": "week"}, requests)
+        await measure(client, "/leaderboard", {"limit": 100, "mode": "walls", "period": "week"}, requests)
+        await measure(client, "/spectate/live", {"limit": 200}, requests)
+
+
+if __name__ == "__main__":
+    main()
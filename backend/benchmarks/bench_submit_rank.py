@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark score submission latency (update_score + rank lookup) at scale.
+
+Creates a throwaway SQLite database with N users, warms the rank index and
+then times a series of submissions through the Database layer, comparing the
+in-memory rank path with an indexed COUNT(*) and with the score histogram
+fallback that get_player_rank uses when the rank index cannot answer.
+
+Usage:
+    uv run python benchmarks/bench_submit_rank.py --users 1000000 --submissions 2000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from sqlalchemy import create_engine, func, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.db_models import UserDB
+from app.models import GameMode
+import app.db as db_module
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def report(name, samples):
+    print(f"  {name:<28} p50={percentile(samples, 50) * 1000:8.3f} ms  "
+          f"p99={percentile(samples, 99) * 1000:8.3f} ms  "
+          f"mean={statistics.mean(samples) * 1000:8.3f} ms")
+
+
+def populate(engine, users, chunk_size=50000):
+    rng = random.Random(42)
+    with engine.begin() as conn:
+        for start in range(0, users, chunk_size):
+            rows = [
+                {
+                    "id": f"user-{i}",
+                    "username": f"player_{i}",
+                    "password_hash": "x",
+                    "high_score": int(rng.expovariate(1 / 300)) // 10 * 10,
+                    "games_played": 1,
+                }
+                for i in range(start, min(users, start + chunk_size))
+            ]
+            conn.execute(insert(UserDB), rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--submissions", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db")
+        Base.metadata.create_all(bind=engine)
+        db_module.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        database = db_module.Database()
+
+        started = time.perf_counter()
+        populate(engine, args.users)
+        print(f"Inserted {args.users} users in {time.perf_counter() - started:.1f}s")
+
+        started = time.perf_counter()
+        database.refresh_caches()
+        print(f"Warmed rank index in {time.perf_counter() - started:.1f}s")
+
+        session = db_module.SessionLocal()
+        try:
+            started = time.perf_counter()
+            database._score_histogram(session)
+            print(f"Loaded score histogram in {(time.perf_counter() - started) * 1000:.0f}ms")
+        finally:
+            session.close()
+
+        rng = random.Random(7)
+        submit, rank_memory, rank_sql, rank_histogram = [], [], [], []
+        for _ in range(args.submissions):
+            user_id = f"user-{rng.randrange(args.users)}"
+            score = int(rng.expovariate(1 / 300)) // 10 * 10
+
+            t0 = time.perf_counter()
+            database.update_score(user_id, score, GameMode.walls)
+            t1 = time.perf_counter()
+            database.get_player_rank(user_id)
+            t2 = time.perf_counter()
+            submit.append(t2 - t0)
+            rank_memory.append(t2 - t1)
+
+            session = db_module.SessionLocal()
+            try:
+                t3 = time.perf_counter()
+                high_score = session.query(UserDB.high_score).filter(UserDB.id == user_id).scalar()
+                session.query(func.count(UserDB.id)).filter(UserDB.high_score > high_score).scalar()
+                rank_sql.append(time.perf_counter() - t3)
+                t4 = time.perf_counter()
+                high_score = session.query(UserDB.high_score).filter(UserDB.id == user_id).scalar()
+                database._score_histogram(session).rank_for_score(high_score)
+                rank_histogram.append(time.perf_counter() - t4)
+            finally:
+                session.close()
+
+        print(f"\n{args.submissions} submissions against {args.users} users:")
+        report("submit + rank (end to end)", submit)
+        report("rank lookup (rank index)", rank_memory)
+        report("rank lookup (indexed COUNT)", rank_sql)
+        report("rank lookup (histogram)", rank_histogram)
+
+
+if __name__ == "__main__":
+    main()
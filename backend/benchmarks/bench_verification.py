@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark replay verification of score submissions: verifications per second per core.
+
+Records N games played by a random-turning player, then verifies every replay
+in-process on one core (the cost per submission) and through ScoreVerifier with a
+process pool of W workers (end-to-end throughput including pickling and the
+accept hand-off).
+
+Usage:
+    uv run python benchmarks/bench_verification.py --games 500 --workers 4
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from app.engine import SnakeGame
+from app.models import GameMode
+from app.replay import ReplayRecorder
+from app.verification import ScoreVerifier, verify_submission
+
+
+def record_games(count: int, max_ticks: int):
+    replays = []
+    for seed in range(count):
+        mode = GameMode.pass_through if seed % 2 else GameMode.walls
+        game = SnakeGame(mode, seed)
+        recorder = ReplayRecorder(seed, mode)
+        rng = random.Random(seed)
+        while not game.is_game_over and recorder.ticks < max_ticks:
+            move = rng.choice(["up", "down", "left", "right"]) if rng.random() < 0.1 else None
+            recorder.record(move)
+            game.step(move)
+        replays.append((mode, game.score, game.ticks, recorder.finish(game.score)))
+    return replays
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--games", type=int, default=500)
+    parser.add_argument("--max-ticks", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    args = parser.parse_args()
+
+    replays = record_games(args.games, args.max_ticks)
+    ticks = sum(replay[2] for replay in replays)
+    size = sum(len(replay[3]) for replay in replays)
+    print(f"{len(replays)} games, {ticks / len(replays):.0f} ticks and {size / len(replays):.0f} bytes per replay")
+
+    started = time.perf_counter()
+    for mode, score, _, data in replays:
+        assert verify_submission(data, mode.value, score, args.max_ticks) == (True, None)
+    elapsed = time.perf_counter() - started
+    print(f"  1 core (in-process): {len(replays) / elapsed:8.0f} verifications/s  "
+          f"{ticks / elapsed / 1000:6.0f}k ticks/s  {elapsed / len(replays) * 1000:.2f} ms each")
+
+    verifier = ScoreVerifier(executor="process", workers=args.workers, max_pending=len(replays))
+    # Start the workers before timing
+    mode, score, _, data = replays[0]
+    verifier.submit("warmup", score, mode, data, lambda submission, data: None)
+    verifier.drain()
+    started = time.perf_counter()
+    for mode, score, _, data in replays:
+        verifier.submit("bench", score, mode, data, lambda submission, data: None)
+    verifier.drain()
+    elapsed = time.perf_counter() - started
+    verifier.shutdown()
+    rate = len(replays) / elapsed
+    print(f"  {args.workers} process workers: {rate:8.0f} verifications/s  ({rate / args.workers:.0f} per core)  "
+          f"verified {verifier.stats()['verified_total'] - 1}/{len(replays)}")
+
+
+if __name__ == "__main__":
+    main()
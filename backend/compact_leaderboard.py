@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Archive and compact expired leaderboard entries.
+Moves leaderboard_entries rows older than the retention window into compressed
+monthly archives and per-player, per-mode, per-day leaderboard_daily rows, in
+short batches (see app/compaction.py). Safe to run while the server is up;
+set COMPACTION_INTERVAL_SECONDS to have the server do it in the background.
+
+Usage:
+    uv run python compact_leaderboard.py --retention-days 90
+    uv run python compact_leaderboard.py --retention-days 30 --batch-size 20000 --archive-dir /data/archive
+"""
+import argparse
+import sys
+
+from app.compaction import EntryCompactor
+from app.config import (
+    COMPACTION_ARCHIVE_DIR, COMPACTION_BATCH_SIZE, COMPACTION_PAUSE_MS, COMPACTION_RETENTION_DAYS
+)
+from app.database import init_db
+from app.db import db
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--retention-days", type=int, default=COMPACTION_RETENTION_DAYS)
+    parser.add_argument("--batch-size", type=int, default=COMPACTION_BATCH_SIZE, help="entries per transaction")
+    parser.add_argument("--pause-ms", type=int, default=COMPACTION_PAUSE_MS, help="pause between batches")
+    parser.add_argument("--archive-dir", default=COMPACTION_ARCHIVE_DIR)
+    parser.add_argument("--max-batches", type=int, help="stop after this many batches")
+    args = parser.parse_args()
+
+    init_db()  # creates leaderboard_daily on databases that predate it
+    compactor = EntryCompactor(db, args.archive_dir, args.retention_days, args.batch_size, args.pause_ms)
+    moved = compactor.run(max_batches=args.max_batches)
+    stats = compactor.stats()
+    rate = moved / stats["last_run_seconds"] if stats["last_run_seconds"] else 0
+    print(f"Compacted {moved} entries older than {args.retention_days} days in {stats['batches_total']} batches, "
+          f"{stats['last_run_seconds']:.1f}s ({rate:,.0f}/s); archived {stats['archived_bytes_total']:,} bytes "
+          f"to {args.archive_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Export leaderboard history from the Snake Rivals Arena database.
+Streams leaderboard_entries in id order as NDJSON or CSV, reading the database
+directly (DATABASE_URL) one keyset page at a time, so memory stays flat however
+large the table is. GET /leaderboard/export serves the same output over HTTP.
+
+Usage:
+    uv run python export_leaderboard.py --format csv --output scores.csv
+    uv run python export_leaderboard.py --mode walls --since 2026-01-01 --until 2026-02-01 | gzip > jan.ndjson.gz
+    uv run python export_leaderboard.py --after-id 1500000 --output rest.ndjson   # resume
+"""
+import argparse
+import sys
+import time
+from datetime import datetime
+
+from app.config import EXPORT_PAGE_SIZE
+from app.db import db
+from app.export import csv_header, encode_page
+from app.models import ExportFormat, GameMode
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--format", type=ExportFormat, choices=[f.value for f in ExportFormat], default=ExportFormat.ndjson)
+    parser.add_argument("--mode", type=GameMode, choices=[m.value for m in GameMode])
+    parser.add_argument("--since", type=datetime.fromisoformat, help="first timestamp included (UTC, ISO 8601)")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="first timestamp excluded (UTC, ISO 8601)")
+    parser.add_argument("--after-id", type=int, default=0, help="resume after this entry id")
+    parser.add_argument("--page-size", type=int, default=EXPORT_PAGE_SIZE)
+    parser.add_argument("--output", help="file to write (default: stdout)")
+    args = parser.parse_args()
+
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    started = time.perf_counter()
+    rows = 0
+    last_id = args.after_id
+    try:
+        if args.format == ExportFormat.csv:
+            out.write(csv_header())
+        for page in db.iter_entries(args.after_id, args.page_size, args.mode, args.since, args.until):
+            out.write(encode_page(page, args.format))
+            rows += len(page)
+            last_id = page[-1][0]
+    finally:
+        if args.output:
+            out.close()
+    elapsed = time.perf_counter() - started
+    print(f"Exported {rows} entries in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):,.0f}/s), "
+          f"last id {last_id}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
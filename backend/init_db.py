@@ -1,10 +1,17 @@
 #!/usr/bin/env python3
 """
 Database initialization script for Snake Rivals Arena backend.
-Creates all tables and optionally seeds with sample data.
+Creates all tables and optionally seeds with sample data, or with a synthetic
+population of any size for scale testing.
+
+Usage:
+    uv run python init_db.py --seed
+    uv run python init_db.py --bulk 1000000 --games-per-user 10
+    uv run python init_db.py --rebuild-bests
 """
-import sys
-from app.database import init_db
+import argparse
+import time
+from app.database import engine, init_db
 from app.db import db
 
 def seed_sample_data():
@@ -39,8 +46,53 @@ def seed_sample_data():
     
     print("Sample data seeded successfully!")
 
+def seed_bulk_data(args):
+    """Bulk-load a synthetic population (see app/seeding.py)"""
+    from app.seeding import SEED_PASSWORD, SeedConfig, bulk_load
+    
+    config = SeedConfig(
+        users=args.bulk,
+        games_per_user=args.games_per_user,
+        days=args.days,
+        seed=args.random_seed
+    )
+    print(f"Seeding {config.users} synthetic users (~{config.users * config.games_per_user:.0f} games "
+          f"over {config.days} days), {args.chunk_size} users per transaction...")
+    started = time.perf_counter()
+    
+    def progress(users, entries, bests):
+        elapsed = time.perf_counter() - started
+        print(f"  - {users} users, {entries} entries, {bests} bests "
+              f"({(users + entries + bests) / elapsed:,.0f} rows/s)", flush=True)
+    
+    users, entries, bests = bulk_load(
+        engine, config, prefix=args.prefix, chunk_size=args.chunk_size,
+        rebuild_indexes=args.drop_indexes, progress=progress
+    )
+    print(f"Seeded {users} users, {entries} leaderboard entries and {bests} period bests "
+          f"in {time.perf_counter() - started:.1f}s (password: {SEED_PASSWORD})")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Initialize the Snake Rivals Arena database")
+    action = parser.add_mutually_exclusive_group()
+    action.add_argument("--seed", action="store_true", help="add the three sample users")
+    action.add_argument("--bulk", type=int, metavar="USERS", help="add a synthetic population of USERS players")
+    action.add_argument("--rebuild-bests", action="store_true",
+                        help="recompute per-mode leaderboards from score history")
+    bulk = parser.add_argument_group("bulk seeding")
+    bulk.add_argument("--games-per-user", type=float, default=10.0, help="mean games per player")
+    bulk.add_argument("--days", type=int, default=365, help="length of the generated history")
+    bulk.add_argument("--chunk-size", type=int, default=10000, help="users per transaction")
+    bulk.add_argument("--prefix", default="Player", help="username prefix; numbering continues across runs")
+    bulk.add_argument("--random-seed", type=int, default=1)
+    bulk.add_argument("--drop-indexes", action="store_true",
+                      help="drop secondary indexes for the load and rebuild them at the end "
+                           "(about twice as fast; only on a database nothing is serving from)")
+    return parser.parse_args()
+
 def main():
     """Main initialization function"""
+    args = parse_args()
     print("Initializing Snake Rivals Arena database...")
     
     # Create all tables
@@ -48,9 +100,14 @@ def main():
     init_db()
     print("Database tables created successfully!")
     
-    # Check if we should seed data
-    if len(sys.argv) > 1 and sys.argv[1] == "--seed":
+    if args.seed:
         seed_sample_data()
+    elif args.bulk:
+        seed_bulk_data(args)
+    elif args.rebuild_bests:
+        print("Rebuilding per-mode leaderboards from score history...")
+        db.rebuild_leaderboard_bests()
+        print("Leaderboards rebuilt successfully!")
     else:
         print("\nTo seed sample data, run: uv run python init_db.py --seed")
     
@@ -1,18 +1,87 @@
-from fastapi import FastAPI, HTTPException, Depends, status
+import asyncio
+import hmac
+import logging
+import secrets
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Depends, Header, Query, Request, Response, WebSocket, WebSocketDisconnect, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from typing import List
+from starlette.concurrency import run_in_threadpool
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy.orm import Session
 from app.models import (
-    Player, LeaderboardEntry, LiveGame, GameMode,
+    Player, LeaderboardEntry, LeaderboardPeriod, LiveGame, LiveGameSort, GameMode, ExportFormat,
     AuthResponse, ErrorResponse, LoginRequest, SignupRequest,
-    SubmitScoreRequest, SubmitScoreResponse
+    SubmitScoreRequest, SubmitScoreResponse, SubmissionStatusResponse, GameStartResponse
 )
-from app.db import db
+from app.config import (
+    ADMIN_TOKEN, COMPACTION_INTERVAL_SECONDS, EXPORT_PAGE_SIZE, METRICS_ENABLED, METRICS_TOKEN, SCORE_WRITE_BEHIND, SCORE_REQUIRE_REPLAY, SCORE_REPLAY_MAX_BYTES,
+    LIVE_BOT_GAMES, LIVE_BOT_STRATEGY, LIVE_SAVE_REPLAYS, LIVE_TICK_MS
+)
+from app.database import get_db
+from app.db import db, async_db
+from app.metrics import MetricsMiddleware, metrics, stats_collector
+from app.passwords import password_hasher, PasswordHasherBusy
+from app.profiling import ProfileMiddleware, ProfilerBusy, admin_token_valid, profile_path, sampling_profiler
+from app.tokens import create_access_token, create_game_token, verify_access_token, verify_game_token
+from app.bots import make_bot
+from app.compaction import entry_compactor
+from app.engine import SnakeGame
+from app.export import MEDIA_TYPES, csv_header, encode_page
+from app.frames import encode_keyframe, step_frame
+from app.live import live_manager
+from app.live_registry import live_registry
+from app.response_cache import LEADERBOARD, LIVE_GAMES
+from app.responses import cached_json_response
+from app.replay import ReplayFormatError, ReplayReader
+from app.verification import ScoreSubmission, score_verifier, ScoreVerifierBusy
+from app.write_behind import ScoreBufferFull
+
+logger = logging.getLogger(__name__)
+
+def save_live_replay(session, data: bytes):
+    """Store a finished hosted game without blocking the tick loop"""
+    player_id = session.player.id if session.persist else None
+    future = asyncio.get_running_loop().run_in_executor(None, db.save_replay, data, player_id)
+    future.add_done_callback(_log_replay_failure)
+
+def _log_replay_failure(future: asyncio.Future):
+    if not future.cancelled() and future.exception() is not None:
+        logger.error("Saving replay failed", exc_info=future.exception())
+
+def accept_verified_score(submission: ScoreSubmission, replay: bytes) -> Optional[int]:
+    """Record a score whose replay checked out; runs on the verifier's accept thread"""
+    return db.record_verified_score(submission.user_id, submission.score, submission.mode, replay)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm the in-memory leaderboard index in the background; reads use the database until it is ready
+    db.warm_rank_index()
+    if SCORE_WRITE_BEHIND:
+        db.start_write_behind()
+    if LIVE_SAVE_REPLAYS:
+        live_manager.on_replay = save_live_replay
+    for i in range(LIVE_BOT_GAMES):
+        live_manager.create_bot_game(GameMode.walls if i % 2 == 0 else GameMode.pass_through,
+                                     controller=make_bot(LIVE_BOT_STRATEGY))
+    live_manager.start()
+    if COMPACTION_INTERVAL_SECONDS > 0:
+        entry_compactor.start(COMPACTION_INTERVAL_SECONDS)
+    yield
+    await run_in_threadpool(entry_compactor.stop)
+    await live_manager.stop()
+    # Verified scores may still go through the write-behind buffer
+    await run_in_threadpool(score_verifier.shutdown)
+    await run_in_threadpool(db.stop_write_behind)
+    password_hasher.shutdown()
 
 app = FastAPI(
     title="Snake Rivals Arena API",
     version="1.0.0",
-    description="API for the Snake Rivals Arena game backend."
+    description="API for the Snake Rivals Arena game backend.",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -29,8 +98,47 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if ADMIN_TOKEN:
+    app.add_middleware(ProfileMiddleware)
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    metrics.add_collector(stats_collector("password_hash", "bcrypt worker pool", password_hasher.stats))
+    metrics.add_collector(stats_collector("score_verify", "Replay verification pool", score_verifier.stats))
+    metrics.add_collector(stats_collector("entry_compaction", "Score history compaction", entry_compactor.stats))
+    if SCORE_WRITE_BEHIND:
+        metrics.add_collector(stats_collector(
+            "score_write_behind", "Write-behind score buffer",
+            lambda: db.score_buffer.stats() if db.score_buffer is not None else {}
+        ))
+
 security = HTTPBearer()
 
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    # Shed auth load instead of queueing without bound
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Authentication service busy, please retry"},
+        headers={"Retry-After": "1"},
+    )
+
+@app.exception_handler(ScoreBufferFull)
+async def score_buffer_full_handler(request: Request, exc: ScoreBufferFull):
+    # Write-behind cannot drain (database down): refuse rather than buffer without bound
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Score ingestion busy, please retry"},
+        headers={"Retry-After": "1"},
+    )
+
+@app.exception_handler(ScoreVerifierBusy)
+async def score_verifier_busy_handler(request: Request, exc: ScoreVerifierBusy):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Score verification busy, please retry"},
+        headers={"Retry-After": "1"},
+    )
+
 @app.get("/")
 async def home():
     """Welcome endpoint for the Snake Rivals Arena API"""
@@ -40,22 +148,67 @@ async def home():
         "docs": "/docs",
         "endpoints": {
             "authentication": ["/auth/login", "/auth/signup", "/auth/logout", "/auth/me"],
-            "leaderboard": ["/leaderboard"],
-            "spectate": ["/spectate/live", "/spectate/live/{gameId}"]
+            "leaderboard": ["/leaderboard", "/leaderboard/submissions/{submissionId}"],
+            "spectate": ["/spectate/live", "/spectate/live/{gameId}", "/spectate/live/{gameId}/stream"],
+            "replays": ["/replays/{replayId}", "/replays/{replayId}/stream"]
         }
     }
 
-# Mock token verification
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    token = credentials.credentials
-    if not token.startswith("mock-token-"):
+# Metrics scraping, enabled by setting METRICS_TOKEN or ADMIN_TOKEN
+async def require_metrics_token(authorization: Optional[str] = Header(None)):
+    token = METRICS_TOKEN or ADMIN_TOKEN
+    if not METRICS_ENABLED or not token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    scheme, _, credentials = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(credentials.encode("utf-8"), token.encode("utf-8")):
+        raise HTTPException(status_code=403, detail="Invalid metrics token")
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False,
+         dependencies=[Depends(require_metrics_token)])
+async def get_metrics():
+    """Request, database and worker pool metrics in the Prometheus text format"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+# Admin endpoints, enabled by setting ADMIN_TOKEN
+async def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not admin_token_valid(x_admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+@app.post("/admin/profile", response_class=PlainTextResponse, include_in_schema=False,
+          dependencies=[Depends(require_admin)])
+async def sample_profile(seconds: float = Query(10, gt=0), interval_ms: float = Query(5, ge=0.5),
+                         idle: bool = False):
+    """Sample every thread's stack for `seconds` and return collapsed stacks for a flame graph"""
+    try:
+        stacks = await run_in_threadpool(sampling_profiler.sample, seconds, interval_ms, idle)
+    except ProfilerBusy:
+        raise HTTPException(status_code=409, detail="A profile is already being taken")
+    return PlainTextResponse(
+        sampling_profiler.collapsed(stacks),
+        headers={"Content-Disposition": 'attachment; filename="profile.folded"'},
+    )
+
+@app.get("/admin/profiles/{profile_id}", include_in_schema=False, dependencies=[Depends(require_admin)])
+async def download_profile(profile_id: str):
+    """Download the pstats file of a request profiled with X-Profile"""
+    path = profile_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="application/octet-stream", filename=f"{profile_id}.prof")
+
+# Signed token verification
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security),
+                           session: Session = Depends(get_db)):
+    user_id = verify_access_token(credentials.credentials)
+    if not user_id:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    user_id = token.replace("mock-token-", "")
-    user = db.get_user_by_id(user_id)
+    user = await async_db.get_user_by_id(user_id, session)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -64,13 +217,15 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         )
     return user
 
+# Login and signup use short private sessions instead of get_db, so no pooled
+# connection stays checked out while bcrypt runs
 @app.post("/auth/login", response_model=AuthResponse, responses={401: {"model": ErrorResponse}})
 async def login(request: LoginRequest):
-    user = db.authenticate_user(request.username, request.password)
+    user = await async_db.authenticate_user(request.username, request.password)
     if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
-    return AuthResponse(user=user, token=f"mock-token-{user.id}")
+    return AuthResponse(user=user, token=create_access_token(user.id))
 
 @app.post("/auth/signup", response_model=AuthResponse, status_code=201, responses={400: {"model": ErrorResponse}})
 async def signup(request: SignupRequest):
@@ -79,11 +234,11 @@ async def signup(request: SignupRequest):
     if len(request.password) < 3:
         raise HTTPException(status_code=400, detail="Password must be at least 3 characters")
     
-    if db.get_user_by_username(request.username):
+    if await async_db.get_user_by_username(request.username):
         raise HTTPException(status_code=400, detail="Username already taken")
     
-    user = db.create_user(request.username, request.password)
-    return AuthResponse(user=user, token=f"mock-token-{user.id}")
+    user = await async_db.create_user(request.username, request.password)
+    return AuthResponse(user=user, token=create_access_token(user.id))
 
 @app.post("/auth/logout")
 async def logout(current_user: Player = Depends(get_current_user)):
@@ -94,21 +249,158 @@ async def get_me(current_user: Player = Depends(get_current_user)):
     return current_user
 
 @app.get("/leaderboard", response_model=List[LeaderboardEntry])
-async def get_leaderboard(limit: int = 10):
-    return db.get_top_scores(limit)
+async def get_leaderboard(request: Request, limit: int = Query(10, ge=1, le=100), mode: Optional[GameMode] = None,
+                          period: LeaderboardPeriod = LeaderboardPeriod.all):
+    return await cached_json_response(
+        request, LEADERBOARD, (limit, mode, period),
+        lambda: async_db.get_top_scores(limit, mode, period)
+    )
+
+@app.post("/leaderboard/games", response_model=GameStartResponse)
+async def start_game(current_user: Player = Depends(get_current_user)):
+    """Issue the seed a replay-backed submission must be played on, bound to this player"""
+    seed = secrets.randbits(32)
+    return GameStartResponse(seed=seed, gameToken=create_game_token(current_user.id, seed))
+
+@app.post("/leaderboard", response_model=SubmitScoreResponse, response_model_exclude_unset=True,
+          responses={202: {"model": SubmitScoreResponse}, 409: {"model": ErrorResponse},
+                     422: {"model": ErrorResponse}})
+async def submit_score(request: SubmitScoreRequest, response: Response,
+                       current_user: Player = Depends(get_current_user), session: Session = Depends(get_db)):
+    if request.replay is None:
+        if SCORE_REQUIRE_REPLAY:
+            raise HTTPException(status_code=422, detail="A replay is required to submit a score")
+        # get_current_user shares this request-scoped session
+        success = await async_db.update_score(current_user.id, request.score, request.mode, session)
+        new_rank = await async_db.get_player_rank(current_user.id, session) if success else None
+        return SubmitScoreResponse(success=success, newRank=new_rank)
+
+    # Replay-backed: the score is only recorded once the replay reproduces it
+    if len(request.replay) > SCORE_REPLAY_MAX_BYTES:
+        raise HTTPException(status_code=422, detail="Replay too large")
+    try:
+        reader = ReplayReader(request.replay)
+    except ReplayFormatError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    # Only seeds the server issued to this player count, so replays cannot be precomputed or borrowed
+    seed = verify_game_token(request.gameToken, current_user.id) if request.gameToken else None
+    if seed is None or reader.seed != seed:
+        raise HTTPException(status_code=422, detail="Replay was not played on a seed issued to this player")
+    try:
+        submitted = await async_db.replay_submitted(request.replay, session)
+    except ReplayFormatError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    if submitted:
+        raise HTTPException(status_code=409, detail="Replay already submitted")
+    submission = score_verifier.submit(
+        current_user.id, request.score, request.mode, request.replay, accept_verified_score
+    )
+    response.status_code = 202
+    return SubmitScoreResponse(success=True, status=submission.status, submissionId=submission.id)
 
-@app.post("/leaderboard", response_model=SubmitScoreResponse)
-async def submit_score(request: SubmitScoreRequest, current_user: Player = Depends(get_current_user)):
-    success = db.update_score(current_user.id, request.score, request.mode)
-    return SubmitScoreResponse(success=success, newRank=5) # Mock rank
+@app.get("/leaderboard/submissions/{submission_id}", response_model=SubmissionStatusResponse,
+         responses={404: {"model": ErrorResponse}})
+async def get_submission(submission_id: str, current_user: Player = Depends(get_current_user)):
+    """Poll a replay-backed submission until it is verified or rejected"""
+    submission = score_verifier.get(submission_id)
+    if submission is None or submission.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Submission not found")
+    return SubmissionStatusResponse(
+        id=submission.id,
+        status=submission.status,
+        score=submission.score,
+        mode=submission.mode,
+        newRank=submission.new_rank,
+        reason=submission.reason,
+    )
+
+@app.get("/leaderboard/export", response_class=StreamingResponse, include_in_schema=False,
+         dependencies=[Depends(require_admin)])
+async def export_leaderboard(format: ExportFormat = ExportFormat.ndjson, mode: Optional[GameMode] = None,
+                             since: Optional[datetime] = None, until: Optional[datetime] = None,
+                             after_id: int = Query(0, ge=0)):
+    """Stream the score history in id order as NDJSON or CSV, one keyset page at a time (see app/export.py)"""
+    async def chunks():
+        if format == ExportFormat.csv:
+            yield csv_header()
+        last_id = after_id
+        while True:
+            page = await async_db.get_entries_page(last_id, EXPORT_PAGE_SIZE, mode, since, until)
+            if not page:
+                return
+            yield encode_page(page, format)
+            last_id = page[-1][0]
+
+    return StreamingResponse(
+        chunks(),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="leaderboard.{format.value}"'},
+    )
 
 @app.get("/spectate/live", response_model=List[LiveGame])
-async def get_live_games():
-    return db.get_live_games()
+async def get_live_games(request: Request, sort: LiveGameSort = LiveGameSort.score,
+                         offset: int = Query(0, ge=0), limit: int = Query(50, ge=1, le=200)):
+    return await cached_json_response(
+        request, LIVE_GAMES, (sort, offset, limit),
+        lambda: live_registry.list(sort, offset, limit)
+    )
 
 @app.get("/spectate/live/{game_id}", response_model=LiveGame, responses={404: {"model": ErrorResponse}})
 async def get_live_game(game_id: str):
-    game = db.get_live_game(game_id)
+    game = live_registry.get(game_id)
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
     return game
+
+@app.websocket("/spectate/live/{game_id}/stream")
+async def stream_live_game(websocket: WebSocket, game_id: str):
+    """Stream a hosted game as binary frames: a keyframe, then per-tick deltas (see app/frames.py)"""
+    subscription = live_manager.subscribe(game_id)
+    if subscription is None:
+        await websocket.close(code=4404)
+        return
+    await websocket.accept()
+    try:
+        while True:
+            frame = await subscription.get()
+            if frame is None:
+                # The game was removed from the server
+                await websocket.close(code=1000, reason="Game ended")
+                break
+            await websocket.send_bytes(frame)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        live_manager.unsubscribe(subscription)
+
+@app.get("/replays/{replay_id}", response_class=Response, responses={404: {"model": ErrorResponse}})
+async def get_replay(replay_id: int):
+    """Download a recorded game in the compact replay format (see app/replay.py)"""
+    data = await async_db.get_replay(replay_id)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Replay not found")
+    return Response(data, media_type="application/octet-stream")
+
+@app.websocket("/replays/{replay_id}/stream")
+async def stream_replay(websocket: WebSocket, replay_id: int, speed: float = 1.0):
+    """Re-watch a recorded game with the live stream's frame format, decoded as it plays"""
+    data = await async_db.get_replay(replay_id)
+    if data is None:
+        await websocket.close(code=4404)
+        return
+    await websocket.accept()
+    reader = ReplayReader(data)
+    game = SnakeGame(reader.mode, reader.seed, reader.grid_size)
+    delay = LIVE_TICK_MS / 1000 / min(max(speed, 0.25), 16.0)
+    try:
+        await websocket.send_bytes(encode_keyframe(game, 0))
+        for tick, move in enumerate(reader.moves(), start=1):
+            await asyncio.sleep(delay)
+            frame = step_frame(game, tick, move)
+            if frame is not None:
+                await websocket.send_bytes(frame)
+            if game.is_game_over:
+                break
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
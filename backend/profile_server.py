@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Profile a running Snake Rivals Arena server.
+Takes a whole-process stack sample (collapsed stacks for flamegraph.pl,
+speedscope or inferno) or profiles a single request with cProfile and prints
+its hottest functions. Both need the server's ADMIN_TOKEN.
+
+Usage:
+    uv run python profile_server.py sample --seconds 30 -o server.folded
+    uv run python profile_server.py request GET "/leaderboard?limit=100"
+    uv run python profile_server.py request POST /leaderboard --json '{"score": 120, "mode": "walls"}' \\
+        --auth <jwt>
+"""
+import argparse
+import json
+import os
+import pstats
+import sys
+import tempfile
+
+import httpx
+
+
+def sample(args, headers):
+    response = httpx.post(
+        f"{args.url}/admin/profile",
+        params={"seconds": args.seconds, "interval_ms": args.interval_ms, "idle": args.idle},
+        headers=headers,
+        timeout=args.seconds + 30,
+    )
+    response.raise_for_status()
+    with open(args.output, "w") as f:
+        f.write(response.text)
+    print(f"Wrote {len(response.text.splitlines())} stacks to {args.output}")
+    print(f"Render with: flamegraph.pl {args.output} > profile.svg  (or load it at https://www.speedscope.app)")
+
+
+def profile_request(args, headers):
+    headers = dict(headers, **{"X-Profile": "1"})
+    if args.auth:
+        headers["Authorization"] = f"Bearer {args.auth}"
+    body = json.loads(args.json) if args.json else None
+    response = httpx.request(args.method, f"{args.url}{args.path}", json=body, headers=headers, timeout=60)
+    print(f"{args.method} {args.path} -> {response.status_code} in {response.elapsed.total_seconds() * 1000:.1f} ms")
+    profile_id = response.headers.get("X-Profile-Id")
+    if profile_id is None:
+        print("No profile recorded (the request made no database calls, or the token was rejected)")
+        return 1
+
+    download = httpx.get(f"{args.url}/admin/profiles/{profile_id}", headers=headers, timeout=30)
+    download.raise_for_status()
+    path = args.output or os.path.join(tempfile.gettempdir(), f"{profile_id}.prof")
+    with open(path, "wb") as f:
+        f.write(download.content)
+    print(f"Saved {path} (open with snakeviz or `python -m pstats`)")
+    pstats.Stats(path).sort_stats(args.sort).print_stats(args.top)
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--token", default=os.getenv("ADMIN_TOKEN"), help="defaults to $ADMIN_TOKEN")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    sample_parser = subcommands.add_parser("sample", help="sample every thread's stack for a while")
+    sample_parser.add_argument("--seconds", type=float, default=10)
+    sample_parser.add_argument("--interval-ms", type=float, default=5)
+    sample_parser.add_argument("--idle", action="store_true", help="keep threads parked on locks and queues")
+    sample_parser.add_argument("-o", "--output", default="profile.folded")
+
+    request_parser = subcommands.add_parser("request", help="profile one request with cProfile")
+    request_parser.add_argument("method", type=str.upper)
+    request_parser.add_argument("path")
+    request_parser.add_argument("--json", help="request body")
+    request_parser.add_argument("--auth", help="bearer token for authenticated endpoints")
+    request_parser.add_argument("--sort", default="cumulative")
+    request_parser.add_argument("--top", type=int, default=25)
+    request_parser.add_argument("-o", "--output", help="where to save the .prof file")
+    args = parser.parse_args()
+
+    if not args.token:
+        parser.error("an admin token is required (--token or ADMIN_TOKEN)")
+    headers = {"X-Admin-Token": args.token}
+    if args.command == "sample":
+        sample(args, headers)
+        return 0
+    return profile_request(args, headers)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app.batch_engine import BatchSnakeEngine, NO_ACTION, DIRECTION_INDEX
+from app.engine import SnakeGame
+from app.models import GameMode
+
+DIRECTION_NAMES = {index: name for name, index in DIRECTION_INDEX.items()}
+
+
+@pytest.mark.parametrize("mode", [GameMode.walls, GameMode.pass_through])
+def test_matches_single_game_engine(mode):
+    """Test that the batch engine follows the same rules as SnakeGame"""
+    rng = np.random.default_rng(3)
+    batch = BatchSnakeEngine(64, mode, seed=5)
+    games = [SnakeGame(mode, seed=0) for _ in range(64)]
+    for i, game in enumerate(games):
+        game.food = int(batch.food[i])
+
+    for _ in range(200):
+        actions = rng.choice([NO_ACTION, NO_ACTION, 0, 1, 2, 3], size=64).astype(np.int8)
+        batch.step(actions)
+        for i, game in enumerate(games):
+            before = game.score
+            game.step(DIRECTION_NAMES.get(int(actions[i])))
+            if game.score != before:
+                game.food = int(batch.food[i])
+            assert game.is_game_over == (not batch.alive[i])
+            if not game.is_game_over:
+                assert game.snake() == batch.snake(i)
+                assert game.score == batch.score[i]
+
+
+def test_reset_restarts_finished_games():
+    """Test that dead games can be restarted in place"""
+    batch = BatchSnakeEngine(4, GameMode.walls, seed=1)
+    batch.food[:] = 0
+    for _ in range(10):
+        batch.step()
+    assert not batch.alive.any()
+    batch.reset(~batch.alive)
+    assert batch.alive.all()
+    assert batch.snake(2) == [(10, 10), (9, 10), (8, 10)]
+    assert (batch.occupied.sum(axis=1) == 3).all()
@@ -0,0 +1,40 @@
+from app.bots import PathfinderBot, _hamiltonian_cycle
+from app.engine import SnakeGame
+from app.models import GameMode
+from app.tournament import play_game
+
+
+def place_food(game: SnakeGame, x: int, y: int):
+    game.food = y * game.grid_size + x
+
+
+def test_pathfinder_takes_shortest_path_to_food():
+    """Test that the bot reaches food in as many moves as the Manhattan distance"""
+    game = SnakeGame(GameMode.walls, seed=1)
+    place_food(game, 14, 6)
+    bot = PathfinderBot()
+    for _ in range(8):
+        assert game.step(bot.next_move(game))
+    assert game.score == 10
+
+
+def test_pathfinder_outlives_greedy():
+    """Test that the pathfinder scores far more than the ported greedy bot on the same seeds"""
+    for mode in (GameMode.walls, GameMode.pass_through):
+        greedy = sum(play_game("greedy", mode, seed).score for seed in range(3))
+        pathfinder = sum(play_game("pathfinder", mode, seed).score for seed in range(3))
+        assert pathfinder > 10 * max(greedy, 10)
+
+
+def test_hamiltonian_cycle_visits_every_cell_once():
+    """Test that the fallback cycle is a single loop of adjacent cells"""
+    size = 6
+    successor = _hamiltonian_cycle(size)
+    cell, seen = 0, set()
+    for _ in range(size * size):
+        seen.add(cell)
+        nxt = successor[cell]
+        assert abs(nxt % size - cell % size) + abs(nxt // size - cell // size) == 1
+        cell = nxt
+    assert cell == 0 and len(seen) == size * size
+    assert _hamiltonian_cycle(5) is None
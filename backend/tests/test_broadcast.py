@@ -0,0 +1,80 @@
+import asyncio
+
+from app.broadcast import BroadcastHub
+
+
+def test_frames_are_shared_between_subscribers():
+    """Test that every subscriber receives the same frame object"""
+    async def scenario():
+        hub = BroadcastHub(max_queue=4)
+        first = hub.subscribe("game", initial=b"key")
+        second = hub.subscribe("game")
+        assert hub.spectators("game") == 2
+
+        frame = b"delta"
+        hub.publish("game", frame, lambda: b"unused")
+        assert await first.get() == b"key"
+        assert await first.get() is frame
+        assert await second.get() is frame
+
+        hub.unsubscribe(first)
+        assert hub.spectators("game") == 1
+
+    asyncio.run(scenario())
+
+
+def test_slow_subscriber_is_coalesced_to_keyframe():
+    """Test that an overflowing queue is replaced by one keyframe"""
+    async def scenario():
+        hub = BroadcastHub(max_queue=3)
+        slow = hub.subscribe("game")
+        built = []
+
+        def keyframe():
+            built.append(1)
+            return b"keyframe"
+
+        for i in range(3):
+            hub.publish("game", bytes([i]), keyframe)
+        hub.publish("game", b"next", keyframe)
+        assert list(slow.frames) == [b"keyframe"]
+        assert slow.dropped == 3
+        assert len(built) == 1
+
+        hub.publish("game", b"after", keyframe)
+        assert await slow.get() == b"keyframe"
+        assert await slow.get() == b"after"
+
+    asyncio.run(scenario())
+
+
+def test_waiting_subscriber_is_woken():
+    """Test that a pending get() returns once a frame is published"""
+    async def scenario():
+        hub = BroadcastHub()
+        subscription = hub.subscribe("game")
+        waiter = asyncio.ensure_future(subscription.get())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+        hub.publish("game", b"frame", lambda: b"key")
+        assert await asyncio.wait_for(waiter, 1) == b"frame"
+
+    asyncio.run(scenario())
+
+
+def test_close_wakes_waiting_subscribers():
+    """Test that closing a channel ends every subscriber's wait after its queued frames"""
+    async def scenario():
+        hub = BroadcastHub()
+        idle = hub.subscribe("game")
+        behind = hub.subscribe("game", initial=b"key")
+        waiting = asyncio.ensure_future(idle.get())
+        await asyncio.sleep(0)
+
+        hub.close("game")
+        assert await asyncio.wait_for(waiting, 1) is None
+        assert await behind.get() == b"key"
+        assert await behind.get() is None
+        assert hub.spectators("game") == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,85 @@
+import base64
+import gzip
+import json
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+import app.db as db_module
+from app.compaction import EntryCompactor
+from app.database import Base
+from app.db import Database
+from app.models import GameMode
+from app.passwords import password_hasher
+from app.replay import encode_replay
+from app.seeding import SeedConfig, bulk_load
+
+BESTS = "SELECT player_id, mode, period, period_start, score, timestamp FROM leaderboard_bests"
+
+
+def test_compaction_archives_summarizes_and_deletes_expired_entries(tmp_path, monkeypatch):
+    """Test that expired entries move to archives and daily rows without changing any leaderboard"""
+    monkeypatch.setattr(password_hasher, "rounds", 4)
+    engine = create_engine(f"sqlite:///{tmp_path}/scores.db")
+    Base.metadata.create_all(bind=engine)
+    bulk_load(engine, SeedConfig(users=200, days=60))
+    monkeypatch.setattr(db_module, "SessionLocal", sessionmaker(bind=engine))
+    cutoff = datetime.utcnow() - timedelta(days=30)
+    with engine.connect() as conn:
+        entries_before = dict(conn.execute(text("SELECT id, score FROM leaderboard_entries")).all())
+        bests_before = sorted(conn.execute(text(BESTS)).all())
+        old_entry = conn.execute(text("SELECT id, player_id FROM leaderboard_entries WHERE timestamp < :cutoff"),
+                                 {"cutoff": cutoff}).first()
+        new_entry = conn.execute(text("SELECT id, player_id FROM leaderboard_entries WHERE timestamp >= :cutoff"),
+                                 {"cutoff": cutoff}).first()
+
+    # Link a replay to one expired and one kept entry
+    replays = {}
+    for seed, (entry_id, player_id) in enumerate((old_entry, new_entry), start=1):
+        data = encode_replay(seed, GameMode.walls, ["up"] * seed, score=0)
+        replays[entry_id] = (Database().save_replay(data, player_id), data)
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE leaderboard_entries SET replay_id = :replay_id WHERE id = :id"),
+                         {"replay_id": replays[entry_id][0], "id": entry_id})
+
+    compactor = EntryCompactor(Database(), str(tmp_path / "archive"), retention_days=30, batch_size=100, pause_ms=0)
+    moved = compactor.run()
+    assert 0 < moved < len(entries_before)
+    assert compactor.run() == 0
+
+    archived = {}
+    for path in (tmp_path / "archive").glob("leaderboard_entries-*.ndjson.gz"):
+        with gzip.open(path, "rt") as f:
+            for line in f:
+                row = json.loads(line)
+                assert row["id"] not in archived
+                archived[row["id"]] = row
+    assert len(archived) == moved
+    assert all(datetime.fromisoformat(row["timestamp"]) < cutoff for row in archived.values())
+    assert {entry_id: row["score"] for entry_id, row in archived.items()} == {
+        entry_id: score for entry_id, score in entries_before.items() if entry_id in archived
+    }
+
+    with engine.connect() as conn:
+        remaining = dict(conn.execute(text("SELECT id, score FROM leaderboard_entries")).all())
+        games, total = conn.execute(text("SELECT sum(games), sum(total_score) FROM leaderboard_daily")).one()
+    assert remaining.keys() | archived.keys() == entries_before.keys()
+    assert not remaining.keys() & archived.keys()
+    assert (games, total) == (moved, sum(row["score"] for row in archived.values()))
+
+    # The expired entry's replay moved to the archive; the kept entry's is untouched
+    old_replay_id, old_data = replays[old_entry[0]]
+    assert archived[old_entry[0]]["replayId"] == old_replay_id
+    archived_replays = []
+    for path in (tmp_path / "archive").glob("game_replays-*.ndjson.gz"):
+        with gzip.open(path, "rt") as f:
+            archived_replays.extend(json.loads(line) for line in f)
+    assert [(row["id"], base64.b64decode(row["data"])) for row in archived_replays] == [(old_replay_id, old_data)]
+    assert Database().get_replay(old_replay_id) is None
+    assert Database().get_replay(replays[new_entry[0]][0]) == replays[new_entry[0]][1]
+
+    # Bests rebuilt from daily summaries plus the remaining entries are unchanged
+    Database().rebuild_leaderboard_bests()
+    with engine.connect() as conn:
+        assert sorted(conn.execute(text(BESTS)).all()) == bests_before
@@ -0,0 +1,83 @@
+from app.engine import Mulberry32, SnakeGame, replay_game, validate_score
+from app.models import GameMode
+
+
+def place_food(game: SnakeGame, x: int, y: int):
+    game.food = y * game.grid_size + x
+
+
+def test_initial_state():
+    """Test the starting snake matches createInitialGameState"""
+    game = SnakeGame(GameMode.walls, seed=1)
+    assert game.snake() == [(10, 10), (9, 10), (8, 10)]
+    assert game.direction == "right"
+    assert game.food is not None and not game.occupied[game.food]
+
+
+def test_mulberry32_matches_javascript():
+    """Test the PRNG against values produced by the JavaScript implementation"""
+    rng = Mulberry32(12345)
+    assert [rng.random() for _ in range(3)] == [0.9797282677609473, 0.3067522644996643, 0.484205421525985]
+
+
+def test_walls_mode_ends_at_edge():
+    """Test that hitting a wall ends the game in walls mode"""
+    game = SnakeGame(GameMode.walls, seed=1)
+    place_food(game, 0, 0)
+    for _ in range(9):
+        assert game.step()
+    assert game.snake()[0] == (19, 10)
+    assert not game.step()
+    assert game.is_game_over
+
+
+def test_pass_through_wraps():
+    """Test that the snake wraps around in pass-through mode"""
+    game = SnakeGame(GameMode.pass_through, seed=1)
+    place_food(game, 0, 0)
+    for _ in range(10):
+        assert game.step()
+    assert game.snake()[0] == (0, 10)
+
+
+def test_eating_grows_and_scores():
+    """Test eating food adds a segment and ten points"""
+    game = SnakeGame(GameMode.walls, seed=1)
+    place_food(game, 11, 10)
+    game.step()
+    assert game.score == 10
+    assert len(game.body) == 4
+    assert game.food is not None and not game.occupied[game.food]
+
+
+def test_reverse_input_is_ignored():
+    """Test that reversing direction skips the tick like moveSnake"""
+    game = SnakeGame(GameMode.walls, seed=1)
+    place_food(game, 0, 0)
+    assert game.step("left")
+    assert game.snake()[0] == (10, 10)
+    assert game.direction == "right"
+
+
+def test_self_collision():
+    """Test running into the body ends the game"""
+    game = SnakeGame(GameMode.walls, seed=1)
+    for cell in (11, 12, 13):
+        place_food(game, cell, 10)
+        game.step()
+    place_food(game, 0, 0)
+    assert game.step("down")
+    assert game.step("left")
+    assert not game.step("up")
+    assert game.is_game_over
+
+
+def test_replay_is_deterministic():
+    """Test that the same seed and inputs give the same game"""
+    moves = ["up", None, "left", None, None, "down", None, "right"] * 5
+    first = replay_game(99, GameMode.pass_through, moves)
+    second = replay_game(99, GameMode.pass_through, moves)
+    assert first.snake() == second.snake()
+    assert first.food == second.food
+    assert validate_score(99, GameMode.pass_through, moves, first.score)
+    assert not validate_score(99, GameMode.pass_through, moves, first.score + 10)
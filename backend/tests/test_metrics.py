@@ -0,0 +1,39 @@
+import asyncio
+import logging
+
+from app.metrics import MetricsMiddleware, MetricsRegistry
+
+
+def test_histogram_renders_cumulative_buckets():
+    """Test the Prometheus text output for counters and histograms"""
+    registry = MetricsRegistry()
+    registry.describe("latency_seconds", "histogram", "Latency")
+    for value in (0.0005, 0.003, 0.003, 20):
+        registry.observe("latency_seconds", value, (("route", "/a"),))
+    registry.inc("hits_total", 2, (("route", 'say "hi"'),))
+    body = registry.render()
+    assert 'latency_seconds_bucket{route="/a",le="0.001"} 1' in body
+    assert 'latency_seconds_bucket{route="/a",le="0.005"} 3' in body
+    assert 'latency_seconds_bucket{route="/a",le="10"} 3' in body
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 4' in body
+    assert 'latency_seconds_count{route="/a"} 4' in body
+    assert 'hits_total{route="say \\"hi\\""} 2' in body
+
+
+def test_middleware_logs_slow_requests(caplog):
+    """Test that requests over the threshold are counted and logged, and unmatched paths share a label"""
+    registry = MetricsRegistry()
+
+    async def app(scope, receive, send):
+        await asyncio.sleep(0.02)
+        await send({"type": "http.response.start", "status": 204, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(message):
+        pass
+
+    middleware = MetricsMiddleware(app, registry, slow_request_ms=10)
+    with caplog.at_level(logging.WARNING, logger="app.metrics"):
+        asyncio.run(middleware({"type": "http", "method": "GET", "path": "/x"}, None, send))
+    assert registry.value("http_slow_requests_total", (("method", "GET"), ("route", "unmatched"))) == 1
+    assert "Slow request: GET unmatched -> 204" in caplog.text
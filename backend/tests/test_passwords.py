@@ -0,0 +1,38 @@
+import asyncio
+
+from app.passwords import PasswordHasher, PasswordHasherBusy
+
+
+def test_pool_hash_and_verify():
+    """Test hashing and verification on the worker pool"""
+    hasher = PasswordHasher(rounds=4, workers=2, max_pending=4)
+
+    async def run():
+        hashed = await hasher.hash_async("password123")
+        return hashed, await hasher.verify_async("password123", hashed), await hasher.verify_async("nope", hashed)
+
+    try:
+        hashed, good, bad = asyncio.run(run())
+    finally:
+        hasher.shutdown()
+    assert hashed.startswith("$2b$04$")
+    assert good and not bad
+    stats = hasher.stats()
+    assert stats["completed_total"] == 3
+    assert stats["queued"] == 0
+
+
+def test_pool_rejects_when_full():
+    """Test that work beyond the pending cap is rejected"""
+    hasher = PasswordHasher(rounds=10, workers=1, max_pending=2)
+
+    async def run():
+        return await asyncio.gather(*(hasher.hash_async("password123") for _ in range(4)),
+                                    return_exceptions=True)
+
+    try:
+        results = asyncio.run(run())
+    finally:
+        hasher.shutdown()
+    assert sum(isinstance(r, PasswordHasherBusy) for r in results) == 2
+    assert hasher.stats()["rejected_total"] == 2
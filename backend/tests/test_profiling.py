@@ -0,0 +1,110 @@
+import asyncio
+import contextvars
+import pstats
+import threading
+
+import app.profiling as profiling
+from app.profiling import ProfileMiddleware, SamplingProfiler, run_profiled
+
+
+def spin(stop: threading.Event):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_sampler_collapses_busy_thread_stacks():
+    """Test that a busy thread shows up as a collapsed stack ending in its hot function"""
+    stop = threading.Event()
+    worker = threading.Thread(target=spin, args=(stop,), name="spinner")
+    worker.start()
+    try:
+        stacks = SamplingProfiler().sample(0.2, interval_ms=2)
+    finally:
+        stop.set()
+        worker.join()
+    text = SamplingProfiler.collapsed(stacks)
+    hot = [line for line in text.splitlines() if line.startswith("spinner;")]
+    assert hot and "test_profiling.py:spin" in hot[0]
+    assert int(hot[0].rsplit(" ", 1)[1]) > 0
+
+
+def test_profile_header_captures_threadpool_calls(monkeypatch, tmp_path):
+    """Test that X-Profile from an admin caller saves cProfile stats of the request's threadpool work"""
+    monkeypatch.setattr(profiling, "ADMIN_TOKEN", "secret")
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+
+    def database_call():
+        return sum(range(10000))
+
+    async def app(scope, receive, send):
+        # Like Starlette's run_in_threadpool, run the call in a copy of the request context
+        context = contextvars.copy_context()
+        await asyncio.get_running_loop().run_in_executor(None, context.run, run_profiled, database_call)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    def request(headers):
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        asyncio.run(ProfileMiddleware(app)({"type": "http", "headers": headers}, None, send))
+        return dict(sent[0]["headers"])
+
+    assert b"x-profile-id" not in request([(b"x-profile", b"1"), (b"x-admin-token", b"wrong")])
+    assert b"x-profile-id" not in request([(b"x-profile", b"1"), (b"x-admin-token", "sécret".encode("utf-8"))])
+    headers = request([(b"x-profile", b"1"), (b"x-admin-token", b"secret")])
+    stats = pstats.Stats(profiling.profile_path(headers[b"x-profile-id"].decode()))
+    assert any(name == "database_call" for _, _, name in stats.stats)
+
+
+def test_admin_token_check_handles_non_ascii(monkeypatch):
+    """Test that a non-ASCII admin token is refused rather than raising"""
+    monkeypatch.setattr(profiling, "ADMIN_TOKEN", "secret")
+    assert profiling.admin_token_valid("secret")
+    assert not profiling.admin_token_valid("sécret")
+    assert not profiling.admin_token_valid(None)
+    monkeypatch.setattr(profiling, "ADMIN_TOKEN", "sécret")
+    assert profiling.admin_token_valid("sécret")
+    monkeypatch.setattr(profiling, "ADMIN_TOKEN", "")
+    assert not profiling.admin_token_valid("")
+
+
+def test_concurrent_profiled_calls_take_turns(monkeypatch):
+    """Test that overlapping profiled calls all complete, with only one under cProfile at a time"""
+    barrier = threading.Barrier(2, timeout=5)
+
+    def database_call():
+        barrier.wait()
+        return 1
+
+    def profiled_request(results, profiles):
+        profiling._request_profiles.set(profiles)
+        results.append(run_profiled(database_call))
+
+    results, profiles = [], []
+    workers = [threading.Thread(target=contextvars.copy_context().run, args=(profiled_request, results, profiles))
+               for _ in range(2)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert results == [1, 1]
+    assert len(profiles) == 1
+
+
+def test_saved_profiles_are_pruned(monkeypatch, tmp_path):
+    """Test that only the newest PROFILE_MAX_FILES request profiles are kept"""
+    import cProfile
+    import os
+
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+    saved = []
+    for i in range(5):
+        profile = cProfile.Profile()
+        profile.runcall(sum, range(100))
+        saved.append(profiling.save_profiles([profile]))
+        os.utime(tmp_path / f"{saved[-1]}.prof", (i, i))
+    profiling.prune_profiles(keep=2)
+    assert sorted(path.stem for path in tmp_path.glob("*.prof")) == sorted(saved[-2:])
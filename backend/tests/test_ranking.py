@@ -0,0 +1,71 @@
+import random
+from collections import Counter
+
+from app.models import Player
+from app.ranking import RankIndex, ScoreHistogram
+
+
+def make_player(player_id: str, high_score: int) -> Player:
+    return Player(id=player_id, username=player_id, score=0, highScore=high_score, gamesPlayed=1)
+
+
+def test_top_uses_competition_ranking():
+    """Test that tied scores share a rank"""
+    index = RankIndex()
+    index.load([make_player("a", 300), make_player("b", 500), make_player("c", 300), make_player("d", 100)])
+    assert [(rank, p.id) for rank, p in index.top(10)] == [(1, "b"), (2, "a"), (2, "c"), (4, "d")]
+    assert index.rank_of("c") == 2
+    assert index.rank_for_score(400) == 2
+
+
+def test_upsert_moves_player():
+    """Test that updating a score re-ranks the player"""
+    index = RankIndex()
+    index.load([make_player("a", 300), make_player("b", 200)])
+    index.upsert(make_player("b", 900))
+    index.upsert(make_player("e", 250))
+    assert [p.id for _, p in index.top(10)] == ["b", "a", "e"]
+    assert index.remove("a")
+    assert not index.remove("a")
+    assert index.rank_of("e") == 2
+
+
+def test_score_window():
+    """Test fetching players within a score range"""
+    index = RankIndex()
+    index.load([make_player(f"p{i}", i * 10) for i in range(20)])
+    window = index.score_window(50, 80, 10)
+    assert [(rank, p.highScore) for rank, p in window] == [(12, 80), (13, 70), (14, 60), (15, 50)]
+
+
+def test_matches_sorted_reference():
+    """Test random updates against a brute-force ranking"""
+    rng = random.Random(7)
+    index = RankIndex()
+    scores = {}
+    for _ in range(2000):
+        player_id = f"p{rng.randint(0, 150)}"
+        if rng.random() < 0.8:
+            scores[player_id] = rng.randint(0, 40) * 10
+            index.upsert(make_player(player_id, scores[player_id]))
+        else:
+            assert index.remove(player_id) == (player_id in scores)
+            scores.pop(player_id, None)
+
+    expected = sorted(scores, key=lambda pid: (-scores[pid], pid))
+    assert [p.id for _, p in index.top(len(scores))] == expected
+    for player_id, score in scores.items():
+        assert index.rank_of(player_id) == 1 + sum(1 for s in scores.values() if s > score)
+
+
+def test_score_histogram_matches_rank_index():
+    """Test that histogram ranks equal rank index ranks for the same scores"""
+    rng = random.Random(3)
+    players = [make_player(f"p{i}", rng.randrange(0, 50) * 10) for i in range(300)]
+    index = RankIndex()
+    index.load(players)
+    histogram = ScoreHistogram()
+    assert histogram.rank_for_score(100) == 1
+    histogram.load(Counter(p.highScore for p in players).items())
+    for score in range(-10, 520, 5):
+        assert histogram.rank_for_score(score) == index.rank_for_score(score)
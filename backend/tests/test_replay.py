@@ -0,0 +1,100 @@
+import io
+import random
+
+import pytest
+
+from app.engine import SnakeGame, replay_game
+from app.models import GameMode
+from app.replay import (
+    ReplayFormatError, ReplayReader, ReplayRecorder, canonical_replay, encode_replay, replay_digest, verify_replay
+)
+
+
+def play_random_game(seed: int, mode: GameMode = GameMode.pass_through):
+    """Play a game that turns at random (about one tick in eight) and eats whatever it runs into"""
+    game = SnakeGame(mode, seed)
+    recorder = ReplayRecorder(seed, mode)
+    rng = random.Random(seed)
+    while not game.is_game_over and len(recorder.buffer) < 4096:
+        move = rng.choice(["up", "down", "left", "right"]) if rng.random() < 0.125 else None
+        recorder.record(move)
+        game.step(move)
+    return game, recorder.finish(game.score)
+
+
+def encode_unmerged(data: bytes, extra_moves=()) -> bytes:
+    """Re-encode a replay with one run per tick and `extra_moves` appended, as a tampering client might"""
+    codes = {None: 0, "up": 1, "down": 2, "left": 3, "right": 4}
+    reader = ReplayReader(data)
+    blob = bytearray(data[:9])
+    for move in [*reader.moves(), *extra_moves]:
+        blob.append((1 << 3) | codes[move])
+    blob.append(0)
+    score = reader.score
+    while score >= 0x80:
+        blob.append((score & 0x7F) | 0x80)
+        score >>= 7
+    blob.append(score)
+    return bytes(blob)
+
+
+def test_game_round_trip():
+    """Test that a recorded game replays to the same final state"""
+    game, data = play_random_game(seed=7)
+    assert game.is_game_over
+    ok, replayed = verify_replay(data)
+    assert ok
+    assert replayed.is_game_over
+    assert list(replayed.body) == list(game.body)
+    assert replayed.score == game.score
+    # Idle stretches collapse into single runs, so the blob costs a byte or two per turn
+    assert len(data) * 3 < game.ticks
+
+
+def test_streaming_decoder_reads_incrementally():
+    """Test decoding from a stream yields the same inputs without reading ahead"""
+    moves = [None] * 30 + ["up"] + [None] * 4 + ["right", "right", "down"] + [None] * 200
+    data = encode_replay(99, GameMode.pass_through, moves, score=0)
+    stream = io.BytesIO(data)
+    reader = ReplayReader(stream)
+    assert (reader.mode, reader.seed) == (GameMode.pass_through, 99)
+
+    decoded = reader.moves()
+    assert next(decoded) is None
+    assert stream.tell() < len(data)
+    assert [None] + list(decoded) == moves
+    assert reader.score == 0
+
+    final = None
+    for final in ReplayReader(data).games():
+        pass
+    expected = replay_game(99, GameMode.pass_through, moves)
+    assert list(final.body) == list(expected.body)
+
+
+def test_tampered_score_fails_verification():
+    """Test that a replay whose trailer claims a different score is rejected"""
+    assert verify_replay(encode_replay(3, GameMode.walls, [None] * 5, score=0))[0]
+    assert not verify_replay(encode_replay(3, GameMode.walls, [None] * 5, score=10))[0]
+
+
+def test_invalid_blobs():
+    """Test that garbage and truncated blobs raise ReplayFormatError"""
+    with pytest.raises(ReplayFormatError):
+        ReplayReader(b"nope")
+    data = encode_replay(1, GameMode.walls, ["up"] * 3, score=0)
+    with pytest.raises(ReplayFormatError):
+        list(ReplayReader(data[:-2]).moves())
+
+
+def test_canonical_replay_ignores_encoding():
+    """Test that every encoding of one game has the same digest, and other games do not"""
+    game, data = play_random_game(seed=7)
+    assert canonical_replay(data) == data
+    variant = encode_unmerged(data, ["up"] * 20)
+    assert variant != data and verify_replay(variant)[0]
+    assert canonical_replay(variant) == data
+    assert replay_digest(variant) == replay_digest(data)
+    assert replay_digest(play_random_game(seed=8)[1]) != replay_digest(data)
+    # Inputs past the tick limit are not part of the game
+    assert canonical_replay(data, max_ticks=10) == canonical_replay(variant, max_ticks=10)
@@ -0,0 +1,70 @@
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+import app.db as db_module
+from app.database import Base
+from app.db import Database
+from app.passwords import password_hasher
+from app.seeding import SEED_PASSWORD, SeedConfig, bulk_load, generate_players
+
+
+def make_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/seed.db")
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+def test_generate_players_is_deterministic():
+    """Test that a seed and start index fix the generated population"""
+    config = SeedConfig(users=50, seed=7)
+    first = list(generate_players(config, now=1_800_000_000))
+    second = list(generate_players(config, now=1_800_000_000))
+    assert first == second
+    games = [len(entries) for _, entries, _ in first]
+    assert all(user[4] == len(entries) for user, entries, _ in first)
+    assert max(games) > 3 * sorted(games)[len(games) // 2]  # a few regulars play far more than the median
+
+
+def test_prefixes_generate_distinct_players():
+    """Test that populations seeded under different prefixes do not share user ids"""
+    config = SeedConfig(users=50)
+    ids = {prefix: {user[0] for user, _, _ in generate_players(config, prefix=prefix, now=1_800_000_000)}
+           for prefix in ("Player", "Bot")}
+    assert len(ids["Player"]) == len(ids["Bot"]) == 50
+    assert not ids["Player"] & ids["Bot"]
+
+
+def test_bulk_load_matches_scores_submitted_one_by_one(tmp_path, monkeypatch):
+    """Test that seeded users, entries and bests agree as if every game had been submitted"""
+    monkeypatch.setattr(password_hasher, "rounds", 4)
+    engine = make_engine(tmp_path)
+    users, entries, bests = bulk_load(engine, SeedConfig(users=300, days=30), chunk_size=128, rebuild_indexes=True)
+    assert users == 300 and entries >= 300
+
+    with engine.connect() as conn:
+        mismatched = conn.execute(text(
+            "SELECT count(*) FROM users u JOIN (SELECT player_id, max(score) AS best, count(*) AS games "
+            "FROM leaderboard_entries GROUP BY player_id) e ON e.player_id = u.id "
+            "WHERE u.high_score != e.best OR u.games_played != e.games"
+        )).scalar()
+        assert mismatched == 0
+        seeded = sorted(conn.execute(text(
+            "SELECT player_id, mode, period, period_start, score, timestamp FROM leaderboard_bests"
+        )).all())
+        password_hash = conn.execute(text("SELECT password_hash FROM users LIMIT 1")).scalar()
+    assert len(seeded) == bests
+    assert password_hasher.verify(SEED_PASSWORD, password_hash)
+
+    # Rewriting the bests through the ORM stores byte-identical rows
+    monkeypatch.setattr(db_module, "SessionLocal", sessionmaker(bind=engine))
+    Database().rebuild_leaderboard_bests()
+    with engine.connect() as conn:
+        rebuilt = sorted(conn.execute(text(
+            "SELECT player_id, mode, period, period_start, score, timestamp FROM leaderboard_bests"
+        )).all())
+    assert rebuilt == seeded
+
+    # A second run continues the numbering
+    bulk_load(engine, SeedConfig(users=10, days=30))
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT count(DISTINCT username) FROM users")).scalar() == 310
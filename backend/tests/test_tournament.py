@@ -0,0 +1,36 @@
+from app.models import GameMode
+from app.replay import verify_replay
+from app.tournament import DIED, GameResult, play_game, run_tournament, summarize
+
+
+def test_play_game_is_deterministic_and_replayable():
+    """Test that a game depends only on strategy, mode and seed, and its replay verifies"""
+    first = play_game("greedy", GameMode.walls, seed=11, record=True)
+    second = play_game("greedy", GameMode.walls, seed=11)
+    assert (first.score, first.ticks, first.ending) == (second.score, second.ticks, second.ending)
+    ok, game = verify_replay(first.replay)
+    assert ok and game.score == first.score
+
+
+def test_pool_matches_inline_run():
+    """Test that spreading games over processes gives the same results as playing inline"""
+    def key(result):
+        return result.mode.value, result.seed, result.score, result.ticks
+
+    modes = [GameMode.walls, GameMode.pass_through]
+    inline = sorted(map(key, run_tournament(["greedy"], modes, 12, workers=1, max_ticks=2000)))
+    pooled = sorted(map(key, run_tournament(["greedy"], modes, 12, workers=2, max_ticks=2000)))
+    assert inline == pooled
+    assert len(inline) == 24
+
+
+def test_summarize_distribution():
+    """Test percentiles, histogram buckets and ending counts"""
+    results = [GameResult("greedy", GameMode.walls, seed, score, 100, DIED) for seed, score in enumerate(range(0, 1000, 10))]
+    summary = summarize(results)["greedy/walls"]
+    assert summary["games"] == 100
+    assert summary["score"]["p50"] == 490
+    assert summary["score"]["p99"] == 980
+    assert summary["score"]["max"] == 990
+    assert summary["histogram"]["0"] == 1 and len(summary["histogram"]) == 100
+    assert summary["endings"] == {DIED: 100}
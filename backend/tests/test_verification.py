@@ -0,0 +1,81 @@
+import random
+import threading
+
+import pytest
+
+from app.engine import SnakeGame
+from app.models import GameMode, SubmissionStatus
+from app.replay import ReplayRecorder, encode_replay
+from app.verification import ScoreVerifier, ScoreVerifierBusy, verify_submission
+
+
+def scoring_replay(mode: GameMode = GameMode.pass_through):
+    """Record a random game that eats at least once; returns (score, replay)"""
+    for seed in range(1, 100):
+        game = SnakeGame(mode, seed)
+        recorder = ReplayRecorder(seed, mode)
+        rng = random.Random(seed)
+        while not game.is_game_over and recorder.ticks < 2000:
+            move = rng.choice(["up", "down", "left", "right"]) if rng.random() < 0.125 else None
+            recorder.record(move)
+            game.step(move)
+        if game.score > 0:
+            return game.score, recorder.finish(game.score)
+    raise AssertionError("no scoring game found")
+
+
+def test_verify_submission():
+    """Test that only a replay reproducing the claimed score in the claimed mode passes"""
+    score, data = scoring_replay()
+    assert verify_submission(data, GameMode.pass_through.value, score, 100000) == (True, None)
+
+    ok, reason = verify_submission(data, GameMode.pass_through.value, score + 10, 100000)
+    assert not ok and "claimed score" in reason
+    ok, reason = verify_submission(data, GameMode.walls.value, score, 100000)
+    assert not ok and "mode" in reason
+    ok, reason = verify_submission(data, GameMode.pass_through.value, score, 10)
+    assert not ok and "too long" in reason
+    ok, reason = verify_submission(data[:-3], GameMode.pass_through.value, score, 100000)
+    assert not ok
+    ok, reason = verify_submission(encode_replay(1, GameMode.walls, [None] * 5, 0, grid_size=255),
+                                   GameMode.walls.value, 0, 100000)
+    assert not ok and "grid size" in reason
+
+
+def test_verifier_accepts_only_verified_scores():
+    """Test that accept runs for verified submissions only and statuses are kept for polling"""
+    score, data = scoring_replay()
+    verifier = ScoreVerifier(executor="thread", workers=2, max_pending=10)
+    accepted = []
+
+    def accept(submission, replay):
+        accepted.append((submission.user_id, submission.score, replay))
+        return 3
+
+    try:
+        good = verifier.submit("user-a", score, GameMode.pass_through, data, accept)
+        bad = verifier.submit("user-b", score + 50, GameMode.pass_through, data, accept)
+        assert verifier.drain(timeout=10)
+    finally:
+        verifier.shutdown()
+
+    assert accepted == [("user-a", score, data)]
+    assert verifier.get(good.id).status == SubmissionStatus.verified
+    assert verifier.get(good.id).new_rank == 3
+    assert verifier.get(bad.id).status == SubmissionStatus.rejected
+    stats = verifier.stats()
+    assert stats["verified_total"] == 1 and stats["rejected_total"] == 1 and stats["pending"] == 0
+
+
+def test_verifier_sheds_load_when_full():
+    """Test that submissions beyond max_pending are refused instead of queued"""
+    score, data = scoring_replay()
+    release = threading.Event()
+    verifier = ScoreVerifier(executor="thread", workers=1, max_pending=1)
+    try:
+        verifier.submit("user-a", score, GameMode.pass_through, data, lambda submission, replay: release.wait(10))
+        with pytest.raises(ScoreVerifierBusy):
+            verifier.submit("user-a", score, GameMode.pass_through, data, lambda submission, replay: None)
+        release.set()
+    finally:
+        verifier.shutdown()
@@ -0,0 +1,55 @@
+from datetime import datetime
+
+import pytest
+
+from app.db_models import GameModeEnum
+from app.write_behind import ScoreBuffer, ScoreBufferFull, ScoreSubmission
+
+
+def make_submission(user_id: str, score: int = 100) -> ScoreSubmission:
+    return ScoreSubmission(user_id, score, GameModeEnum.walls, datetime(2026, 1, 1))
+
+
+def test_poison_submission_is_dead_lettered():
+    """Test that one unwritable submission is set aside instead of blocking every later flush"""
+    written = []
+    def flush_func(batch):
+        if any(item.user_id == "deleted" for item in batch):
+            raise ValueError("FOREIGN KEY constraint failed")
+        written.extend(batch)
+
+    buffer = ScoreBuffer(flush_func, interval_ms=60000, max_batch=10, max_items=100)
+    for user_id in ("a", "deleted", "b"):
+        buffer.submit(make_submission(user_id))
+    assert buffer.flush() == 2
+    assert [item.user_id for item in written] == ["a", "b"]
+    assert [item.user_id for item in buffer.dead_letters] == ["deleted"]
+    assert len(buffer) == 0
+
+    buffer.submit(make_submission("c"))
+    assert buffer.flush() == 1
+    assert buffer.stats()["dead_lettered_total"] == 1
+
+
+def test_outage_keeps_batch_and_caps_the_buffer():
+    """Test that a database outage keeps queued submissions and refuses new ones at max_items"""
+    down = True
+    written = []
+    def flush_func(batch):
+        if down:
+            raise ConnectionError("database is down")
+        written.extend(batch)
+
+    buffer = ScoreBuffer(flush_func, interval_ms=60000, max_batch=2, max_items=4)
+    for i in range(4):
+        buffer.submit(make_submission(f"p{i}"))
+    with pytest.raises(ScoreBufferFull):
+        buffer.submit(make_submission("p4"))
+    assert len(buffer) == 4
+    assert not buffer.dead_letters
+
+    down = False
+    buffer.submit(make_submission("p4"))
+    assert [item.user_id for item in written] == ["p0", "p1", "p2", "p3"]
+    assert buffer.flush() == 1
+    assert buffer.stats()["rejected_total"] == 1
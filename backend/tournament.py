@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Headless bot tournament runner for Snake Rivals Arena.
+Plays seeded bot games across a process pool, prints score distributions and
+optionally writes them as JSON or seeds the leaderboard with the results.
+
+Usage:
+    uv run python tournament.py --bots greedy --games 2000 --output results.json
+    uv run python tournament.py --games 500 --seed-leaderboard 100
+"""
+import argparse
+import json
+import os
+import sys
+from typing import List
+
+from app.bots import BOTS
+from app.models import GameMode
+from app.tournament import GameResult, TournamentTimer, run_tournament, summarize
+
+
+def seed_leaderboard(results: List[GameResult], players: int):
+    """
+    Record results as scores of `players` bot users per strategy (created on
+    first use, all with password "password123" so load tests can log in as
+    them), each score linked to its replay.
+    """
+    from app.database import init_db
+    from app.db import db
+
+    init_db()
+    password_hash = db.hash_password("password123")
+    accounts = {}
+    for result in results:
+        index = len(accounts) % players
+        username = f"{result.strategy.title()}Bot{index:04d}"
+        user = accounts.get(username) or db.get_user_by_username(username)
+        if user is None:
+            user = db.create_user(username, password_hash=password_hash)
+        accounts[username] = user
+        replay_id = db.save_replay(result.replay, user.id) if result.replay else None
+        db.update_score(user.id, result.score, result.mode, replay_id=replay_id)
+    print(f"Seeded {len(results)} scores for {len(accounts)} bot users")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--bots", default=",".join(BOTS), help=f"comma-separated strategies ({', '.join(BOTS)})")
+    parser.add_argument("--modes", default="walls,pass-through", help="comma-separated game modes")
+    parser.add_argument("--games", type=int, default=1000, help="games per strategy and mode")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=0, help="first game seed")
+    parser.add_argument("--max-ticks", type=int, default=20000)
+    parser.add_argument("--starve-ticks", type=int, default=None,
+                        help="stop a bot that has not eaten for this many ticks (default: 2x grid cells)")
+    parser.add_argument("--output", help="write the summary as JSON to this file ('-' for stdout)")
+    parser.add_argument("--seed-leaderboard", type=int, default=0, metavar="PLAYERS",
+                        help="record the scores, with replays, for this many bot users per strategy")
+    args = parser.parse_args()
+
+    strategies = [name for name in args.bots.split(",") if name]
+    unknown = [name for name in strategies if name not in BOTS]
+    if unknown:
+        parser.error(f"unknown bots: {', '.join(unknown)}")
+    modes = [GameMode(mode) for mode in args.modes.split(",") if mode]
+    record = args.seed_leaderboard > 0
+
+    timer = TournamentTimer()
+    results = []
+    for result in run_tournament(strategies, modes, args.games, args.workers, args.seed,
+                                 args.max_ticks, args.starve_ticks, record):
+        timer.add(result)
+        results.append(result)
+    throughput = timer.report()
+
+    summary = summarize(results)
+    for key, stats in summary.items():
+        score = stats["score"]
+        print(f"{key:<28} {stats['games']:>6} games  mean {score['mean']:7.1f}  p50 {score['p50']:>5}  "
+              f"p90 {score['p90']:>5}  p99 {score['p99']:>5}  max {score['max']:>5}  {stats['endings']}")
+    print(f"{timer.games} games in {throughput['elapsed_seconds']}s on {args.workers} workers "
+          f"({throughput['games_per_second']} games/s, {throughput['ticks_per_second']} ticks/s)")
+
+    if args.output:
+        report = {
+            "config": {
+                "bots": strategies,
+                "modes": [mode.value for mode in modes],
+                "games": args.games,
+                "workers": args.workers,
+                "seed": args.seed,
+                "max_ticks": args.max_ticks,
+                "starve_ticks": args.starve_ticks,
+            },
+            **throughput,
+            "results": summary,
+        }
+        if args.output == "-":
+            json.dump(report, sys.stdout, indent=2)
+            print()
+        else:
+            with open(args.output, "w") as f:
+                json.dump(report, f, indent=2)
+
+    if record:
+        seed_leaderboard(results, args.seed_leaderboard)
+
+
+if __name__ == "__main__":
+    main()